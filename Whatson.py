@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
-import random
+import os
+import sys
 import ttkbootstrap as tb
 import tkinter as tk
 from tkinter import ttk
 import traceback
 
 from whatson_ui import WhatsonUI
-from generate_content_list import fetch_all_items, load_cached_boxsets, get_collections_for_item, order_content
+from generate_content_list import (fetch_all_items, load_cached_boxsets, save_boxset_cache, assign_channels,
+                                   schedule_content, update_boxset_membership)
+from jellyfin_utils import save_library_snapshot, log_in_in_background, JELLYFIN_URL
+from schedule_store import load_schedule
+from episode_cache import episode_cache
+from live_updates import NotificationListener, LIVE_UPDATES
+from audio_devices import audio_device_cache
+from mpv_player import player
+from log_utils import get_logger
+from profiling import profiler
+
+log = get_logger("app")
 
 class WhatsonApp:
-    def __init__(self):
+    def __init__(self, resident=False):
         self.color_scheme = {
             "bg": "#121212",
             "series": "#FFA500",  # Option 3: Orange
@@ -17,58 +29,36 @@ class WhatsonApp:
             "desc": "#FFFFFF"
         }
 
-        # Load cached BoxSet data
-        print("Loading cached BoxSet data...")
-        self.cached_boxsets, self.item_to_boxsets = load_cached_boxsets()
-        if self.cached_boxsets is None or self.item_to_boxsets is None:
-            raise Exception("Failed to load cached BoxSet data. Run generate_content_list.py first.")
-
-        # Fetch and order the content list
-        print("Fetching shows...")
-        self.shows = fetch_all_items()
-
-        # Assign channels
-        self.channel_assignments = {}
-        for item in self.shows:
-            collections = get_collections_for_item(item['Id'], self.item_to_boxsets)
-            non_random_channels = [channel for channel in collections if channel != "Random"]
-            if non_random_channels:
-                selected_channel = random.choice(non_random_channels)
-            else:
-                selected_channel = "Random"
-            self.channel_assignments[item['Id']] = selected_channel
-            print(f"Assigned channel for {item.get('Name', 'Unknown')} (ID: {item['Id']}): {selected_channel} from {collections}")
+        # Find the HDMI audio device and warm up mpv in the background while the library loads
+        audio_device_cache.start()
+        player.start_in_background()
+        # Nothing below waits for the login: server calls log in first if it has not finished
+        log_in_in_background()
 
-        # Order the content list (randomized order, max one channel per group of 5)
-        self.ordered_shows = order_content(self.shows, self.channel_assignments)
-
-        # Post-process to ensure no more than one instance of a channel per 5 entries
-        chunk_size = 5
-        for i in range(0, len(self.ordered_shows), chunk_size):
-            chunk = self.ordered_shows[i:i + chunk_size]
-            chunk_channels = [self.channel_assignments[show['Id']] for show in chunk]
-            channel_counts = {}
-            for channel in chunk_channels:
-                channel_counts[channel] = channel_counts.get(channel, 0) + 1
-            duplicates = {channel: count for channel, count in channel_counts.items() if count > 1 and channel != "Random"}
-            if duplicates:
-                print(f"Found duplicate channels in chunk {i//chunk_size}: {duplicates}")
-                for channel, count in duplicates.items():
-                    for j, show in enumerate(chunk):
-                        if self.channel_assignments[show['Id']] == channel and count > 1:
-                            collections = get_collections_for_item(show['Id'], self.item_to_boxsets)
-                            if "Random" in collections:
-                                self.channel_assignments[show['Id']] = "Random"
-                                print(f"Reassigned {show.get('Name', 'Unknown')} (ID: {show['Id']}) to Random to resolve duplicate {channel}")
-                                count -= 1
-                self.ordered_shows = order_content(self.shows, self.channel_assignments)
+        # A schedule written by generate_content_list.py --precompute (or --daemon) has the
+        # library, channels and order ready, so nothing is fetched here and the app starts
+        # even while the server is down
+        schedule = load_schedule(JELLYFIN_URL)
+        if schedule is not None:
+            self.cached_boxsets, self.item_to_boxsets = schedule['boxsets'], schedule['item_to_boxsets']
+            self.shows = schedule['shows']
+            self.channel_assignments = schedule['channel_assignments']
+            self.ordered_shows = schedule['ordered_shows']
+            # Their watch state is as old as the schedule: rows fetch fresh listings and
+            # only fall back to these when the server cannot answer
+            for series_id, episodes in schedule['episodes'].items():
+                episode_cache.add_stale_series(series_id, episodes)
+        else:
+            self.load_schedule_from_server()
 
         # Initialize filtered_shows as a copy of ordered_shows to respect the channel ordering
         self.filtered_shows = self.ordered_shows[:]
 
-        # Initialize the current page
+        # Initialize the current page. The page size follows the window height and
+        # is refreshed from the UI whenever the list is scrolled.
         self.current_page = 0
-        self.shows_per_page = 5  # Number of shows displayed per page
+        self.shows_per_page = 1
+        self.valid_shows = []
 
         # Initialize search mode (title, actor, or channel)
         self.search_mode = "title"  # Default mode is title search
@@ -88,10 +78,40 @@ class WhatsonApp:
             self.scroll_up,
             self.scroll_down,
             self.filter_shows,
-            self.set_search_mode  # Pass the set_search_mode callback
+            self.set_search_mode,  # Pass the set_search_mode callback
+            resident=resident
         )
+        self.root.update_idletasks()
+        self.shows_per_page = self.ui.rows_per_page()
         self.load_ordered_shows()
 
+        # Watch state, library and collection changes made elsewhere (other clients,
+        # library scans) arrive over the server's notification socket
+        self.live_updates = None
+        if LIVE_UPDATES:
+            self.live_updates = NotificationListener(
+                lambda changes: self.ui.call_on_tk_thread(self.apply_library_changes, changes),
+                boxsets=self.cached_boxsets)
+            self.live_updates.start()
+
+    def load_schedule_from_server(self):
+        """Fetch the library and work out channels and order, for when there is no precomputed schedule."""
+        # Load cached BoxSet data
+        log.info("Loading cached BoxSet data...")
+        self.cached_boxsets, self.item_to_boxsets = load_cached_boxsets()
+        if self.cached_boxsets is None or self.item_to_boxsets is None:
+            raise Exception("Failed to load cached BoxSet data. Run generate_content_list.py first.")
+
+        # Fetch and order the content list
+        log.info("Fetching shows...")
+        self.shows = fetch_all_items()
+
+        # Assign channels
+        self.channel_assignments = assign_channels(self.shows, self.item_to_boxsets)
+
+        # Order the content list (randomized order, max one channel per group of 5)
+        self.ordered_shows = schedule_content(self.shows, self.channel_assignments, self.item_to_boxsets)
+
     def filter_shows(self, *args):
         search_term = self.ui.filter_var.get().lower()
         if not search_term:
@@ -135,39 +155,110 @@ class WhatsonApp:
         self.filter_shows()
 
     def scroll_up(self, event=None):
-        if self.current_page > 0:
-            self.current_page -= 1
-            print(f"Scrolled up to page {self.current_page}")
-            self.load_ordered_shows()
+        self.shows_per_page = self.ui.rows_per_page()
+        top_index = self.ui.pending_top_index()
+        if top_index > 0:
+            target_index = max(0, top_index - self.shows_per_page)
+            self.current_page = target_index // self.shows_per_page
+            log.debug("Scrolled up to page %s", self.current_page)
+            self.ui.request_scroll(target_index)
 
     def scroll_down(self, event=None):
-        total_pages = (len(self.filtered_shows) + self.shows_per_page - 1) // self.shows_per_page
-        if self.current_page < total_pages - 1:
-            self.current_page += 1
-            print(f"Scrolled down to page {self.current_page}")
-            self.load_ordered_shows()
+        self.shows_per_page = self.ui.rows_per_page()
+        top_index = self.ui.pending_top_index()
+        last_top_index = max(0, len(self.valid_shows) - self.shows_per_page)
+        if top_index < last_top_index:
+            target_index = min(top_index + self.shows_per_page, last_top_index)
+            self.current_page = target_index // self.shows_per_page
+            log.debug("Scrolled down to page %s", self.current_page)
+            self.ui.request_scroll(target_index)
 
-    def load_ordered_shows(self):
-        start_index = self.current_page * self.shows_per_page
-        end_index = start_index + self.shows_per_page
-        valid_shows = [
+    def load_ordered_shows(self, first_index=None):
+        self.valid_shows = [
             show for show in self.filtered_shows
             if show.get('Name') and show.get('Name').strip()
         ]
-        selected_shows = valid_shows[start_index:end_index]
-        self.current_shows = selected_shows
-        self.ui.load_ordered_shows(self.current_shows, self.channel_assignments)
+        start_index = self.current_page * self.shows_per_page if first_index is None else first_index
+        self.ui.load_ordered_shows(self.valid_shows, self.channel_assignments, first_index=start_index)
+
+    def apply_library_changes(self, changes):
+        """Fold changes reported by the notification listener into the show list and the rows on screen."""
+        shows_by_id = {show['Id']: show for show in self.shows}
+        refresh = set(changes.refresh)
+        listing_changed = False
+
+        for item_id, user_data in changes.user_data.items():
+            show = shows_by_id.get(item_id)
+            if show is not None:
+                show['UserData'] = dict(show.get('UserData') or {}, **user_data)
+
+        added = []
+        for item_id, item in changes.items.items():
+            show = shows_by_id.get(item_id)
+            if show is not None:
+                show.update(item)  # Rows and lists hold this dict, so it is updated rather than replaced
+            else:
+                added.append(item)
+        if added:
+            # New items join the end of the schedule, on one of their channels
+            self.channel_assignments.update(assign_channels(added, self.item_to_boxsets))
+            self.shows.extend(added)
+            self.ordered_shows.extend(added)
+            if not self.ui.filter_var.get():
+                self.filtered_shows.extend(added)
+            listing_changed = True
+
+        removed = {item_id for item_id in changes.removed if item_id in shows_by_id}
+        if removed:
+            self.shows = [show for show in self.shows if show['Id'] not in removed]
+            self.ordered_shows = [show for show in self.ordered_shows if show['Id'] not in removed]
+            self.filtered_shows = [show for show in self.filtered_shows if show['Id'] not in removed]
+            listing_changed = True
+
+        if changes.boxsets:
+            moved = set()
+            for boxset_id, (name, member_ids) in changes.boxsets.items():
+                self.cached_boxsets = [boxset for boxset in self.cached_boxsets if boxset['Id'] != boxset_id]
+                if member_ids is not None:
+                    self.cached_boxsets.append({'Id': boxset_id, 'Name': name})
+                moved |= update_boxset_membership(self.item_to_boxsets, name, member_ids or [])
+            save_boxset_cache(self.cached_boxsets, self.item_to_boxsets)
+            # Shows taken out of the collection they were shown under get another channel
+            stranded = [show for show in self.shows if show['Id'] in moved
+                        and self.channel_assignments.get(show['Id']) not in self.item_to_boxsets[show['Id']]]
+            if stranded:
+                self.channel_assignments.update(assign_channels(stranded, self.item_to_boxsets))
+                refresh.update(show['Id'] for show in stranded)
+
+        if changes.user_data or changes.items or removed:
+            save_library_snapshot(self.shows)
+        if changes.resync:
+            self.ui.playback_targets.clear()
+            refresh.update(self.ui.show_ids.values())
+        if listing_changed:
+            self.load_ordered_shows(first_index=self.ui.first_visible_index())
+        elif refresh:
+            self.ui.refresh_rows(refresh)
 
     def run(self):
-        print("Starting Tkinter main loop...")
+        log.info("Starting Tkinter main loop...")
         self.root.mainloop()
-        print("Application closed.")
+        if self.live_updates is not None:
+            self.live_updates.stop()
+        log.info("Application closed.")
 
 if __name__ == "__main__":
     try:
-        print("Starting Whatson application...")
-        app = WhatsonApp()
+        log.info("Starting Whatson application...")
+        # In resident mode the window hides during playback and comes back when it ends
+        resident = "--resident" in sys.argv[1:] or os.environ.get("WHATSON_RESIDENT") == "1"
+        # Profiles startup, reloads, searches and launches into profiles/<session>/
+        if "--profile" in sys.argv[1:]:
+            profiler.enable()
+        with profiler.phase("startup"):
+            app = WhatsonApp(resident=resident)
+            app.root.update_idletasks()
         app.run()
     except Exception as e:
-        print(f"Error starting application: {e}")
+        log.error("Error starting application: %s", e)
         traceback.print_exc()
\ No newline at end of file
@@ -0,0 +1,137 @@
+# audio_devices.py
+import subprocess
+import threading
+import time
+
+from log_utils import get_logger
+
+log = get_logger("audio")
+
+FALLBACK_AUDIO_DEVICE = "alsa/hdmi:CARD=HDMI,DEV=1"  # The SAMSUNG TV's HDMI output
+AUDIO_DEVICE_TTL = 600  # Seconds before a cached device is rediscovered
+CHANGE_POLL_SECONDS = 5  # How often the sound card list is checked for changes
+FIRST_DISCOVERY_WAIT = 3  # Seconds a launch waits for startup discovery before using the fallback
+# Files the kernel rewrites when a sound card or HDMI sink appears or goes away
+DEVICE_WATCH_PATHS = ["/proc/asound/cards", "/proc/asound/pcm"]
+
+def discover_audio_device():
+    """
+    Get the identifier of the HDMI audio device for the SAMSUNG TV by asking mpv.
+    This spawns an mpv process, so callers should go through the cache instead.
+
+    Returns:
+        str: The identifier of the HDMI audio device, or None if mpv is not installed.
+    """
+    try:
+        result = subprocess.run(["mpv", "--audio-device=help"], capture_output=True, text=True, check=True)
+        lines = result.stdout.splitlines()
+        audio_devices = []
+        for line in lines:
+            line = line.strip()
+            # Look for lines that are actual device names
+            if line and (line.startswith("alsa/") or line.startswith("pulse/") or line.startswith("auto")):
+                audio_devices.append(line)
+        log.debug("Detected audio devices: %s", audio_devices)
+        # Look for the SAMSUNG HDMI audio device
+        for device in audio_devices:
+            if 'hdmi' in device.lower() and 'SAMSUNG' in device:
+                log.debug("Found SAMSUNG HDMI audio device: %s", device)
+                return device
+        # Fallback to any HDMI device if SAMSUNG isn't found
+        for device in audio_devices:
+            if 'hdmi' in device.lower() and device != 'auto':
+                log.debug("Found generic HDMI audio device: %s", device)
+                return device
+        # Hardcode the SAMSUNG HDMI device as a last resort
+        log.warning("No HDMI audio device detected, using hardcoded SAMSUNG HDMI device.")
+        return FALLBACK_AUDIO_DEVICE
+    except subprocess.CalledProcessError as e:
+        log.error("Error listing audio devices: %s", e)
+        log.warning("Falling back to hardcoded SAMSUNG HDMI device.")
+        return FALLBACK_AUDIO_DEVICE
+    except FileNotFoundError:
+        log.error("MPV not found. Please ensure MPV is installed.")
+        return None
+
+def device_signature():
+    """A cheap fingerprint of the sound hardware, used to notice device changes without running mpv."""
+    parts = []
+    for path in DEVICE_WATCH_PATHS:
+        try:
+            with open(path) as f:
+                parts.append(f.read())
+        except OSError:
+            parts.append("")
+    return "\n".join(parts)
+
+class AudioDeviceCache:
+    """
+    Keeps the HDMI audio device discovered in a background thread, so launching
+    playback never waits for an mpv process. The device is rediscovered when the
+    TTL runs out or when the kernel's sound card list changes.
+    """
+
+    def __init__(self, ttl=AUDIO_DEVICE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.device = None
+        self.discovered_at = None
+        self.signature = None
+        self.discovered = threading.Event()
+        self.refresh_requested = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start discovery in the background. Call once at startup."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="audio-devices", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            self.refresh()
+            # Sleep until the TTL runs out, polling for hardware changes and explicit refresh requests
+            while True:
+                self.refresh_requested.wait(CHANGE_POLL_SECONDS)
+                if self.refresh_requested.is_set():
+                    self.refresh_requested.clear()
+                    break
+                if device_signature() != self.signature:
+                    log.info("Audio hardware changed, rediscovering audio device.")
+                    break
+                if time.monotonic() - self.discovered_at >= self.ttl:
+                    break
+
+    def refresh(self):
+        signature = device_signature()
+        device = discover_audio_device()
+        with self.lock:
+            self.device = device
+            self.signature = signature
+            self.discovered_at = time.monotonic()
+        self.discovered.set()
+
+    def invalidate(self):
+        """Ask the background thread to rediscover the device, e.g. after mpv reported an audio error."""
+        self.refresh_requested.set()
+
+    def get(self):
+        """Get the cached device. Only waits (briefly) if startup discovery has not finished yet."""
+        if not self.discovered.is_set():
+            self.start()
+            if not self.discovered.wait(FIRST_DISCOVERY_WAIT):
+                log.warning("Audio device discovery still running, using hardcoded SAMSUNG HDMI device.")
+                return FALLBACK_AUDIO_DEVICE
+        with self.lock:
+            return self.device
+
+audio_device_cache = AudioDeviceCache()
+
+def get_non_default_audio_device():
+    """
+    Get the identifier of the HDMI audio device for the SAMSUNG TV.
+
+    Returns:
+        str: The identifier of the HDMI audio device, or None if mpv is not installed.
+    """
+    return audio_device_cache.get()
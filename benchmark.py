@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for startup, paging, search and scheduling, run against fake_jellyfin.py
+so results do not depend on the real server or library:
+
+    python benchmark.py                      # Everything, results in benchmark_results/
+    xvfb-run python benchmark.py             # On a machine with no display
+    python benchmark.py --only schedule --sizes 1000,10000
+    python benchmark.py --compare benchmark_results/bench-20250101-120000.json
+
+UI benchmarks (cold start, page flips, keystrokes) and the scheduling runs each
+happen in a fresh child process, so imports, logins and caches start cold and a
+size that runs away can be stopped by --timeout. UI benchmarks are skipped when
+there is no display.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_jellyfin import FakeJellyfinServer, SyntheticLibrary, CHANNEL_NAMES
+
+BENCHMARKS = ("boxset_cache", "schedule", "ui")
+DEFAULT_SIZES = (1000, 10000, 100000)
+RESULTS_DIR = "benchmark_results"
+
+def summarize(samples):
+    """Summary statistics for a list of durations in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+def quiet():
+    """Silence the app's log output, so the timings do not depend on how fast the terminal is."""
+    return contextlib.redirect_stdout(open(os.devnull, 'w'))
+
+def synthetic_catalogue(size, seed=0):
+    """size shows and an item -> channels mapping shaped like boxset_cache.json."""
+    rng = random.Random(seed)
+    shows = [{"Id": "%032x" % rng.getrandbits(128), "Name": f"Show {i}", "Type": "Series"} for i in range(size)]
+    item_to_boxsets = {}
+    for show in shows:
+        channels = rng.sample(CHANNEL_NAMES, rng.choice([0, 1, 1, 2]))
+        item_to_boxsets[show["Id"]] = channels + ["Random"]
+    boxsets = [{"Id": "%032x" % rng.getrandbits(128), "Name": name} for name in CHANNEL_NAMES]
+    return shows, boxsets, item_to_boxsets
+
+def bench_boxset_cache(sizes, repeats):
+    """Time load_cached_boxsets on caches of each size."""
+    import generate_content_list
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            _, boxsets, item_to_boxsets = synthetic_catalogue(size)
+            generate_content_list.CACHE_FILE = os.path.join(directory, f"boxset_cache_{size}.json")
+            with quiet():
+                generate_content_list.save_boxset_cache(boxsets, item_to_boxsets)
+                samples = [timed(generate_content_list.load_cached_boxsets)[0] for _ in range(repeats)]
+            results[str(size)] = dict(summarize(samples), file_bytes=os.path.getsize(generate_content_list.CACHE_FILE))
+            print(f"boxset_cache {size}: {results[str(size)]['median_ms']}ms")
+    return results
+
+def child_schedule(size, repeats):
+    """Child process: time channel assignment, order_content and the full schedule for one size."""
+    from generate_content_list import assign_channels, order_content, schedule_content
+    shows, _, item_to_boxsets = synthetic_catalogue(size)
+    assign, order, schedule = [], [], []
+    with quiet():
+        for _ in range(repeats):
+            seconds, assignments = timed(assign_channels, shows, item_to_boxsets)
+            assign.append(seconds)
+            order.append(timed(order_content, shows, assignments)[0])
+            schedule.append(timed(schedule_content, shows, dict(assignments), item_to_boxsets)[0])
+    return {
+        "assign_channels": summarize(assign),
+        "order_content": summarize(order),
+        "schedule_content": summarize(schedule),
+    }
+
+def child_ui(search_term, pages, started):
+    """Child process: cold start to first page, then page flips and search keystrokes."""
+    import_seconds, whatson = timed(__import__, "Whatson")
+    import generate_content_list
+    from mpv_player import player
+    from server_calls import single_flight
+    from stream_selection import stream_selector
+    generate_content_list.CACHE_FILE = os.environ["WHATSON_BENCH_CACHE"]
+    # Never start a real player from a benchmark
+    player.mpv_command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_mpv.py")]
+    player.socket_path = os.path.join(tempfile.gettempdir(), f"whatson-bench-mpv-{os.getpid()}.sock")
+
+    try:
+        with quiet():
+            app = whatson.WhatsonApp()
+            app.root.update()
+        first_page = time.perf_counter() - started
+        return dict(measure_ui(app, search_term, pages, import_seconds, first_page),
+                    single_flight=single_flight.summary(), stream_selection=stream_selector.counts())
+    finally:
+        player.quit()
+
+def measure_ui(app, search_term, pages, import_seconds, first_page):
+    ui = app.ui
+
+    page_flips, reloads = [], []
+    with quiet():
+        for _ in range(pages):
+            ui.cancel_scroll()  # Each flip is a separate press, not part of a held-key burst
+            started = time.perf_counter()
+            app.scroll_down()
+            app.root.update_idletasks()
+            page_flips.append(time.perf_counter() - started)
+        for page in range(pages):
+            started = time.perf_counter()
+            ui.load_ordered_shows(app.valid_shows, app.channel_assignments, first_index=page * ui.rows_per_page())
+            app.root.update_idletasks()
+            reloads.append(time.perf_counter() - started)
+
+        keystrokes = []
+        for length in range(1, len(search_term) + 1):
+            started = time.perf_counter()
+            ui.filter_var.set(search_term[:length])  # The trace on filter_var runs filter_shows
+            app.root.update_idletasks()
+            keystrokes.append(time.perf_counter() - started)
+        ui.filter_var.set("")
+        app.root.update()
+        app.root.destroy()
+
+    return {
+        "cold_start": {"import_ms": round(import_seconds * 1000, 3), "first_page_ms": round(first_page * 1000, 3)},
+        "page_flip": summarize(page_flips),
+        "load_ordered_shows": summarize(reloads),
+        "filter_keystroke": dict(summarize(keystrokes), term=search_term),
+    }
+
+def run_child(args, env, timeout):
+    """Run benchmark.py in child mode and return the JSON it wrote, or an error record."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+        result_path = result_file.name
+    command = [sys.executable, os.path.abspath(__file__), "--child-result", result_path] + args
+    # The child's output goes to a file, not a pipe: a player it started could hold a pipe open after it exits
+    with tempfile.TemporaryFile(mode="w+") as log:
+        try:
+            completed = subprocess.run(command, env=env, timeout=timeout, stdout=log, stderr=subprocess.STDOUT)
+            if completed.returncode != 0:
+                log.seek(0)
+                lines = log.read().strip().splitlines()
+                return {"error": lines[-1] if lines else f"exited with code {completed.returncode}"}
+            with open(result_path) as f:
+                return json.load(f)
+        except subprocess.TimeoutExpired:
+            return {"error": f"timed out after {timeout}s"}
+        finally:
+            os.remove(result_path)
+
+def bench_schedule(sizes, repeats, env, timeout):
+    results = {}
+    for size in sizes:
+        result = run_child(["--child", "schedule", "--sizes", str(size), "--repeats", str(repeats)], env, timeout)
+        results[str(size)] = result
+        if "error" in result:
+            print(f"schedule {size}: {result['error']}")
+            # Larger sizes would only take longer
+            for larger in sizes[sizes.index(size) + 1:]:
+                results[str(larger)] = {"error": f"skipped after {size} failed"}
+            break
+        print(f"schedule {size}: assign {result['assign_channels']['median_ms']}ms, "
+              f"order {result['order_content']['median_ms']}ms, schedule {result['schedule_content']['median_ms']}ms")
+    return results
+
+def bench_ui(library, env, pages, timeout):
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        print("ui: skipped, no display (run under xvfb-run)")
+        return {"skipped": "no display"}
+    search_term = library.series[0]["Name"].split()[0].lower()
+    with tempfile.TemporaryDirectory() as directory:
+        import generate_content_list
+        generate_content_list.CACHE_FILE = os.path.join(directory, "boxset_cache.json")
+        with quiet():
+            boxsets, item_to_boxsets, _ = generate_content_list.fetch_boxsets()
+            generate_content_list.save_boxset_cache(boxsets, item_to_boxsets)
+        env = dict(env, WHATSON_BENCH_CACHE=generate_content_list.CACHE_FILE)
+        result = run_child(["--child", "ui", "--pages", str(pages), "--search", search_term], env, timeout)
+    if "error" in result:
+        print(f"ui: {result['error']}")
+    else:
+        print(f"ui: first page {result['cold_start']['first_page_ms']}ms, page flip {result['page_flip']['median_ms']}ms, "
+              f"keystroke {result['filter_keystroke']['median_ms']}ms")
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def flatten(results, prefix=""):
+    """Map 'schedule.1000.order_content' style keys to median (or single) millisecond values."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            if "median_ms" in value:
+                flat[name] = value["median_ms"]
+            else:
+                flat.update(flatten(value, name + "."))
+        elif key.endswith("_ms"):
+            flat[name] = value
+    return flat
+
+def compare(baseline_path, results):
+    with open(baseline_path) as f:
+        baseline = flatten(json.load(f)["results"])
+    current = flatten(results)
+    print(f"\n{'benchmark':<50} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(set(baseline) | set(current)):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            print(f"{name:<50} {before if before is not None else '-':>10} {after if after is not None else '-':>10}")
+            continue
+        change = f"{(after - before) / before * 100:+.0f}%" if before else ""
+        print(f"{name:<50} {before:>10.1f} {after:>10.1f} {change:>8}")
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark Whatson against a fake Jellyfin server.")
+    parser.add_argument("--only", choices=BENCHMARKS, action="append", help="Run only these benchmarks")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Item counts for the scaling benchmarks")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=10, help="Page flips to time")
+    parser.add_argument("--series", type=int, default=200, help="Series in the fake library for UI benchmarks")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency the fake server adds to each response")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before one child run is abandoned")
+    parser.add_argument("--output", help="Where to write the results (default: benchmark_results/bench-<time>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--child", choices=("schedule", "ui"), help=argparse.SUPPRESS)
+    parser.add_argument("--child-result", help=argparse.SUPPRESS)
+    parser.add_argument("--search", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    if args.child:
+        started = time.perf_counter()
+        if args.child == "schedule":
+            result = child_schedule(sizes[0], args.repeats)
+        else:
+            result = child_ui(args.search, args.pages, started)
+        with open(args.child_result, "w") as f:
+            json.dump(result, f)
+        return 0
+
+    library = SyntheticLibrary(series=args.series)
+    server = FakeJellyfinServer(library, port=0, latency=args.latency_ms / 1000,
+                                bandwidth=args.bandwidth_kbps * 1000 / 8 if args.bandwidth_kbps else None).start()
+    # Set before anything imports jellyfin_utils, which reads it at import
+    os.environ["WHATSON_JELLYFIN_URL"] = server.url
+    env = dict(os.environ)
+    print(f"Fake Jellyfin on {server.url}")
+
+    selected = args.only or BENCHMARKS
+    results = {}
+    try:
+        if "boxset_cache" in selected:
+            results["boxset_cache"] = bench_boxset_cache(sizes, args.repeats)
+        if "schedule" in selected:
+            results["schedule"] = bench_schedule(sizes, args.repeats, env, args.timeout)
+        if "ui" in selected:
+            results["ui"] = bench_ui(library, env, args.pages, args.timeout)
+    finally:
+        server.stop()
+
+    record = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeats": args.repeats,
+            "library": {"series": len(library.series), "movies": len(library.movies), "boxsets": len(library.boxsets)},
+            "latency_ms": args.latency_ms,
+            "bandwidth_kbps": args.bandwidth_kbps,
+            "server_requests": dict(server.stats),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("bench-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(record, f, indent=2)
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(args.compare, results)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
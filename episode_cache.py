@@ -0,0 +1,95 @@
+# episode_cache.py
+import threading
+
+class EpisodeCache:
+    """
+    In-memory cache of episode details, filled from the episode listings the app
+    already fetches so a single episode never needs its own get_item round trip.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.episodes = {}  # episode id -> episode dict
+        self.series_episodes = {}  # series id -> episodes in play order
+        self.stale_series = {}  # series id -> invalidated listing, kept for when the server is unreachable
+
+    def add_series(self, series_id, episodes):
+        """Record a series' full episode listing, replacing any previous one."""
+        with self.lock:
+            self.series_episodes[series_id] = list(episodes)
+            self.stale_series.pop(series_id, None)
+            for episode in episodes:
+                self.episodes[episode['Id']] = episode
+
+    def add_stale_series(self, series_id, episodes):
+        """
+        Record a listing that may be out of date (e.g. from the precomputed store) as a
+        fallback only: get_series returns it with allow_stale, and a fetch replaces it.
+        """
+        with self.lock:
+            if series_id not in self.series_episodes:
+                self.stale_series[series_id] = list(episodes)
+
+    def add(self, episode):
+        with self.lock:
+            self.episodes[episode['Id']] = episode
+
+    def update_user_data(self, episode_id, user_data):
+        """
+        Patch the UserData of a cached episode (and of its series' listing) with new
+        fields, e.g. from a UserDataChanged notification, instead of refetching the
+        series. Returns the episode's series id, or None if the episode is not cached.
+        """
+        with self.lock:
+            episode = self.episodes.get(episode_id)
+            if episode is None:
+                return None
+            # Listings are shared with callers, so the episode is replaced rather than changed
+            patched = dict(episode, UserData=dict(episode.get('UserData') or {}, **user_data))
+            self.episodes[episode_id] = patched
+            series_id = episode.get('SeriesId')
+            listing = self.series_episodes.get(series_id)
+            if listing is not None:
+                self.series_episodes[series_id] = [patched if e['Id'] == episode_id else e for e in listing]
+            return series_id
+
+    def series_of(self, episode_id):
+        """The series id of a cached episode, or None."""
+        with self.lock:
+            episode = self.episodes.get(episode_id)
+            return episode.get('SeriesId') if episode is not None else None
+
+    def get(self, episode_id):
+        """Get an episode by id, or None if it has not been seen in any listing."""
+        with self.lock:
+            return self.episodes.get(episode_id)
+
+    def get_series(self, series_id, allow_stale=False):
+        """
+        Get the cached episode listing for a series, or None if it has not been fetched.
+        allow_stale also returns a listing that was invalidated, as a fallback when the server is down.
+        """
+        with self.lock:
+            episodes = self.series_episodes.get(series_id)
+            if episodes is None and allow_stale:
+                episodes = self.stale_series.get(series_id)
+            return list(episodes) if episodes is not None else None
+
+    def invalidate_series(self, series_id):
+        """Forget a series' listing and its episodes, e.g. after its watch state changed."""
+        with self.lock:
+            episodes = self.series_episodes.pop(series_id, None)
+            if episodes is None:
+                return
+            self.stale_series[series_id] = episodes
+            for episode in episodes:
+                self.episodes.pop(episode['Id'], None)
+
+    def invalidate_all(self):
+        """Invalidate every listing, e.g. when changes may have been missed."""
+        with self.lock:
+            series_ids = list(self.series_episodes)
+        for series_id in series_ids:
+            self.invalidate_series(series_id)
+
+episode_cache = EpisodeCache()
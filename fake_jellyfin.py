@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Jellyfin server, for measuring the app without a real library.
+It serves a synthetic library of configurable size over the endpoints the app
+uses, with optional injected latency and bandwidth limits:
+
+    python fake_jellyfin.py --port 8097 --series 200 --latency-ms 40 --bandwidth-kbps 20000
+    WHATSON_JELLYFIN_URL=http://localhost:8097 python Whatson.py
+
+or in-process:
+
+    server = FakeJellyfinServer(SyntheticLibrary(series=50), port=0).start()
+    server.url  # "http://127.0.0.1:<port>"
+    server.stats  # Counter of requests per endpoint, plus "bytes"
+
+Any username and password log in. Images are generated JPEGs of the requested
+size and every stream is a block of filler bytes. The /socket WebSocket sends
+ForceKeepAlive on connect and whatever notify() is given afterwards:
+
+    server.mark_played(episode_id)  # Sends UserDataChanged
+    server.notify("LibraryChanged", {"ItemsUpdated": [series_id]})
+    server.failing.add("items")  # Item queries answer 503 until it is removed again
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import random
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image, ImageDraw
+
+SERVER_ID = "fa4e5e7fa4e5e7fa4e5e7fa4e5e7fa4e"
+SERVER_VERSION = "10.8.13"
+# A valid blurhash, so previews decode like real ones
+SAMPLE_BLURHASH = "LEHV6nWB2yk8pyo0adR*.7kCMdnj"
+# Image sizes the server "stores"; requests are scaled down to fit maxWidth x maxHeight
+SOURCE_IMAGE_SIZES = {"Thumb": (1280, 720), "Primary": (680, 1000), "Backdrop": (1920, 1080)}
+# Fields a real server leaves out of list responses unless they are asked for
+OPTIONAL_FIELDS = ("Overview", "People", "MediaSources")
+TICKS_PER_SECOND = 10_000_000
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+KEEPALIVE_TIMEOUT = 60  # Seconds, sent as ForceKeepAlive like the real server
+CHANNEL_NAMES = ["Boomer", "Classic", "Comedy", "Drama", "Fantasy", "Horses", "Nature", "Prestige", "SciFi"]
+WORDS = ["Midnight", "Harbor", "Garden", "Detective", "Kitchen", "Frontier", "Royal", "Island", "Doctor",
+         "Valley", "Secret", "Summer", "Station", "Empire", "Wild", "Little", "House", "Court", "River", "Star"]
+
+class SyntheticLibrary:
+    """
+    A deterministic library of series (with seasons and episodes), movies, people
+    and BoxSets. The same arguments always produce the same ids and names.
+    """
+
+    def __init__(self, series=50, episodes_per_series=20, movies=20, boxsets=len(CHANNEL_NAMES),
+                 people=200, cast_per_item=5, seed=0):
+        self.rng = random.Random(seed)
+        self.items = {}  # id -> item dict, for every item including episodes, people and BoxSets
+        self.children = {}  # parent id -> child ids (series -> episodes, BoxSet -> series and movies)
+        self.people = [self.make_person(i) for i in range(people)]
+        self.series = [self.make_series(i, episodes_per_series, cast_per_item) for i in range(series)]
+        self.movies = [self.make_movie(i, cast_per_item) for i in range(movies)]
+        self.boxsets = [self.make_boxset(i) for i in range(boxsets)]
+
+    def new_id(self):
+        return uuid.UUID(int=self.rng.getrandbits(128)).hex
+
+    def new_tag(self):
+        return "%032x" % self.rng.getrandbits(128)
+
+    def title(self):
+        return " ".join(self.rng.sample(WORDS, self.rng.randint(1, 3)))
+
+    def overview(self, words=60):
+        return " ".join(self.rng.choice(WORDS).lower() for _ in range(words)).capitalize() + "."
+
+    def image_fields(self, image_types):
+        tags = {image_type: self.new_tag() for image_type in image_types}
+        return {
+            "ImageTags": tags,
+            "ImageBlurHashes": {image_type: {tag: SAMPLE_BLURHASH} for image_type, tag in tags.items()},
+        }
+
+    def media_sources(self, item_id, runtime_seconds):
+        return [{
+            "Id": item_id,
+            "Protocol": "File",
+            "Container": "mkv",
+            "Size": runtime_seconds * 500_000,
+            "Bitrate": 4_000_000,
+            "RunTimeTicks": runtime_seconds * TICKS_PER_SECOND,
+            "SupportsDirectPlay": True,
+            "SupportsDirectStream": True,
+            "SupportsTranscoding": True,
+            "DefaultAudioStreamIndex": 1,
+            "MediaStreams": [
+                {"Index": 0, "Type": "Video", "Codec": "h264", "Width": 1920, "Height": 1080},
+                {"Index": 1, "Type": "Audio", "Codec": "aac", "Channels": 2, "Language": "eng"},
+            ],
+        }]
+
+    def add(self, item):
+        self.items[item["Id"]] = item
+        return item
+
+    def make_person(self, index):
+        person_id = self.new_id()
+        tag = self.new_tag()
+        return self.add({
+            "Id": person_id,
+            "Name": f"{self.rng.choice(WORDS)} {self.rng.choice(WORDS)}son",
+            "Type": "Person",
+            "PrimaryImageTag": tag,
+            "ImageTags": {"Primary": tag},
+            "ImageBlurHashes": {"Primary": {tag: SAMPLE_BLURHASH}},
+        })
+
+    def cast(self, count):
+        return [{"Id": p["Id"], "Name": p["Name"], "Role": self.title(), "Type": "Actor",
+                 "PrimaryImageTag": p["PrimaryImageTag"], "ImageBlurHashes": p["ImageBlurHashes"]}
+                for p in self.rng.sample(self.people, min(count, len(self.people)))]
+
+    def make_series(self, index, episode_count, cast_count):
+        series_id = self.new_id()
+        name = f"{self.title()} {index + 1}"
+        series = self.add(dict({
+            "Id": series_id,
+            "Name": name,
+            "Type": "Series",
+            "IsFolder": True,
+            "Overview": self.overview(),
+            "People": self.cast(cast_count),
+            "UserData": {"Played": False, "PlaybackPositionTicks": 0},
+        }, **self.image_fields(("Primary", "Thumb", "Backdrop"))))
+
+        # Some shows are untouched, some part way through, some finished
+        watched = self.rng.choice([0, 0, self.rng.randint(0, episode_count), episode_count])
+        seasons = max(1, episode_count // 10)
+        episode_ids = []
+        for number in range(episode_count):
+            episode_id = self.new_id()
+            runtime = self.rng.randint(20, 60) * 60
+            user_data = {"Played": number < watched, "PlaybackPositionTicks": 0}
+            if number == watched and watched and self.rng.random() < 0.5:
+                user_data["PlaybackPositionTicks"] = runtime // 3 * TICKS_PER_SECOND
+            self.add(dict({
+                "Id": episode_id,
+                "Name": self.title(),
+                "Type": "Episode",
+                "SeriesId": series_id,
+                "SeriesName": name,
+                "ParentIndexNumber": number * seasons // episode_count + 1,
+                "IndexNumber": number % max(1, episode_count // seasons) + 1,
+                "Overview": self.overview(40),
+                "RunTimeTicks": runtime * TICKS_PER_SECOND,
+                "UserData": user_data,
+                "MediaSources": self.media_sources(episode_id, runtime),
+            }, **self.image_fields(("Primary",))))
+            episode_ids.append(episode_id)
+        self.children[series_id] = episode_ids
+        series["UserData"]["Played"] = watched == episode_count
+        return series
+
+    def make_movie(self, index, cast_count):
+        movie_id = self.new_id()
+        runtime = self.rng.randint(80, 150) * 60
+        return self.add(dict({
+            "Id": movie_id,
+            "Name": f"{self.title()} (Movie {index + 1})",
+            "Type": "Movie",
+            "Overview": self.overview(),
+            "People": self.cast(cast_count),
+            "RunTimeTicks": runtime * TICKS_PER_SECOND,
+            "UserData": {"Played": self.rng.random() < 0.3, "PlaybackPositionTicks": 0},
+            "MediaSources": self.media_sources(movie_id, runtime),
+        }, **self.image_fields(("Primary", "Thumb"))))
+
+    def make_boxset(self, index):
+        boxset_id = self.new_id()
+        members = self.series + self.movies
+        self.children[boxset_id] = [item["Id"] for item in self.rng.sample(members, len(members) // 4)]
+        name = CHANNEL_NAMES[index] if index < len(CHANNEL_NAMES) else f"Collection {index + 1}"
+        return self.add(dict({"Id": boxset_id, "Name": name, "Type": "BoxSet", "IsFolder": True},
+                             **self.image_fields(("Primary",))))
+
+    def descendant_ids(self, parent_id, recursive):
+        ids = list(self.children.get(parent_id, []))
+        if recursive:
+            for child_id in list(ids):
+                ids.extend(self.descendant_ids(child_id, True))
+        return ids
+
+    def query(self, params):
+        """Answer an Items query: ParentId, Recursive, IncludeItemTypes, Ids, SearchTerm, SortBy, StartIndex, Limit."""
+        if params.get("Ids"):
+            items = [self.items[i] for i in params["Ids"].split(",") if i in self.items]
+        elif params.get("ParentId"):
+            ids = self.descendant_ids(params["ParentId"], params.get("Recursive", "").lower() == "true")
+            items = [self.items[i] for i in ids]
+        else:
+            items = self.series + self.movies + self.boxsets + [
+                self.items[i] for s in self.series for i in self.children[s["Id"]]]
+        if params.get("IncludeItemTypes"):
+            types = set(params["IncludeItemTypes"].split(","))
+            items = [item for item in items if item["Type"] in types]
+        if params.get("SearchTerm"):
+            term = params["SearchTerm"].lower()
+            items = [item for item in items if term in item["Name"].lower()]
+        if params.get("SortBy"):
+            keys = params["SortBy"].split(",")
+            items = sorted(items, key=lambda item: tuple(item.get(key) or 0 if key != "SortName" else item["Name"]
+                                                         for key in keys),
+                           reverse=params.get("SortOrder") == "Descending")
+        total = len(items)
+        start = int(params.get("StartIndex") or 0)
+        limit = params.get("Limit")
+        items = items[start:start + int(limit)] if limit else items[start:]
+        fields = set((params.get("Fields") or "").split(","))
+        return {
+            "Items": [trim_fields(item, fields) for item in items],
+            "TotalRecordCount": total,
+            "StartIndex": start,
+        }
+
+def send_frame(connection, opcode, payload):
+    """Write one unmasked, unfragmented WebSocket frame (servers never mask)."""
+    if len(payload) < 126:
+        header = struct.pack("!BB", 0x80 | opcode, len(payload))
+    elif len(payload) < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, len(payload))
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, len(payload))
+    connection.sendall(header + payload)
+
+def read_exactly(connection, count):
+    data = b""
+    while len(data) < count:
+        chunk = connection.recv(count - len(data))
+        if not chunk:
+            raise ConnectionError("socket closed")
+        data += chunk
+    return data
+
+def read_frame(connection):
+    """Read one WebSocket frame from a client, returning (opcode, unmasked payload)."""
+    first, second = read_exactly(connection, 2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", read_exactly(connection, 2))
+    elif length == 127:
+        length, = struct.unpack("!Q", read_exactly(connection, 8))
+    mask = read_exactly(connection, 4) if second & 0x80 else b"\0\0\0\0"
+    payload = read_exactly(connection, length)
+    return first & 0x0F, bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+def trim_fields(item, fields):
+    """Drop the optional fields a real server only returns when asked for them."""
+    return {key: value for key, value in item.items() if key not in OPTIONAL_FIELDS or key in fields}
+
+class FakeJellyfinServer:
+    """
+    Serves a SyntheticLibrary over HTTP. Every response waits latency seconds (plus
+    up to jitter) first, and bodies are written no faster than bandwidth bytes per
+    second when bandwidth is set.
+    """
+
+    def __init__(self, library, host="127.0.0.1", port=8097, latency=0.0, jitter=0.0, bandwidth=None,
+                 stream_bytes=4 * 1024 * 1024):
+        self.library = library
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.stream_bytes = stream_bytes
+        self.tokens = {}  # access token -> user id
+        self.users = {}  # user name -> user id
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+        self.image_cache = {}  # (item id, image type, width, height) -> JPEG bytes
+        self.sockets = {}  # open notification sockets -> lock serialising writes to each
+        self.sockets_lock = threading.Lock()
+        self.failing = set()  # Endpoints (as named in stats) that answer 503, as an overloaded server would
+        self.httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fake-jellyfin", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.close_sockets()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def notify(self, message_type, data=None):
+        """Send a message to every open notification socket. Returns how many it went to."""
+        message = json.dumps({"MessageType": message_type, "MessageId": uuid.uuid4().hex, "Data": data})
+        with self.sockets_lock:
+            sockets = list(self.sockets.items())
+        sent = 0
+        for connection, lock in sockets:
+            try:
+                with lock:
+                    send_frame(connection, 0x1, message.encode())
+                sent += 1
+            except OSError:
+                pass  # Gone; its handler thread cleans up
+        self.count("socket_messages", len(message) * sent)
+        return sent
+
+    def mark_played(self, item_id, played=True, user_id=None):
+        """Change an item's watch state and send UserDataChanged for it, as the server does after playback."""
+        user_data = self.library.items[item_id]["UserData"]
+        user_data.update({"Played": played, "PlaybackPositionTicks": 0})
+        entry = dict(user_data, ItemId=item_id, Key=item_id)
+        return self.notify("UserDataChanged", {"UserId": user_id or next(iter(self.users.values()), ""),
+                                               "UserDataList": [entry]})
+
+    def close_sockets(self):
+        """Drop every notification socket, as a server restart would."""
+        with self.sockets_lock:
+            sockets = list(self.sockets)
+        for connection in sockets:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def count(self, endpoint, nbytes):
+        with self.stats_lock:
+            self.stats[endpoint] += 1
+            self.stats["bytes"] += nbytes
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def login(self, username):
+        user_id = self.users.setdefault(username, hashlib.md5(username.encode()).hexdigest())
+        token = uuid.uuid4().hex
+        self.tokens[token] = user_id
+        return {
+            "User": {"Id": user_id, "Name": username, "ServerId": SERVER_ID, "HasPassword": True},
+            "SessionInfo": {"UserId": user_id, "UserName": username, "ServerId": SERVER_ID},
+            "AccessToken": token,
+            "ServerId": SERVER_ID,
+        }
+
+    def system_info(self):
+        return {
+            "Id": SERVER_ID,
+            "ServerName": "Fake Jellyfin",
+            "Version": SERVER_VERSION,
+            "ProductName": "Jellyfin Server",
+            "LocalAddress": self.url,
+            "StartupWizardCompleted": True,
+        }
+
+    def image(self, item_id, image_type, max_width, max_height):
+        """A JPEG of the item's image scaled to fit max_width x max_height, drawn once per size."""
+        source_width, source_height = SOURCE_IMAGE_SIZES.get(image_type, SOURCE_IMAGE_SIZES["Primary"])
+        scale = min(1.0, (max_width or source_width) / source_width, (max_height or source_height) / source_height)
+        size = (max(1, round(source_width * scale)), max(1, round(source_height * scale)))
+        key = (item_id, image_type) + size
+        data = self.image_cache.get(key)
+        if data is None:
+            digest = hashlib.md5(item_id.encode()).digest()
+            img = Image.new("RGB", size, color=tuple(digest[:3]))
+            draw = ImageDraw.Draw(img)
+            draw.rectangle([size[0] // 8, size[1] // 8, size[0] * 7 // 8, size[1] * 7 // 8], fill=tuple(digest[3:6]))
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=85)
+            data = buffer.getvalue()
+            self.image_cache[key] = data
+        return data
+
+    def serve_socket(self, connection):
+        """Run a notification socket until the client goes away. Only KeepAlive, ping and close are expected from it."""
+        lock = threading.Lock()
+        with self.sockets_lock:
+            self.sockets[connection] = lock
+        try:
+            with lock:
+                send_frame(connection, 0x1, json.dumps({"MessageType": "ForceKeepAlive", "MessageId": uuid.uuid4().hex,
+                                                        "Data": KEEPALIVE_TIMEOUT}).encode())
+            while True:
+                opcode, payload = read_frame(connection)
+                if opcode == 0x8:
+                    with lock:
+                        send_frame(connection, 0x8, payload[:2])
+                    return
+                if opcode == 0x9:
+                    with lock:
+                        send_frame(connection, 0xA, payload)
+                elif opcode == 0x1:
+                    with self.stats_lock:
+                        self.stats["socket_" + json.loads(payload).get("MessageType", "unknown")] += 1
+        except (OSError, ValueError, ConnectionError):
+            pass
+        finally:
+            with self.sockets_lock:
+                self.sockets.pop(connection, None)
+
+    def make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+
+            def log_message(self, format, *args):
+                pass
+
+            def authorized(self, query):
+                header = self.headers.get("Authorization", "") + self.headers.get("X-Emby-Authorization", "")
+                match = re.search(r'Token="([^"]+)"', header)
+                token = (match.group(1) if match else None) or self.headers.get("X-Emby-Token") \
+                    or query.get("api_key") or query.get("ApiKey")
+                return token in server.tokens
+
+            def send_body(self, status, body, content_type, endpoint):
+                server.delay()
+                if endpoint in server.failing:
+                    status, body, content_type = 503, b'{"error": "unavailable"}', "application/json; charset=utf-8"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if server.bandwidth:
+                    chunk = max(1024, int(server.bandwidth / 20))  # About 50ms of data per write
+                    for start in range(0, len(body), chunk):
+                        started = time.perf_counter()
+                        self.wfile.write(body[start:start + chunk])
+                        spare = len(body[start:start + chunk]) / server.bandwidth - (time.perf_counter() - started)
+                        if spare > 0:
+                            time.sleep(spare)
+                else:
+                    self.wfile.write(body)
+                server.count(endpoint, len(body))
+
+            def send_json(self, data, endpoint, status=200):
+                self.send_body(status, json.dumps(data).encode(), "application/json; charset=utf-8", endpoint)
+
+            def do_POST(self):
+                path = urlparse(self.path).path.rstrip("/").lower()
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if path == "/users/authenticatebyname":
+                    try:
+                        username = json.loads(body or b"{}").get("username") or json.loads(body).get("Username")
+                    except ValueError:
+                        username = None
+                    if not username:
+                        self.send_json({"error": "username required"}, "auth", status=400)
+                        return
+                    self.send_json(server.login(username), "auth")
+                else:
+                    self.send_json({}, "other", status=404)
+
+            def do_GET(self):
+                try:
+                    self.route_get()
+                except Exception as e:
+                    print(f"fake_jellyfin: error handling {self.path}: {e}", file=sys.stderr)
+                    self.send_json({"error": str(e)}, "error", status=500)
+
+            def route_get(self):
+                parsed = urlparse(self.path)
+                path = parsed.path.rstrip("/")
+                lower = path.lower()
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                parts = path.strip("/").split("/")
+
+                if lower == "/system/info/public":
+                    self.send_json(server.system_info(), "system_info")
+                    return
+                match = re.fullmatch(r"/items/([0-9a-f]+)/images/(\w+)(?:/\d+)?", lower)
+                if match:
+                    # Images are public, as on a real server
+                    item_id, image_type = parts[1], parts[3]
+                    if item_id not in server.library.items:
+                        self.send_json({}, "image", status=404)
+                        return
+                    data = server.image(item_id, image_type, int(query.get("maxWidth") or 0), int(query.get("maxHeight") or 0))
+                    self.send_body(200, data, "image/jpeg", "image")
+                    return
+
+                if not self.authorized(query):
+                    self.send_json({"error": "unauthorized"}, "unauthorized", status=401)
+                    return
+                if lower == "/socket" and self.headers.get("Upgrade", "").lower() == "websocket":
+                    accept = base64.b64encode(hashlib.sha1(
+                        (self.headers["Sec-WebSocket-Key"] + WEBSOCKET_GUID).encode()).digest()).decode()
+                    self.send_response(101)
+                    self.send_header("Upgrade", "websocket")
+                    self.send_header("Connection", "Upgrade")
+                    self.send_header("Sec-WebSocket-Accept", accept)
+                    self.end_headers()
+                    self.wfile.flush()
+                    server.count("socket", 0)
+                    self.close_connection = True
+                    server.serve_socket(self.connection)
+                elif lower == "/system/info":
+                    self.send_json(server.system_info(), "system_info")
+                elif re.fullmatch(r"/users/[0-9a-f]+/items", lower) or lower == "/items":
+                    self.send_json(server.library.query(query), "items")
+                elif re.fullmatch(r"/users/[0-9a-f]+/items/[0-9a-f]+", lower) or re.fullmatch(r"/items/[0-9a-f]+", lower):
+                    item = server.library.items.get(parts[-1])
+                    if item is None:
+                        self.send_json({}, "item", status=404)
+                    else:
+                        self.send_json(item, "item")
+                elif re.fullmatch(r"/videos/[0-9a-f]+/stream(\.\w+)?", lower):
+                    if parts[1] not in server.library.items:
+                        self.send_json({}, "stream", status=404)
+                        return
+                    self.send_body(200, bytes(server.stream_bytes), "video/x-matroska", "stream")
+                else:
+                    self.send_json({}, "other", status=404)
+
+        return Handler
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Serve a synthetic Jellyfin library for offline benchmarking.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8097)
+    parser.add_argument("--series", type=int, default=50)
+    parser.add_argument("--episodes", type=int, default=20, help="Episodes per series")
+    parser.add_argument("--movies", type=int, default=20)
+    parser.add_argument("--boxsets", type=int, default=len(CHANNEL_NAMES))
+    parser.add_argument("--people", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency, up to this much")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0.0, help="Cap on response bodies (0 = unlimited)")
+    args = parser.parse_args(argv)
+
+    library = SyntheticLibrary(series=args.series, episodes_per_series=args.episodes, movies=args.movies,
+                               boxsets=args.boxsets, people=args.people, seed=args.seed)
+    server = FakeJellyfinServer(library, host=args.host, port=args.port, latency=args.latency_ms / 1000,
+                                jitter=args.jitter_ms / 1000,
+                                bandwidth=args.bandwidth_kbps * 1000 / 8 if args.bandwidth_kbps else None)
+    print(f"Fake Jellyfin serving {len(library.series)} series, {len(library.movies)} movies and "
+          f"{len(library.boxsets)} BoxSets on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
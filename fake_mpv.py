@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Stand-in for mpv's JSON IPC server, for exercising MpvPlayer without a real player
+or a display. Run it in place of mpv (it understands --input-ipc-server and
+ignores every other option), or start a FakeMpvServer in-process:
+
+    server = FakeMpvServer("/tmp/fake-mpv.sock").start()
+    player = MpvPlayer(socket_path="/tmp/fake-mpv.sock")
+    player.play(["http://example/video"])
+    server.commands  # [["loadfile", "http://example/video", "replace"], ...]
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+class FakeMpvServer:
+    """
+    Answers IPC commands the way mpv does and emits the playback events MpvPlayer
+    listens for. loadfile/loadlist "start playing" after playback_delay seconds.
+    """
+
+    def __init__(self, socket_path, playback_delay=0.05):
+        self.socket_path = socket_path
+        self.playback_delay = playback_delay
+        self.commands = []  # Every command received, in order
+        self.properties = {"pause": False, "fullscreen": False, "idle-active": True}
+        self.playlist = []
+        self.observers = {}  # property name -> observe_property id
+        self.clients = []
+        self.lock = threading.Lock()
+        self.server = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen()
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+        return self
+
+    def accept_loop(self):
+        while not self.stopped.is_set():
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.clients.append(client)
+            threading.Thread(target=self.client_loop, args=(client,), daemon=True).start()
+
+    def client_loop(self, client):
+        try:
+            with client.makefile('rb') as stream:
+                for line in stream:
+                    try:
+                        request = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.handle(client, request)
+        except OSError:
+            pass
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def send(self, client, message):
+        try:
+            client.sendall(json.dumps(message).encode() + b"\n")
+        except OSError:
+            pass
+
+    def broadcast(self, message):
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            self.send(client, message)
+
+    def handle(self, client, request):
+        command = request.get("command", [])
+        self.commands.append(command)
+        name = command[0] if command else None
+        reply = {"error": "success", "data": None, "request_id": request.get("request_id", 0)}
+
+        if name == "loadfile":
+            self.playlist = [command[1]]
+            self.schedule_playback()
+        elif name == "loadlist":
+            try:
+                with open(command[1]) as f:
+                    self.playlist = [line.strip() for line in f if line.strip()]
+            except OSError:
+                reply["error"] = "error running command"
+            else:
+                self.schedule_playback()
+        elif name == "set_property":
+            self.properties[command[1]] = command[2]
+        elif name == "get_property":
+            if command[1] in self.properties:
+                reply["data"] = self.properties[command[1]]
+            else:
+                reply["error"] = "property not found"
+        elif name == "observe_property":
+            self.observers[command[2]] = command[1]
+            self.send(client, reply)
+            # mpv reports the current value straight away
+            self.set_property(command[2], self.properties.get(command[2]))
+            return
+        elif name == "stop":
+            self.send(client, reply)
+            self.end_playback(reason="stop")
+            return
+        elif name == "quit":
+            self.send(client, reply)
+            self.stop()
+            return
+        elif name not in ("keybind", "show-text", "playlist-clear"):
+            reply["error"] = "invalid parameter"
+        self.send(client, reply)
+
+    def set_property(self, name, value):
+        """Change a property, telling observers the way mpv does."""
+        self.properties[name] = value
+        if name in self.observers:
+            self.broadcast({"event": "property-change", "id": self.observers[name], "name": name, "data": value})
+
+    def schedule_playback(self):
+        def begin():
+            self.set_property("idle-active", False)
+            self.broadcast({"event": "start-file", "playlist_entry_id": 1})
+            self.broadcast({"event": "file-loaded"})
+            self.broadcast({"event": "playback-restart"})
+
+        threading.Timer(self.playback_delay, begin).start()
+
+    def end_playback(self, reason="eof"):
+        """Simulate the playlist finishing (or being stopped): mpv goes back to idle."""
+        self.broadcast({"event": "end-file", "reason": reason, "playlist_entry_id": 1})
+        self.set_property("idle-active", True)
+        self.broadcast({"event": "idle"})
+
+    def stop(self):
+        """Close every connection and the socket, as if mpv had exited (or crashed)."""
+        self.stopped.set()
+        # The socket goes first: a client restarting mpv as soon as its connection drops
+        # must not have the new mpv's socket removed from under it
+        if self.server is not None:
+            self.server.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+
+def main(argv):
+    socket_path = None
+    for arg in argv:
+        if arg.startswith("--input-ipc-server="):
+            socket_path = arg.split("=", 1)[1]
+    if not socket_path:
+        print("fake_mpv: --input-ipc-server=PATH is required", file=sys.stderr)
+        return 1
+    server = FakeMpvServer(socket_path).start()
+    try:
+        while not server.stopped.is_set():
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,78 +2,209 @@ import random
 import json
 import os
 import argparse
-from jellyfin_utils import get_shows, USER_ID, client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from jellyfin_utils import (get_shows, jellyfin_get, get_episode_listing, load_image, load_cast_image,
+                            JELLYFIN_URL)
+from metadata_service import EPISODE_FIELDS
+from schedule_store import save_schedule, write_atomically, artwork_store, THUMB_SIZE, POSTER_SIZE, CAST_SIZE, CAST_PER_ROW
+from server_calls import server, ServerUnavailable
+from log_utils import get_logger, LogSummary
+
+log = get_logger("schedule")
 
 # Cache file path
 CACHE_FILE = "boxset_cache.json"
+PRECOMPUTE_WORKERS = 4  # Requests the precompute job has in flight at once
+# BoxSet listings fetched at once. Each is one round trip, so a refresh takes about
+# (BoxSets / workers) round trips instead of one per BoxSet.
+BOXSET_CRAWL_WORKERS = int(os.environ.get("WHATSON_BOXSET_WORKERS", "8"))
+CHECKPOINT_EVERY = 10  # BoxSets crawled between checkpoints of a refresh
+PROGRESS_INTERVAL = 2.0  # Seconds between progress lines while crawling
+REFRESH_RESUME_HOURS = 24  # A checkpoint older than this is started over rather than resumed
+PRECOMPUTE_INTERVAL_MINUTES = 60  # How often --daemon precomputes when the server reports no changes
+CHANGE_SETTLE_SECONDS = 30  # How long --daemon waits after a change notification before precomputing
 
-def load_cached_boxsets():
-    """Load cached BoxSet data from a file."""
+class LazyNames:
+    """The names of a list of items, only joined if a log line actually uses them."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def __str__(self):
+        return str([item['Name'] for item in self.items])
+
+def read_cache_file():
+    """The BoxSet cache file's contents, or {} if there is none or it cannot be read."""
     if os.path.exists(CACHE_FILE):
         try:
             with open(CACHE_FILE, 'r') as f:
-                cache = json.load(f)
-                print(f"Loaded {len(cache['boxsets'])} BoxSets from cache.")
-                return cache['boxsets'], cache['item_to_boxsets']
+                return json.load(f)
         except Exception as e:
-            print(f"Error loading cache: {e}")
-    return None, None
+            log.error("Error loading cache: %s", e)
+    return {}
 
-def save_boxset_cache(boxsets, item_to_boxsets):
-    """Save BoxSet data to a cache file."""
-    cache = {
-        'boxsets': boxsets,
-        'item_to_boxsets': item_to_boxsets
-    }
+def load_cached_boxsets():
+    """Load cached BoxSet data from a file."""
+    cache = read_cache_file()
+    if 'boxsets' not in cache or 'item_to_boxsets' not in cache:
+        return None, None
+    log.info("Loaded %d BoxSets from cache.", len(cache['boxsets']))
+    return cache['boxsets'], cache['item_to_boxsets']
+
+def save_boxset_cache(boxsets, item_to_boxsets, refresh=None):
+    """
+    Save BoxSet data to a cache file. refresh is the checkpoint of a refresh in
+    progress (see fetch_boxsets); boxsets and item_to_boxsets may be None while
+    a first refresh has not finished.
+    """
+    cache = {'refresh': refresh} if refresh is not None else {}
+    if boxsets is not None:
+        cache.update(boxsets=boxsets, item_to_boxsets=item_to_boxsets)
     try:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(cache, f, indent=2)
-        print(f"Saved {len(boxsets)} BoxSets to cache.")
+        # Written whole or not at all, since a refresh may be interrupted at any point
+        write_atomically(CACHE_FILE, lambda f: f.write(json.dumps(cache, indent=2).encode()))
+        if refresh is None:
+            log.info("Saved %d BoxSets to cache.", len(boxsets))
     except Exception as e:
-        print(f"Error saving cache: {e}")
+        log.error("Error saving cache: %s", e)
+
+def fetch_boxset_members(boxset_id):
+    """The shows and movies in one BoxSet (Id and Name only)."""
+    return server.call("boxsets", jellyfin_get, "Items", {
+        'ParentId': boxset_id,
+        'Recursive': True,
+        'IncludeItemTypes': 'Series,Movie',
+        'Fields': 'Name'
+    })['Items']
+
+def update_boxset_membership(item_to_boxsets, boxset_name, member_ids):
+    """
+    Make boxset_name the collection of exactly member_ids (none if the BoxSet was
+    deleted) in item_to_boxsets, in place. Returns the ids whose collections changed.
+    """
+    member_ids = set(member_ids)
+    changed = set()
+    for item_id, collections in item_to_boxsets.items():
+        if boxset_name in collections and item_id not in member_ids:
+            collections.remove(boxset_name)
+            changed.add(item_id)
+    for item_id in member_ids:
+        collections = item_to_boxsets.setdefault(item_id, ["Random"])
+        if boxset_name not in collections:
+            collections.insert(0, boxset_name)
+            changed.add(item_id)
+    return changed
+
+def crawl_boxsets(boxsets, members, checkpoint=None):
+    """
+    Fetch the members of every BoxSet not already in members (BoxSet id -> member ids),
+    BOXSET_CRAWL_WORKERS at a time, adding them to members as they arrive. Progress is
+    logged every few seconds. checkpoint(members), if given, is called every
+    CHECKPOINT_EVERY BoxSets and when the crawl stops early, so an interrupted crawl
+    can resume from it. Returns the BoxSets that could not be fetched.
+    """
+    todo = [boxset for boxset in boxsets if boxset['Id'] not in members]
+    if len(todo) < len(boxsets):
+        log.info("Resuming the BoxSet crawl: %d of %d BoxSets already done", len(boxsets) - len(todo), len(boxsets))
+    failed = []
+    started = last_report = time.perf_counter()
+    unsaved = 0
+    pool = ThreadPoolExecutor(max_workers=BOXSET_CRAWL_WORKERS)
+    try:
+        futures = {pool.submit(fetch_boxset_members, boxset['Id']): boxset for boxset in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            boxset = futures[future]
+            try:
+                boxset_items = future.result()
+            except Exception as e:
+                log.error("Error fetching the items of BoxSet %s: %s", boxset['Name'], e)
+                failed.append(boxset)
+                continue
+            log.debug("BoxSet %s contains %d items: %s", boxset['Name'], len(boxset_items), LazyNames(boxset_items))
+            members[boxset['Id']] = [item['Id'] for item in boxset_items]
+            unsaved += 1
+            if checkpoint is not None and unsaved >= CHECKPOINT_EVERY:
+                checkpoint(members)
+                unsaved = 0
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL or done == len(todo):
+                last_report = now
+                log.info("Crawled %d/%d BoxSets (%d failed), %.1f per second",
+                         done, len(todo), len(failed), done / max(now - started, 1e-6))
+    finally:
+        # On an interrupt, BoxSets not started yet are dropped rather than waited for
+        pool.shutdown(wait=False, cancel_futures=True)
+        if checkpoint is not None and unsaved and len(members) < len(boxsets):
+            checkpoint(members)
+    return failed
+
+def map_items_to_boxsets(boxsets, members):
+    """item_to_boxsets from crawled members: each item's BoxSet names in BoxSet order, then "Random"."""
+    item_to_boxsets = {}
+    for boxset in boxsets:
+        for item_id in members.get(boxset['Id'], []):
+            item_to_boxsets.setdefault(item_id, []).append(boxset['Name'])
+    # Add "Random" as a possible channel for every item
+    for collections in item_to_boxsets.values():
+        collections.append("Random")
+    return item_to_boxsets
 
-def fetch_boxsets():
-    """Fetch all BoxSets and their items from Jellyfin."""
+def load_refresh_checkpoint(boxsets):
+    """
+    (started_at, members) of an unfinished refresh from the cache file, if it began less
+    than REFRESH_RESUME_HOURS ago; (None, {}) otherwise. Only BoxSets still in boxsets are
+    taken from it; changes to them since are picked up by the next refresh or by live updates.
+    """
+    refresh = read_cache_file().get('refresh') or {}
+    started_at = refresh.get('started_at')
+    if started_at is None or time.time() - started_at > REFRESH_RESUME_HOURS * 3600:
+        return None, {}
+    current_ids = {boxset['Id'] for boxset in boxsets}
+    members = {boxset_id: ids for boxset_id, ids in (refresh.get('members') or {}).items() if boxset_id in current_ids}
+    return started_at, members
+
+def fetch_boxsets(previous_boxsets=None, previous_item_to_boxsets=None):
+    """
+    Fetch all BoxSets and their items from Jellyfin. Progress is checkpointed to the
+    cache file, next to the previous BoxSet data (kept until the refresh completes),
+    and a refresh that was interrupted resumes from its checkpoint.
+
+    Returns (boxsets, item_to_boxsets, complete). When some BoxSets could not be
+    crawled, item_to_boxsets is built from the rest and complete is False.
+    """
     try:
         # Fetch all BoxSets for the user
-        boxsets = client.jellyfin.user_items(params={
+        boxsets = server.call("boxsets", jellyfin_get, "Users/{UserId}/Items", {
             'Recursive': True,
             'IncludeItemTypes': 'BoxSet',
             'Fields': 'Name'
         })['Items']
-        print(f"Found {len(boxsets)} BoxSets: {[boxset['Name'] for boxset in boxsets]}")
-
-        # Map items to their BoxSets
-        item_to_boxsets = {}
-        for boxset in boxsets:
-            boxset_id = boxset['Id']
-            boxset_items = client.jellyfin.items(params={
-                'ParentId': boxset_id,
-                'Recursive': True,
-                'IncludeItemTypes': 'Series,Movie',
-                'Fields': 'Name'
-            })['Items']
-            print(f"BoxSet {boxset['Name']} contains {len(boxset_items)} items: {[item['Name'] for item in boxset_items]}")
-            for item in boxset_items:
-                item_id = item['Id']
-                if item_id not in item_to_boxsets:
-                    item_to_boxsets[item_id] = []
-                item_to_boxsets[item_id].append(boxset['Name'])
-
-        # Add "Random" as a possible channel for every item
-        for item_id in item_to_boxsets:
-            if "Random" not in item_to_boxsets[item_id]:
-                item_to_boxsets[item_id].append("Random")
-
-        return boxsets, item_to_boxsets
     except Exception as e:
-        print(f"Error fetching BoxSets: {e}")
-        return [], {}
+        log.error("Error fetching BoxSets: %s", e)
+        return [], {}, False
+    log.info("Found %d BoxSets", len(boxsets))
+    log.debug("BoxSets: %s", LazyNames(boxsets))
+
+    started_at, members = load_refresh_checkpoint(boxsets)
+    if started_at is None:
+        started_at = time.time()  # Every checkpoint of this refresh carries when it began
 
-def fetch_all_items():
-    """Fetch all shows and movies from Jellyfin."""
-    print("Fetching all content...")
-    return get_shows()
+    def checkpoint(members):
+        save_boxset_cache(previous_boxsets, previous_item_to_boxsets,
+                          refresh={'started_at': started_at, 'members': dict(members)})
+
+    failed = crawl_boxsets(boxsets, members, checkpoint)
+    if failed:
+        log.warning("%d BoxSets could not be crawled; the next refresh resumes with them.", len(failed))
+    return boxsets, map_items_to_boxsets(boxsets, members), not failed
+
+def fetch_all_items(allow_snapshot=True):
+    """Fetch all shows and movies from Jellyfin (or its library snapshot, with allow_snapshot)."""
+    log.info("Fetching all content...")
+    return get_shows(allow_snapshot)
 
 def get_collections_for_item(item_id, item_to_boxsets):
     """Get collections for an item using the cached item-to-boxsets mapping."""
@@ -81,16 +212,16 @@ def get_collections_for_item(item_id, item_to_boxsets):
     # Ensure "Random" is always in the list
     if "Random" not in collections:
         collections.append("Random")
-    print(f"Item {item_id} possible channels: {collections}")
+    log.debug("Item %s possible channels: %s", item_id, collections)
     return collections
 
 def assign_channel(collections):
     """Randomly assign a channel from the list of possible channels."""
     if not collections:
-        print("No channels found (should not happen, 'Random' should always be present).")
+        log.warning("No channels found (should not happen, 'Random' should always be present).")
         return "Random"
     chosen_channel = random.choice(collections)  # Randomly select one channel
-    print(f"Randomly assigned channel: {chosen_channel}")
+    log.debug("Randomly assigned channel: %s", chosen_channel)
     return chosen_channel
 
 def order_content(all_items, channel_assignments):
@@ -125,54 +256,209 @@ def order_content(all_items, channel_assignments):
 
     return ordered_list
 
-def main(refresh_cache=False):
-    # Load cached BoxSet data if available and not refreshing
-    if not refresh_cache:
-        cached_boxsets, cached_item_to_boxsets = load_cached_boxsets()
-    else:
-        cached_boxsets, cached_item_to_boxsets = None, None
+def assign_channels(all_items, item_to_boxsets):
+    """Assign each item one of its collections as its channel, preferring a real collection over Random."""
+    channel_assignments = {}
+    summary = LogSummary(log, "Assigned channels")
+    for item in all_items:
+        collections = get_collections_for_item(item['Id'], item_to_boxsets)
+        non_random_channels = [channel for channel in collections if channel != "Random"]
+        if non_random_channels:
+            selected_channel = random.choice(non_random_channels)
+        else:
+            selected_channel = "Random"
+        channel_assignments[item['Id']] = selected_channel
+        summary.add(selected_channel, "Assigned channel for %s (ID: %s): %s from %s",
+                    item.get('Name', 'Unknown'), item['Id'], selected_channel, collections)
+    summary.log()
+    return channel_assignments
+
+def schedule_content(all_items, channel_assignments, item_to_boxsets, chunk_size=5):
+    """
+    Order the content list (randomized order, max one channel per group of 5), then
+    move items to Random wherever a chunk of 5 still repeats a channel and re-order.
+    channel_assignments is updated in place.
+    """
+    ordered_shows = order_content(all_items, channel_assignments)
+    summary = LogSummary(log, "Moved to Random to break up repeated channels")
+
+    # Post-process to ensure no more than one instance of a channel per 5 entries
+    for i in range(0, len(ordered_shows), chunk_size):
+        chunk = ordered_shows[i:i + chunk_size]
+        chunk_channels = [channel_assignments[show['Id']] for show in chunk]
+        channel_counts = {}
+        for channel in chunk_channels:
+            channel_counts[channel] = channel_counts.get(channel, 0) + 1
+        duplicates = {channel: count for channel, count in channel_counts.items() if count > 1 and channel != "Random"}
+        if duplicates:
+            log.debug("Found duplicate channels in chunk %d: %s", i // chunk_size, duplicates)
+            for channel, count in duplicates.items():
+                for j, show in enumerate(chunk):
+                    if channel_assignments[show['Id']] == channel and count > 1:
+                        collections = get_collections_for_item(show['Id'], item_to_boxsets)
+                        if "Random" in collections:
+                            channel_assignments[show['Id']] = "Random"
+                            summary.add(channel, "Reassigned %s (ID: %s) to Random to resolve duplicate %s",
+                                        show.get('Name', 'Unknown'), show['Id'], channel)
+                            count -= 1
+            ordered_shows = order_content(all_items, channel_assignments)
+    summary.log()
+    return ordered_shows
+
+def sync_boxsets(all_items, refresh_cache=False):
+    """
+    The BoxSets and item-to-BoxSets mapping: from the cache file unless refresh_cache,
+    fetched otherwise, and completed for items the cache does not know yet.
+    """
+    cached_boxsets, cached_item_to_boxsets = load_cached_boxsets()
 
     # Fetch BoxSets if cache is missing or refresh is requested
-    if cached_boxsets is None or cached_item_to_boxsets is None:
-        boxsets, item_to_boxsets = fetch_boxsets()
-        save_boxset_cache(boxsets, item_to_boxsets)
+    crawled = cached_boxsets is None or refresh_cache
+    if crawled:
+        boxsets, item_to_boxsets, complete = fetch_boxsets(cached_boxsets, cached_item_to_boxsets)
+        crawl_complete = complete
+        if complete:
+            save_boxset_cache(boxsets, item_to_boxsets)
+        elif cached_boxsets is not None:
+            log.warning("Keeping the previous BoxSet cache until a refresh completes.")
+            boxsets, item_to_boxsets = cached_boxsets, cached_item_to_boxsets
+            complete = True
     else:
         boxsets, item_to_boxsets = cached_boxsets, cached_item_to_boxsets
+        complete = True
 
-    # Fetch all content
-    all_items = fetch_all_items()
-
-    # Check for uncached items
+    # Check for uncached items. Every BoxSet is crawled once for all of them, rather than once per item,
+    # except those an unfinished refresh already crawled
     uncached_items = [item for item in all_items if item['Id'] not in item_to_boxsets]
     if uncached_items:
-        print(f"Found {len(uncached_items)} uncached items. Fetching their collections...")
+        if crawled:
+            # The crawl above already listed every BoxSet it could, so these items are in none of them
+            uncached_mapping, failed = {}, not crawl_complete
+        else:
+            log.info("Found %d uncached items. Fetching their collections...", len(uncached_items))
+            _, members = load_refresh_checkpoint(boxsets)
+            failed = crawl_boxsets(boxsets, members)
+            uncached_mapping = map_items_to_boxsets(boxsets, members)
         for item in uncached_items:
-            item_id = item['Id']
-            try:
-                # Fetch the item's details to check for collection membership
-                item_details = client.jellyfin.get_item(item_id)
-                print(f"Fetching collections for uncached item {item_id}: {item_details.get('Name', 'Unknown')}")
-                collections = []
-                for boxset in boxsets:
-                    boxset_id = boxset['Id']
-                    boxset_items = client.jellyfin.items(params={
-                        'ParentId': boxset_id,
-                        'Recursive': True,
-                        'IncludeItemTypes': 'Series,Movie',
-                        'Fields': 'Name'
-                    })['Items']
-                    if any(item['Id'] == item_id for item in boxset_items):
-                        collections.append(boxset['Name'])
-                        print(f"Item {item_id} found in BoxSet: {boxset['Name']}")
-                # Always add "Random" as a possible channel
-                if "Random" not in collections:
-                    collections.append("Random")
-                item_to_boxsets[item_id] = collections
-            except Exception as e:
-                print(f"Error fetching collections for item {item_id}: {e}")
-                item_to_boxsets[item_id] = ["Random"]
-        # Update the cache with new items
-        save_boxset_cache(boxsets, item_to_boxsets)
+            collections = uncached_mapping.get(item['Id'], ["Random"])
+            log.debug("Collections for uncached item %s: %s", item.get('Name', 'Unknown'), collections)
+            item_to_boxsets[item['Id']] = collections
+        # Update the cache with new items; if a BoxSet failed they are looked up again next time
+        if complete and not failed:
+            save_boxset_cache(boxsets, item_to_boxsets)
+    return boxsets, item_to_boxsets
+
+def fetch_episode_listings(all_items):
+    """Episode listings of every series, fetched PRECOMPUTE_WORKERS at a time. Series that fail are left out."""
+    series_ids = [item['Id'] for item in all_items if item.get('Type') == 'Series']
+    def fetch(series_id):
+        try:
+            return series_id, get_episode_listing(series_id, EPISODE_FIELDS, endpoint="sync", allow_stale=False)
+        except Exception as e:
+            log.error("Error fetching episodes for series %s: %s", series_id, e)
+            return series_id, None
+    with ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS) as pool:
+        listings = {series_id: episodes for series_id, episodes in pool.map(fetch, series_ids) if episodes is not None}
+    log.info("Fetched episode listings for %d of %d series", len(listings), len(series_ids))
+    return listings
+
+def render_artwork(all_items):
+    """
+    Pre-render every row's thumb, poster and cast photos into the artwork store,
+    skipping ones already there. Returns the store names of all of them.
+    """
+    renderers = {}  # store file name -> function producing the image
+    for item in all_items:
+        for image_type, (width, height) in (('Thumb', THUMB_SIZE), ('Primary', POSTER_SIZE)):
+            tag = (item.get('ImageTags') or {}).get(image_type)
+            if tag:
+                name = artwork_store.name(item['Id'], image_type, tag, width, height)
+                renderers[name] = partial(load_image, item, width, height, image_type)
+        for person in item.get('People', [])[:CAST_PER_ROW]:
+            if person.get('Id') and person.get('PrimaryImageTag'):
+                name = artwork_store.name(person['Id'], 'Primary', person['PrimaryImageTag'], *CAST_SIZE)
+                renderers[name] = partial(load_cast_image, person, *CAST_SIZE)
+
+    missing = [name for name in renderers if not artwork_store.contains(name)]
+    def render(name):
+        img = renderers[name]()
+        if img is None:
+            return False
+        artwork_store.save(name, img)
+        return True
+    with ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS) as pool:
+        rendered = sum(pool.map(render, missing))
+    log.info("Artwork: %d already stored, %d rendered, %d could not be loaded",
+             len(renderers) - len(missing), rendered, len(missing) - rendered)
+    return set(renderers)
+
+def precompute(refresh_cache=False):
+    """
+    Do everything the app would otherwise do at startup: sync the library, BoxSets and
+    episode listings, assign channels, order the schedule and pre-render the artwork,
+    then write it all to the store the app reads. Returns False if nothing was written.
+    """
+    started = time.perf_counter()
+    try:
+        # Never from the library snapshot: that would restamp old data as a fresh schedule
+        all_items = fetch_all_items(allow_snapshot=False)
+    except ServerUnavailable as e:
+        log.warning("The server is unreachable (%s), keeping the previous precomputed schedule.", e)
+        return False
+    boxsets, item_to_boxsets = sync_boxsets(all_items, refresh_cache)
+    channel_assignments = assign_channels(all_items, item_to_boxsets)
+    ordered_shows = schedule_content(all_items, channel_assignments, item_to_boxsets)
+    episodes = fetch_episode_listings(all_items)
+    artwork = render_artwork(all_items)
+    save_schedule({
+        'server': JELLYFIN_URL,
+        'shows': all_items,
+        'channel_assignments': channel_assignments,
+        'order': [item['Id'] for item in ordered_shows],
+        'boxsets': boxsets,
+        'item_to_boxsets': item_to_boxsets,
+        'episodes': episodes,
+    })
+    removed = artwork_store.prune(artwork)
+    log.info("Precomputed %d shows in %.1fs (%d stale artwork files removed)",
+             len(all_items), time.perf_counter() - started, removed)
+    return True
+
+def run_daemon(interval, refresh_cache=False):
+    """
+    Precompute now, then again every interval seconds, and soon after the server
+    reports a change to the library, watch state or collections. Runs until killed.
+    """
+    # live_updates imports this module, so it can only be imported once this one has loaded
+    from live_updates import NotificationListener
+    changed = threading.Event()
+    boxsets_changed = threading.Event()
+
+    def on_changes(changes):
+        if changes.boxsets:
+            boxsets_changed.set()
+        changed.set()
+
+    listener = None
+    while True:
+        try:
+            precompute(refresh_cache or boxsets_changed.is_set())
+        except Exception as e:
+            log.error("Precompute failed: %s", e)
+        refresh_cache = False
+        boxsets_changed.clear()
+        if listener is None:
+            listener = NotificationListener(on_changes, boxsets=load_cached_boxsets()[0] or [])
+            listener.start()
+        if changed.wait(interval):
+            # A library scan sends a burst of messages; let it finish
+            time.sleep(CHANGE_SETTLE_SECONDS)
+        changed.clear()
+
+def main(refresh_cache=False):
+    # Fetch all content
+    all_items = fetch_all_items()
+    boxsets, item_to_boxsets = sync_boxsets(all_items, refresh_cache)
 
     # Assign channels
     channel_assignments = {}
@@ -194,6 +480,17 @@ if __name__ == "__main__":
     # Add command-line argument to refresh cache
     parser = argparse.ArgumentParser(description="Generate a list of shows with assigned channels.")
     parser.add_argument('--refresh-cache', action='store_true', help="Force refresh of the BoxSet cache.")
+    parser.add_argument('--precompute', action='store_true',
+                        help="Write the schedule, episode listings and artwork to the store the app starts from, once.")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep the store up to date: precompute now, on server changes and every --interval minutes.")
+    parser.add_argument('--interval', type=float, default=PRECOMPUTE_INTERVAL_MINUTES,
+                        help="Minutes between --daemon runs when nothing changes.")
     args = parser.parse_args()
 
-    main(refresh_cache=args.refresh_cache)
\ No newline at end of file
+    if args.daemon:
+        run_daemon(args.interval * 60, refresh_cache=args.refresh_cache)
+    elif args.precompute:
+        raise SystemExit(0 if precompute(refresh_cache=args.refresh_cache) else 1)
+    else:
+        main(refresh_cache=args.refresh_cache)
\ No newline at end of file
@@ -0,0 +1,56 @@
+# image_cache.py
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+IMAGE_CACHE_BYTES = int(os.environ.get("WHATSON_IMAGE_CACHE_MB", "64")) * 1024 * 1024
+
+class ImageCache:
+    """
+    Downloaded image bytes by URL, least recently used dropped first once the
+    total passes max_bytes. Image URLs carry the image tag, which changes when
+    the artwork does, so an entry never goes stale. Rows rebuilt after scrolling
+    back, or while the server is unreachable, reuse the bytes instead of fetching.
+    """
+
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.images = OrderedDict()  # url -> bytes
+        self.total_bytes = 0
+
+    def get(self, url):
+        with self.lock:
+            data = self.images.get(url)
+            if data is not None:
+                self.images.move_to_end(url)
+            return data
+
+    def put(self, url, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.images.pop(url, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self.images[url] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, dropped = self.images.popitem(last=False)
+                self.total_bytes -= len(dropped)
+
+    def drop_item(self, item_id, keep_tags=()):
+        """
+        Drop an item's images, except those whose tag is in keep_tags (the artwork
+        the item still has). Used when the server reports the item changed or went away.
+        """
+        marker = f"/Items/{item_id}/Images/"
+        with self.lock:
+            for url in [url for url in self.images if marker in url]:
+                tags = parse_qs(urlsplit(url).query).get('tag', [])
+                if tags and tags[0] in keep_tags:
+                    continue
+                self.total_bytes -= len(self.images.pop(url))
+
+image_cache = ImageCache()
@@ -0,0 +1,52 @@
+# image_utils.py
+import io
+
+from PIL import Image
+
+def open_image(data, width, height):
+    """
+    Open encoded image bytes for display in a width x height slot.
+
+    JPEGs are put in draft mode first, so libjpeg decodes straight to the smallest
+    1/2, 1/4 or 1/8 scale that still covers the slot instead of the full image.
+    """
+    img = Image.open(io.BytesIO(data))
+    if img.format == 'JPEG':
+        img.draft('RGB', (width, height))
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGB')
+    return img
+
+def scale_image(img, size):
+    """
+    Scale an image to exactly size. Returns the image untouched when it is already
+    that size, and uses reduce() for whole-factor shrinking so only the last small
+    step needs a LANCZOS resample.
+    """
+    if img.size == size:
+        return img
+    factor = min(img.width // size[0], img.height // size[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+        if img.size == size:
+            return img
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+def decode_to_height(data, height):
+    """Decode an image scaled to the given height, keeping its aspect ratio."""
+    img = open_image(data, 1, height)
+    new_width = int(height * img.width / img.height)
+    return scale_image(img, (new_width, height))
+
+def decode_to_box(data, width, height):
+    """Decode an image fitted inside width x height and centred on a black canvas of exactly that size."""
+    img = open_image(data, width, height)
+    if img.mode == 'RGBA':
+        img = img.convert('RGB')
+    if img.size == (width, height):
+        return img
+    scale = min(width / img.width, height / img.height, 1.0)
+    fitted = scale_image(img, (max(1, round(img.width * scale)), max(1, round(img.height * scale))))
+    canvas = Image.new('RGB', (width, height), color='#000000')
+    canvas.paste(fitted, ((width - fitted.width) // 2, (height - fitted.height) // 2))
+    return canvas
@@ -1,140 +1,351 @@
 from jellyfin_apiclient_python import JellyfinClient
+from jellyfin_apiclient_python.api import info
+from jellyfin_apiclient_python.exceptions import HTTPException
+import json
+import logging
+import os
+import threading
 import requests
-import io
 from PIL import Image, ImageTk
 import webbrowser
 import random
-import subprocess
-import os
-import tempfile
 from screeninfo import get_monitors
 
+from blurhash_utils import get_preview_image
+from image_utils import decode_to_height, decode_to_box
+from episode_cache import episode_cache
+from render_trace import tracer
+from audio_devices import get_non_default_audio_device
+from mpv_player import player, MpvError
+from stream_selection import stream_selector
+from server_calls import server, single_flight, request_key, url_key, describe, ServerUnavailable, CONNECT_TIMEOUT
+from image_cache import image_cache
+from schedule_store import artwork_store
+from log_utils import get_logger, redact
+
+log = get_logger("jellyfin")
+
 # Jellyfin setup
 client = JellyfinClient()
 client.config.app('Whatson', '1.0', 'MomDevice', 'MomDeviceId')
 client.config.data['auth.ssl'] = False
-JELLYFIN_URL = 'http://localhost:8096'
+# Point at another server (e.g. fake_jellyfin.py) with WHATSON_JELLYFIN_URL
+JELLYFIN_URL = os.environ.get("WHATSON_JELLYFIN_URL", 'http://localhost:8096')
+# Last library listing that loaded, used when the server cannot be reached at startup
+LIBRARY_CACHE_FILE = os.environ.get("WHATSON_LIBRARY_CACHE", "library_cache.json")
+
+# Shared session so image downloads reuse keep-alive connections to the server
+http_session = requests.Session()
 
-print("Connecting to server:", JELLYFIN_URL)
-server_info = client.auth.connect_to_server({'address': JELLYFIN_URL})
-print("Server info:", server_info)
+LOGIN_TIMEOUT = (CONNECT_TIMEOUT, 10)  # Connect and read timeouts for finding the server and logging in
+# The client logs a full traceback each time the server cannot be reached; server.call reports that itself
+logging.getLogger("JELLYFIN.jellyfin_apiclient_python.connection_manager").setLevel(logging.CRITICAL)
 
-# Attempt to get server ID from server_info
+# Filled in by log_in(). Nothing connects at import, so the app can start from its
+# snapshots while the server is down and log in on the first server call.
 server_id = None
-if 'Id' in server_info:
-    server_id = server_info['Id']
-else:
-    # Fallback: Check credentials for server ID
-    creds = client.auth.credentials.get()
-    print("Credentials after connect:", creds)
-    if 'Servers' in creds and creds['Servers']:
-        server_id = creds['Servers'][0].get('Id')
-    if not server_id:
-        raise Exception("Failed to connect to server. Server ID not found in server info or credentials.")
-print("Server ID:", server_id)
-
-print("Attempting login...")
-credentials = client.auth.login(JELLYFIN_URL, 'Vicki', 'mom')
-if not credentials or 'User' not in credentials or 'AccessToken' not in credentials:
-    raise Exception("Failed to authenticate. Check server URL, username, and password.")
-USER_ID = credentials['User']['Id']
-print("Logged in as user:", USER_ID)
-print("Login response:", credentials)
-
-# Set up client configuration for authentication
-client.config.data['auth.server'] = JELLYFIN_URL       # Server URL
-client.config.data['auth.user-id'] = USER_ID           # User ID
-client.config.data['auth.server-id'] = server_id       # Server ID
-client.config.data['auth.token'] = credentials['AccessToken']  # Access token from login
-
-print("Client configuration after setup:", client.config.data)
-print("Credentials after setup:", client.auth.credentials.get())
+USER_ID = None
+credentials = None
+
+def connect(timeout=LOGIN_TIMEOUT):
+    """Look the server up and record its ID. Raises HTTPException('ServerUnreachable') if it does not answer."""
+    global server_id
+    log.info("Connecting to server: %s", JELLYFIN_URL)
+    client.auth.API.default_timeout = timeout  # Used for the server's public info
+    server_info = client.auth.connect_to_server({'address': JELLYFIN_URL})
+    log.debug("Server info: %s", redact(server_info))
+
+    # Attempt to get server ID from server_info
+    found_id = server_info.get('Id')
+    if not found_id:
+        # Fallback: Check credentials for server ID
+        creds = client.auth.credentials.get()
+        log.debug("Credentials after connect: %s", redact(creds))
+        if 'Servers' in creds and creds['Servers']:
+            found_id = creds['Servers'][0].get('Id')
+    if not found_id:
+        # connect_to_server logs and swallows the connection error itself
+        raise HTTPException("ServerUnreachable", f"No server info from {JELLYFIN_URL}")
+    server_id = found_id
+    client.config.data['auth.server'] = JELLYFIN_URL       # Server URL
+    client.config.data['auth.server-id'] = server_id       # Server ID
+    log.info("Server ID: %s", server_id)
+
+def log_in(timeout=LOGIN_TIMEOUT):
+    """Connect to the server, then log in and set up the client with the token."""
+    global credentials, USER_ID
+    # The client's login answers {} both for bad credentials and for a server that is down;
+    # connecting first tells the two apart, since it raises for the latter
+    connect(timeout)
+    log.info("Attempting login...")
+    new_credentials = client.auth.login(JELLYFIN_URL, 'Vicki', 'mom')
+    if not new_credentials or 'User' not in new_credentials or 'AccessToken' not in new_credentials:
+        raise Exception("Failed to authenticate. Check server URL, username, and password.")
+    credentials = new_credentials
+    client.config.data['auth.user-id'] = credentials['User']['Id']   # User ID
+    client.config.data['auth.token'] = credentials['AccessToken']  # Access token from login
+    USER_ID = credentials['User']['Id']
+    log.info("Logged in as user: %s", USER_ID)
+    log.debug("Login response: %s", redact(credentials))
+    log.debug("Client configuration after setup: %s", redact(client.config.data))
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Credentials after setup: %s", redact(client.auth.credentials.get()))
+
+def ensure_logged_in(timeout=LOGIN_TIMEOUT):
+    """Log in unless that has been done. Threads arriving while a login is under way wait for it."""
+    if USER_ID is None:
+        single_flight.do(("login", JELLYFIN_URL), lambda: log_in(timeout))
+
+def log_in_in_background():
+    """Log in on a worker thread at startup, so the first server call does not pay for it."""
+    def run():
+        try:
+            server.call("login", ensure_logged_in)
+        except Exception as e:
+            log.warning("Could not log in yet (%s); retrying on the next server call.", describe(e))
+
+    threading.Thread(target=run, name="login", daemon=True).start()
 
 def reauthenticate():
     """Re-authenticate with Jellyfin if the token is invalid."""
-    global credentials, USER_ID
     try:
-        print("Attempting to re-authenticate with Jellyfin...")
-        credentials = client.auth.login(JELLYFIN_URL, 'Vicki', 'mom')
-        if not credentials or 'User' not in credentials or 'AccessToken' not in credentials:
-            raise Exception("Failed to re-authenticate. Check server URL, username, and password.")
-        USER_ID = credentials['User']['Id']
-        client.config.data['auth.user-id'] = USER_ID
-        client.config.data['auth.token'] = credentials['AccessToken']
-        print("Successfully re-authenticated with Jellyfin.")
+        log.info("Attempting to re-authenticate with Jellyfin...")
+        log_in()
+        log.info("Successfully re-authenticated with Jellyfin.")
     except Exception as e:
-        print(f"Error during re-authentication: {e}")
+        log.error("Error during re-authentication: %s", e)
         raise
 
-def get_shows():
-    print("Fetching shows for user:", USER_ID)
+server.on_unauthorized = reauthenticate
+
+def jellyfin_get(handler, params=None, timeout=None):
+    """
+    GET a Jellyfin API handler ({UserId} is filled in by the client) in a single attempt,
+    logging in first if that has not happened yet. Call it through server.call, which
+    owns timeouts, retries and the circuit breaker.
+    """
+    ensure_logged_in(timeout)
+    response = client.http.request({'type': 'GET', 'handler': handler, 'params': params or {},
+                                    'timeout': timeout, 'retry': 0})
+    if response is None:
+        # The client logs and swallows 500 responses
+        raise HTTPException(500, f"Empty response for {handler}")
+    return response
+
+def get_item(item_id, endpoint="item"):
+    """Fetch one item with its media sources. Raises ServerUnavailable if the server cannot answer."""
+    handler, params = f"Users/{{UserId}}/Items/{item_id}", {'Fields': info()}
+    # Only calls with the same retry policy share a fetch: a playlist call must not inherit
+    # the failure of a single-attempt item call
+    return single_flight.do(request_key("item", handler, params) + (endpoint,),
+                            lambda: server.call(endpoint, jellyfin_get, handler, params))
+
+def get_episode_listing(series_id, fields, endpoint="episodes", allow_stale=True):
+    """
+    All episodes of a series in play order. When the server cannot answer, the last
+    listing seen for the series is used (with allow_stale, even one invalidated since);
+    None if there is none.
+    """
+    params = {
+        'ParentId': series_id,
+        'Recursive': True,
+        'IncludeItemTypes': 'Episode',
+        'SortBy': 'ParentIndexNumber,IndexNumber',
+        'SortOrder': 'Ascending',
+        'Fields': fields
+    }
+    def fetch():
+        response = server.call(endpoint, jellyfin_get, "Users/{UserId}/Items", params, fallback=lambda: None)
+        if response is not None:
+            tracer.add_json_request(response)
+        return response
+    # A row being built, a prefetch and an open menu often want the same listing at once
+    response = single_flight.do(request_key("episodes", "Users/{UserId}/Items", params) + (endpoint,), fetch)
+    if response is None:
+        return episode_cache.get_series(series_id, allow_stale=allow_stale)
+    episodes = response.get('Items', [])
+    episode_cache.add_series(series_id, episodes)
+    return episodes
+
+def http_get(url, timeout=None):
+    response = http_session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+def fetch_image(url):
+    """Image bytes for url, from image_cache or the server. None if neither has it."""
+    data = image_cache.get(url)
+    if data is not None:
+        return data
+    def fetch():
+        data = server.call("image", http_get, url, fallback=lambda: None)
+        if data is not None:
+            tracer.add_request(len(data))
+            image_cache.put(url, data)
+        return data
     try:
-        response = client.jellyfin.user_items(params={
-            'Recursive': True,
-            'IncludeItemTypes': 'Series,Movie',
-            'Fields': 'Overview,PrimaryImageTag,UserData,People,Images,ImageTags'
-        })
-    except Exception as e:
-        if '401' in str(e):
-            print("Authentication token invalid, attempting to re-authenticate...")
-            reauthenticate()
-            response = client.jellyfin.user_items(params={
-                'Recursive': True,
-                'IncludeItemTypes': 'Series,Movie',
-                'Fields': 'Overview,PrimaryImageTag,UserData,People,Images,ImageTags'
-            })
-        else:
-            raise e
+        # Cast photos repeat across shows, so the same one is often requested by several rows at once
+        with tracer.phase("image_http"):
+            return single_flight.do(url_key("image", url), fetch)
+    except requests.RequestException as e:
+        log.warning("Failed to load image %s: %s", redact(url), e)
+        return None
+
+def save_library_snapshot(items):
+    """Write the library listing for offline starts, in the background so startup does not wait."""
+    def write():
+        try:
+            with open(LIBRARY_CACHE_FILE + ".tmp", 'w') as f:
+                json.dump(items, f)
+            os.replace(LIBRARY_CACHE_FILE + ".tmp", LIBRARY_CACHE_FILE)
+        except OSError as e:
+            log.error("Error saving library snapshot: %s", e)
+    threading.Thread(target=write, daemon=True).start()
+
+def load_library_snapshot():
+    if os.path.exists(LIBRARY_CACHE_FILE):
+        try:
+            with open(LIBRARY_CACHE_FILE, 'r') as f:
+                items = json.load(f)
+            log.warning("Using the library snapshot from %s", LIBRARY_CACHE_FILE)
+            return {'Items': items}
+        except (OSError, ValueError) as e:
+            log.error("Error loading library snapshot: %s", e)
+    return None
+
+# What the app needs to know about each show and movie in the library
+LIBRARY_FIELDS = {
+    'Fields': 'Overview,PrimaryImageTag,UserData,People,Images,ImageTags',
+    'EnableImages': True,
+    'EnableImageTypes': 'Primary,Thumb'
+}
+LIBRARY_IDS_PER_REQUEST = 100  # Keeps the Ids parameter well inside URL length limits
+
+def get_shows(allow_snapshot=True):
+    """
+    Every show and movie in the library. If the server cannot answer, the last library
+    snapshot is returned when allow_snapshot is set; otherwise ServerUnavailable is raised.
+    """
+    log.info("Fetching shows from %s", JELLYFIN_URL)
+    used_snapshot = []
+
+    def fallback():
+        used_snapshot.append(True)
+        return load_library_snapshot()
+
+    response = server.call("library", jellyfin_get, "Users/{UserId}/Items", dict(LIBRARY_FIELDS, **{
+        'Recursive': True,
+        'IncludeItemTypes': 'Series,Movie',
+    }), fallback=fallback if allow_snapshot else None)
+    if response is None:
+        raise ServerUnavailable("The library could not be fetched and there is no snapshot of it.")
     items = response['Items']
-    print(f"Found {len(items)} shows and movies")
-    for item in items[:3]:
-        print(f"Show: {item.get('Name', 'Unknown')}, People: {item.get('People', 'No People data')}")
+    log.info("Found %d shows and movies", len(items))
+    if log.isEnabledFor(logging.DEBUG):
+        for item in items[:3]:
+            log.debug("Show: %s, People: %s", item.get('Name', 'Unknown'), item.get('People', 'No People data'))
+    if not used_snapshot:
+        save_library_snapshot(items)
     return items
 
-def get_image(item, width=462, height=260, image_type='Thumb'):
+def get_library_items(item_ids):
+    """
+    Fetch items by id with the same fields get_shows asks for, whatever their type.
+    Ids the server no longer knows are left out. Raises ServerUnavailable if the server cannot answer.
+    """
+    items = []
+    for start in range(0, len(item_ids), LIBRARY_IDS_PER_REQUEST):
+        response = server.call("library", jellyfin_get, "Users/{UserId}/Items", dict(LIBRARY_FIELDS, **{
+            'Ids': ",".join(item_ids[start:start + LIBRARY_IDS_PER_REQUEST]),
+        }))
+        items.extend(response.get('Items', []))
+    return items
+
+def get_blurhash(image_blurhashes, image_type, image_tag):
+    """Look up the blurhash Jellyfin sent for an image tag in an ImageBlurHashes mapping."""
+    if not image_tag:
+        return None
+    return (image_blurhashes or {}).get(image_type, {}).get(image_tag)
+
+def get_placeholder_image(blurhash, width, height):
+    """Get the preview for an image slot: the decoded blurhash if there is one, black otherwise."""
+    if blurhash:
+        try:
+            return get_preview_image(blurhash, width, height)
+        except (ValueError, KeyError) as e:
+            log.warning("Invalid blurhash %r: %s", blurhash, e)
+    return Image.new('RGB', (width, height), color='#000000')
+
+def get_image_preview(item, width=462, height=260, image_type='Thumb'):
+    image_tag = item.get('ImageTags', {}).get(image_type, '')
+    blurhash = get_blurhash(item.get('ImageBlurHashes'), image_type, image_tag)
+    return get_placeholder_image(blurhash, width, height)
+
+def get_cast_image_preview(person, width=92, height=155):
+    blurhash = get_blurhash(person.get('ImageBlurHashes'), 'Primary', person.get('PrimaryImageTag'))
+    return get_placeholder_image(blurhash, width, height)
+
+def load_image(item, width=462, height=260, image_type='Thumb'):
+    """
+    Download and decode an item image scaled to the given height, or read it from the
+    artwork store if it was pre-rendered at this size. Returns a PIL image, or None
+    if it could not be loaded. Safe to call from worker threads.
+    """
     item_id = item['Id']
     image_tags = item.get('ImageTags', {}).get(image_type, '')
     if image_tags:
+        stored = artwork_store.load(item_id, image_type, image_tags, width, height)
+        if stored is not None:
+            return stored
         url = f"{JELLYFIN_URL}/Items/{item_id}/Images/{image_type}?tag={image_tags}&maxWidth={width}&maxHeight={height}"
+        data = fetch_image(url)
+        if data is None:
+            return None
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            img = Image.open(io.BytesIO(response.content))
-            orig_width, orig_height = img.size
-            aspect_ratio = orig_width / orig_height
-            new_height = height
-            new_width = int(new_height * aspect_ratio)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            return ImageTk.PhotoImage(img)
-        except (requests.RequestException, IOError):
-            print(f"Failed to load {image_type} image for item {item_id}")
-    return ImageTk.PhotoImage(Image.new('RGB', (width, height), color='#000000'))
+            with tracer.phase("image_decode"):
+                return decode_to_height(data, height)
+        except IOError:
+            log.warning("Failed to decode %s image for item %s", image_type, item_id)
+    return None
 
-def get_cast_image(person, width=92, height=155):
+def get_image(item, width=462, height=260, image_type='Thumb'):
+    img = load_image(item, width, height, image_type)
+    if img is None:
+        img = Image.new('RGB', (width, height), color='#000000')
+    return ImageTk.PhotoImage(img)
+
+def load_cast_image(person, width=92, height=155):
+    """
+    Download a cast photo letterboxed to exactly width x height, or read it from the
+    artwork store. Returns a PIL image, or None. Safe to call from worker threads.
+    """
     person_id = person.get('Id')
     if person_id and person.get('PrimaryImageTag'):
+        stored = artwork_store.load(person_id, 'Primary', person['PrimaryImageTag'], width, height)
+        if stored is not None:
+            return stored
         cast_img_url = f"{JELLYFIN_URL}/Items/{person_id}/Images/Primary?tag={person['PrimaryImageTag']}&maxWidth={width}&maxHeight={height}"
-        print(f"Fetching cast image for person {person_id} (Name: {person.get('Name', 'Unknown')}) from URL: {cast_img_url}")
+        log.debug("Fetching cast image for person %s (Name: %s) from URL: %s", person_id, person.get('Name', 'Unknown'), cast_img_url)
+        data = fetch_image(cast_img_url)
+        if data is None:
+            return None
         try:
-            response = requests.get(cast_img_url)
-            response.raise_for_status()
-            cast_img = Image.open(io.BytesIO(response.content))
-            # Convert to RGB if the image has an alpha channel
-            if cast_img.mode == 'RGBA':
-                cast_img = cast_img.convert('RGB')
-            # Resize while maintaining aspect ratio
-            cast_img.thumbnail((width, height), Image.Resampling.LANCZOS)
-            # Create a new image with the exact dimensions
-            new_img = Image.new('RGB', (width, height), color='#000000')
-            offset = ((width - cast_img.width) // 2, (height - cast_img.height) // 2)
-            new_img.paste(cast_img, offset)
-            print(f"Successfully loaded and resized cast image for person {person_id} to {width}x{height}")
-            return ImageTk.PhotoImage(new_img)
-        except (requests.RequestException, IOError) as e:
-            print(f"Failed to load cast image for person {person_id}: {e}")
+            # Fit inside the slot and letterbox onto a black canvas of the exact size
+            with tracer.phase("image_decode"):
+                new_img = decode_to_box(data, width, height)
+            log.debug("Loaded cast image for person %s at %dx%d", person_id, width, height)
+            return new_img
+        except IOError as e:
+            log.warning("Failed to decode cast image for person %s: %s", person_id, e)
     else:
-        print(f"No image data for person {person_id} (Name: {person.get('Name', 'Unknown')})")
-    return ImageTk.PhotoImage(Image.new('RGB', (width, height), color='#000000'))
+        log.debug("No image data for person %s (Name: %s)", person_id, person.get('Name', 'Unknown'))
+    return None
+
+def get_cast_image(person, width=92, height=155):
+    cast_img = load_cast_image(person, width, height)
+    if cast_img is None:
+        cast_img = Image.new('RGB', (width, height), color='#000000')
+    return ImageTk.PhotoImage(cast_img)
 
 def get_second_monitor_index():
     """
@@ -145,55 +356,36 @@ def get_second_monitor_index():
     """
     try:
         monitors = get_monitors()
-        print(f"Detected monitors: {len(monitors)}")
+        log.debug("Detected monitors: %d", len(monitors))
         for i, monitor in enumerate(monitors):
-            print(f"Monitor {i}: {monitor}")
+            log.debug("Monitor %d: %s", i, monitor)
             if monitor.name == 'HDMI-A-1':
-                print(f"Found HDMI monitor (HDMI-A-1) at index {i}")
+                log.info("Found HDMI monitor (HDMI-A-1) at index %d", i)
                 return i
-        print("HDMI-A-1 monitor not found, using default screen (index 0).")
+        log.info("HDMI-A-1 monitor not found, using default screen (index 0).")
         return 0
     except Exception as e:
-        print(f"Error detecting monitors: {e}")
+        log.error("Error detecting monitors: %s", e)
         return 0
 
-def get_non_default_audio_device():
-    """
-    Get the identifier of the HDMI audio device for the SAMSUNG TV.
-    
-    Returns:
-        str: The identifier of the HDMI audio device.
-    """
-    try:
-        result = subprocess.run(["mpv", "--audio-device=help"], capture_output=True, text=True, check=True)
-        lines = result.stdout.splitlines()
-        audio_devices = []
-        for line in lines:
-            line = line.strip()
-            # Look for lines that are actual device names
-            if line and (line.startswith("alsa/") or line.startswith("pulse/") or line.startswith("auto")):
-                audio_devices.append(line)
-        print(f"Detected audio devices: {audio_devices}")
-        # Look for the SAMSUNG HDMI audio device
-        for device in audio_devices:
-            if 'hdmi' in device.lower() and 'SAMSUNG' in device:
-                print(f"Found SAMSUNG HDMI audio device: {device}")
-                return device
-        # Fallback to any HDMI device if SAMSUNG isn't found
-        for device in audio_devices:
-            if 'hdmi' in device.lower() and device != 'auto':
-                print(f"Found generic HDMI audio device: {device}")
-                return device
-        # Hardcode the SAMSUNG HDMI device as a last resort
-        print("No HDMI audio device detected, using hardcoded SAMSUNG HDMI device.")
-        return "alsa/hdmi:CARD=HDMI,DEV=1"
-    except subprocess.CalledProcessError as e:
-        print(f"Error listing audio devices: {e}")
-        print("Falling back to hardcoded SAMSUNG HDMI device.")
-        return "alsa/hdmi:CARD=HDMI,DEV=1"
-    except FileNotFoundError:
-        print("MPV not found. Please ensure MPV is installed.")
-        return None
+def get_access_token():
+    """Get the access token used to authorise stream URLs."""
+    # Access the AccessToken from the first server in the Servers list
+    creds = client.auth.credentials.get()
+    access_token = None
+    if 'Servers' in creds and creds['Servers']:
+        access_token = creds['Servers'][0].get('AccessToken')
+    if not access_token:
+        log.debug("Access token not found in credentials. Attempting to use config token.")
+        access_token = client.config.data.get('auth.token')
+    if not access_token:
+        log.error("Failed to retrieve access token from credentials or config.")
+    return access_token
+
+def build_stream_url(item_id, decision, access_token):
+    """Build the stream URL for the media source stream_selector chose for an item. No request is made."""
+    server_url = client.config.data.get('auth.server', JELLYFIN_URL)
+    return stream_selector.stream_url(server_url, item_id, decision, access_token)
 
 def get_media_url(item_id):
     """
@@ -205,48 +397,34 @@ def get_media_url(item_id):
     Returns:
         str: The direct URL to the media file, or None if retrieval fails.
     """
-    print(f"Fetching media URL for item {item_id}")
+    log.debug("Fetching media URL for item %s", item_id)
     try:
-        # Fetch the item to get its media sources
-        try:
-            item = client.jellyfin.get_item(item_id)
-        except Exception as e:
-            if '401' in str(e):
-                print("Authentication token invalid, attempting to re-authenticate...")
-                reauthenticate()
-                item = client.jellyfin.get_item(item_id)
-            else:
-                raise e
-        if 'MediaSources' not in item or not item['MediaSources']:
-            print(f"No media sources found for item {item_id}")
-            return None
-        media_source = item['MediaSources'][0]
-        media_source_id = media_source['Id']
-        # Get the access token from the client's config
-        creds = client.auth.credentials.get()
-        print(f"Credentials content: {creds}")
-        # Access the AccessToken from the first server in the Servers list
-        access_token = None
-        if 'Servers' in creds and creds['Servers']:
-            access_token = creds['Servers'][0].get('AccessToken')
-        if not access_token:
-            print("Access token not found in credentials. Attempting to use config token.")
-            access_token = client.config.data.get('auth.token')
+        # A stream decision made earlier for this item already names its media source
+        decision = stream_selector.cached(item_id)
+        if decision is None:
+            # Fetch the item to get its media sources
+            item = get_item(item_id, endpoint="playlist")
+            decision = stream_selector.choose(item_id, item.get('MediaSources'))
+            if decision is None:
+                log.warning("No media sources found for item %s", item_id)
+                return None
+        access_token = get_access_token()
         if not access_token:
-            print("Failed to retrieve access token from credentials or config.")
             return None
-        # Construct the direct stream URL
-        server_url = client.config.data.get('auth.server', 'http://localhost:8096')
-        media_url = f"{server_url}/Videos/{item_id}/stream?MediaSourceId={media_source_id}&api_key={access_token}"
-        print(f"Media URL: {media_url}")
+        # Construct the stream URL for the chosen media source
+        media_url = build_stream_url(item_id, decision, access_token)
+        log.debug("Media URL: %s", redact(media_url))
         return media_url
     except Exception as e:
-        print(f"Error fetching media URL for item {item_id}: {e}")
+        log.error("Error fetching media URL for item %s: %s", item_id, e)
         return None
 
 def get_next_episode_to_play(series_id):
     """
     Get the next unwatched episode for the series and a list of all remaining episodes' URLs.
+
+    The episode listing asks for MediaSources, so every stream URL is built locally
+    from that one response instead of a get_item call per episode.
     
     Args:
         series_id (str): The ID of the series.
@@ -256,22 +434,16 @@ def get_next_episode_to_play(series_id):
                and remaining_episode_urls is a list of URLs for all remaining episodes.
                Returns (None, []) if no episodes are found.
     """
-    print(f"Fetching next episode to play for series {series_id}")
+    log.debug("Fetching next episode to play for series %s", series_id)
     try:
-        # Fetch all episodes for the series
-        response = client.jellyfin.user_items(params={
-            'ParentId': series_id,
-            'Recursive': True,
-            'IncludeItemTypes': 'Episode',
-            'SortBy': 'ParentIndexNumber,IndexNumber',
-            'SortOrder': 'Ascending',
-            'Fields': 'Overview,ParentIndexNumber,IndexNumber,UserData'
-        })
-        episodes = response.get('Items', [])
+        # Fetch all episodes for the series, with their media sources. An old listing
+        # could pick the wrong next episode, so nothing stale is used here.
+        episodes = get_episode_listing(series_id, 'Overview,ParentIndexNumber,IndexNumber,UserData,MediaSources',
+                                       endpoint="playlist", allow_stale=False)
         if not episodes:
-            print(f"No episodes found for series {series_id}")
+            log.warning("No episodes found for series %s", series_id)
             return None, []
-        print(f"Found {len(episodes)} episodes for series {series_id}")
+        log.debug("Found %d episodes for series %s", len(episodes), series_id)
 
         # Find the last played episode
         last_played_index = -1
@@ -286,123 +458,119 @@ def get_next_episode_to_play(series_id):
             next_episode = episodes[next_episode_index]
         else:
             next_episode = episodes[0]  # Start from the beginning if all episodes are watched
-        print(f"Selected episode to play: {next_episode['Name']} (Index: {next_episode['IndexNumber']})")
+        log.info("Selected episode to play: %s (Index: %s)", next_episode['Name'], next_episode['IndexNumber'])
 
-        # Get URLs for all remaining episodes
+        # Build URLs for all remaining episodes from the listing
         remaining_episodes = episodes[next_episode_index:]
+        access_token = get_access_token()
+        if not access_token:
+            return None, []
         remaining_episode_urls = []
         for episode in remaining_episodes:
-            episode_id = episode['Id']
-            media_url = get_media_url(episode_id)
-            if media_url:
-                remaining_episode_urls.append(media_url)
-        print(f"Created playlist with {len(remaining_episode_urls)} remaining episodes")
+            decision = stream_selector.cached(episode['Id']) or stream_selector.choose(episode['Id'], episode.get('MediaSources'))
+            if decision:
+                remaining_episode_urls.append(build_stream_url(episode['Id'], decision, access_token))
+            else:
+                log.warning("No media sources found for episode %s", episode['Id'])
+        log.info("Created playlist with %d remaining episodes", len(remaining_episode_urls))
         return next_episode, remaining_episode_urls
     except Exception as e:
-        print(f"Error fetching next episode for series {series_id}: {e}")
+        log.error("Error fetching next episode for series %s: %s", series_id, e)
         return None, []
 
-def launch_show(item_id):
+def resolve_playback_target(item_id, item_type=None):
     """
-    Launch the media associated with the given item_id using MPV.
-    If the media is a series, play all remaining episodes starting from the next unwatched episode.
-    If the media is an episode or movie, play it directly.
-    
+    Work out what launching item_id would play, without starting playback.
+    If the media is a series, that is all remaining episodes starting from the next unwatched episode.
+    If the media is an episode or movie, it is that item alone.
+
     Args:
         item_id (str): The ID of the show, movie, or episode.
+        item_type (str): The item's Type, when the caller already knows it (saves a get_item call).
+
+    Returns:
+        list: The stream URLs to play in order, or None if there is nothing to play.
     """
-    print(f"Launching show with ID {item_id}")
-    try:
+    if item_type is None:
         # Fetch item information to determine its type
-        try:
-            item = client.jellyfin.get_item(item_id)
-        except Exception as e:
-            if '401' in str(e):
-                print("Authentication token invalid, attempting to re-authenticate...")
-                reauthenticate()
-                item = client.jellyfin.get_item(item_id)
-            else:
-                raise e
+        item = get_item(item_id, endpoint="playlist")
         item_type = item['Type']
-        print(f"Item type: {item_type}")
+    log.debug("Item type: %s", item_type)
+
+    if item_type == 'Series':
+        # For a series, get the next episode and remaining episodes
+        next_episode, remaining_episode_urls = get_next_episode_to_play(item_id)
+        if not next_episode or not remaining_episode_urls:
+            log.warning("No episodes found to play for series %s", item_id)
+            return None
+        return remaining_episode_urls
+    # For episodes or movies, play directly
+    media_url = get_media_url(item_id)
+    if not media_url:
+        log.warning("Failed to get media URL for item %s", item_id)
+        return None
+    return [media_url]
+
+def launch_show(item_id, target=None):
+    """
+    Launch the media associated with the given item_id in the warm MPV player.
+    Returns True once mpv has accepted the files (not when playback ends), False if nothing could be played.
+    
+    Args:
+        item_id (str): The ID of the show, movie, or episode.
+        target (list): Stream URLs already resolved by resolve_playback_target, if any.
+    """
+    log.info("Launching show with ID %s", item_id)
+    try:
+        urls = target or resolve_playback_target(item_id)
+        if not urls:
+            return False
 
         # Determine the audio device
         audio_device = get_non_default_audio_device()
 
-        # Build the base MPV command with full-screen and reduced log level
-        mpv_command = ["mpv", "--fs", "--msg-level=all=info"]  # Changed from debug to info
-        if audio_device:
-            mpv_command.append(f"--audio-device={audio_device}")
-
-        if item_type == 'Series':
-            # For a series, get the next episode and remaining episodes
-            next_episode, remaining_episode_urls = get_next_episode_to_play(item_id)
-            if not next_episode or not remaining_episode_urls:
-                print(f"No episodes found to play for series {item_id}")
-                return
-            # Create a temporary playlist file
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
-                playlist_path = temp_file.name
-                for url in remaining_episode_urls:
-                    temp_file.write(f"{url}\n")
-            try:
-                # Play the playlist
-                mpv_command.append(f"--playlist={playlist_path}")
-                print(f"Launching playlist with command: {mpv_command}")
-                subprocess.run(mpv_command, check=True)
-            finally:
-                # Clean up the temporary playlist file
-                if os.path.exists(playlist_path):
-                    os.remove(playlist_path)
-        else:
-            # For episodes or movies, play directly
-            media_url = get_media_url(item_id)
-            if not media_url:
-                print(f"Failed to get media URL for item {item_id}")
-                return
-            mpv_command.append(media_url)
-            print(f"Launching media {item_id} with command: {mpv_command}")
-            subprocess.run(mpv_command, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error launching MPV: {e}")
+        log.info("Loading %d item(s) for %s into mpv", len(urls), item_id)
+        player.play(urls, audio_device)
+        return True
+    except MpvError as e:
+        log.error("Error launching MPV: %s", e)
+        return False
     except FileNotFoundError:
-        print("MPV not found. Please ensure MPV is installed on your system.")
+        log.error("MPV not found. Please ensure MPV is installed on your system.")
+        return False
     except Exception as e:
-        print(f"Error launching show with ID {item_id}: {e}")
+        log.error("Error launching show with ID %s: %s", item_id, e)
         raise
 
 def open_jellyfin_ui():
     """Open the Jellyfin web interface in the default browser."""
     try:
         ui_url = f"{JELLYFIN_URL}/web/index.html"
-        print(f"Opening Jellyfin UI at {ui_url}")
+        log.info("Opening Jellyfin UI at %s", ui_url)
         webbrowser.open(ui_url)
     except Exception as e:
-        print(f"Error opening Jellyfin UI: {e}")
+        log.error("Error opening Jellyfin UI: %s", e)
 
-def get_description(item):
+def get_description(item, episodes=None):
+    """(name, episode title, description) for a show. episodes is its listing, if the caller already has it."""
     item_id = item['Id']
     item_type = item.get('Type')
     series_name = item.get('Name', 'Unknown Series')
-    print(f"Processing {series_name} (ID: {item_id})")
+    log.debug("Processing %s (ID: %s)", series_name, item_id)
 
     if item_type == 'Series':
         try:
-            resume_data = client.jellyfin.user_items(params={
-                'ParentId': item_id,
-                'Recursive': True,
-                'IncludeItemTypes': 'Episode',
-                'SortBy': 'ParentIndexNumber,IndexNumber',
-                'SortOrder': 'Ascending',
-                'Fields': 'Overview,ParentIndexNumber,IndexNumber,UserData'
-            })
-            episodes = resume_data.get('Items', [])
+            if episodes is None:
+                episodes = get_episode_listing(item_id, 'Overview,ParentIndexNumber,IndexNumber,UserData')
+            if episodes is None:
+                # The server is unreachable and the series was never listed: show the series overview
+                return series_name, None, f"{series_name} {item.get('Overview', 'No description available')}"
             if not episodes:
-                print(f"No episodes found for {series_name}")
+                log.debug("No episodes found for %s", series_name)
                 return series_name, None, f"{series_name} {item.get('Overview', 'No description available for {series_name}')}"
-            print(f"Found {len(episodes)} episodes for {series_name}")
+            log.debug("Found %d episodes for %s", len(episodes), series_name)
         except Exception as e:
-            print(f"Error fetching episodes for {series_name}: {e}")
+            log.error("Error fetching episodes for %s: %s", series_name, e)
             return series_name, None, f"{series_name} {item.get('Overview', 'Error fetching episodes for {series_name}')}"
 
         season_numbers = set(episode.get('ParentIndexNumber', 0) for episode in episodes)
@@ -0,0 +1,260 @@
+# live_updates.py
+import json
+import os
+import random
+import ssl
+import threading
+import time
+from collections import Counter, OrderedDict
+from urllib.parse import urlencode
+
+import websocket
+
+from jellyfin_utils import client, JELLYFIN_URL, ensure_logged_in, get_access_token, get_library_items
+from generate_content_list import fetch_boxset_members
+from episode_cache import episode_cache
+from image_cache import image_cache
+from stream_selection import stream_selector
+from server_calls import CONNECT_TIMEOUT, describe
+from log_utils import get_logger, redact
+
+log = get_logger("live")
+
+LIVE_UPDATES = os.environ.get("WHATSON_LIVE_UPDATES", "1") == "1"
+KEEPALIVE_INTERVAL = 30  # Seconds between KeepAlive messages, until the server asks for another interval
+RECONNECT_BASE_DELAY = 1.0  # Seconds; doubles with each failed connection attempt
+RECONNECT_MAX_DELAY = 60.0
+SEEN_MESSAGES = 256  # Message ids remembered to drop repeats
+
+class LibraryChanges:
+    """What one notification changed, for the app to fold into its show list and rows."""
+
+    def __init__(self):
+        self.user_data = {}  # show or movie id -> new UserData fields
+        self.refresh = set()  # show ids whose rows (description, playback target) are out of date
+        self.items = {}  # show or movie id -> its fresh library entry, for updated and added items
+        self.removed = set()  # ids gone from the library
+        self.boxsets = {}  # BoxSet id -> (name, ids of its members now, or None if it was deleted)
+        self.resync = False  # Notifications may have been missed, so nothing cached can be trusted
+
+    def __bool__(self):
+        return bool(self.user_data or self.refresh or self.items or self.removed or self.boxsets or self.resync)
+
+def socket_url():
+    """The server's notification socket, authorised with the current access token."""
+    server_url = client.config.data.get('auth.server', JELLYFIN_URL)
+    query = urlencode({'api_key': get_access_token(), 'deviceId': client.config.data.get('app.device_id', '')})
+    return "ws" + server_url[len("http"):] + "/socket?" + query
+
+def reconnect_delay(failures):
+    delay = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** (failures - 1))
+    return random.uniform(delay / 2, delay)
+
+def user_data_changes(data):
+    """Patch cached episodes from a UserDataChanged message."""
+    changes = LibraryChanges()
+    for entry in data.get('UserDataList') or []:
+        item_id = entry.get('ItemId')
+        if not item_id:
+            continue
+        user_data = {key: value for key, value in entry.items() if key not in ('ItemId', 'Key')}
+        series_id = episode_cache.update_user_data(item_id, user_data)
+        if series_id:
+            changes.refresh.add(series_id)
+        else:
+            # A series or movie itself, or an episode of a series nothing is cached for
+            changes.user_data[item_id] = user_data
+            changes.refresh.add(item_id)
+    return changes
+
+class NotificationListener(threading.Thread):
+    """
+    Keeps a WebSocket open to the server's notification socket and turns its
+    UserDataChanged and LibraryChanged messages into LibraryChanges. The caches
+    shared by the whole process (episodes, artwork, stream decisions) are patched
+    here; on_changes is then called, on this thread, for the app to patch the rest.
+
+    The connection is retried with backoff for as long as the app runs. Changes
+    made while it was down are unknown, so each reconnect reports a resync.
+    """
+
+    def __init__(self, on_changes, boxsets=()):
+        super().__init__(name="live-updates", daemon=True)
+        self.on_changes = on_changes
+        self.boxset_names = {boxset['Id']: boxset['Name'] for boxset in boxsets}
+        self.stopping = threading.Event()
+        self.connection = None
+        self.keepalive_interval = KEEPALIVE_INTERVAL
+        self.seen = OrderedDict()
+        self.counters = Counter()
+
+    def stop(self):
+        self.stopping.set()
+        connection = self.connection
+        if connection is not None:
+            connection.abort()  # Wakes the thread blocked in recv; closing the socket would not
+
+    def run(self):
+        failures = 0
+        connected_before = False
+        while not self.stopping.is_set():
+            url = JELLYFIN_URL
+            try:
+                ensure_logged_in()  # The socket is authorised with the access token
+                url = socket_url()
+                sslopt = {"cert_reqs": ssl.CERT_NONE} if not client.config.data.get('auth.ssl') else {}
+                self.connection = websocket.create_connection(url, timeout=CONNECT_TIMEOUT, sslopt=sslopt)
+            except Exception as e:
+                # Not being able to log in is retried too: the server may just be down
+                failures += 1
+                delay = reconnect_delay(failures)
+                # Only the first failure of a run is worth a warning; the server may be down for hours
+                (log.warning if failures == 1 else log.debug)(
+                    "Could not open the notification socket %s (%s), retrying in %.0fs",
+                    redact(url), describe(e), delay)
+                self.stopping.wait(delay)
+                continue
+            failures = 0
+            log.info("Listening for library changes on %s", redact(url))
+            if connected_before:
+                self.resync()
+            connected_before = True
+            try:
+                self.listen(self.connection)
+            except (OSError, websocket.WebSocketException) as e:
+                if not self.stopping.is_set():
+                    log.warning("Lost the notification socket (%s), reconnecting", describe(e))
+            finally:
+                self.connection.shutdown()
+                self.connection = None
+
+    def listen(self, connection):
+        last_sent = time.monotonic()
+        while not self.stopping.is_set():
+            connection.settimeout(self.keepalive_interval)
+            try:
+                message = connection.recv()
+            except websocket.WebSocketTimeoutException:
+                message = None
+            if not connection.connected:
+                raise websocket.WebSocketConnectionClosedException("closed by the server")
+            if time.monotonic() - last_sent >= self.keepalive_interval:
+                connection.send(json.dumps({'MessageType': 'KeepAlive'}))
+                last_sent = time.monotonic()
+            if message:
+                try:
+                    decoded = json.loads(message)
+                except ValueError as e:
+                    log.warning("Ignoring a notification that is not JSON: %s", e)
+                    continue
+                if isinstance(decoded, dict):
+                    self.handle(connection, decoded)
+
+    def handle(self, connection, message):
+        message_id = message.get('MessageId')
+        if message_id is not None:
+            if message_id in self.seen:
+                return
+            self.seen[message_id] = True
+            if len(self.seen) > SEEN_MESSAGES:
+                self.seen.popitem(last=False)
+
+        message_type = message.get('MessageType')
+        data = message.get('Data') or {}
+        self.counters[message_type] += 1
+        if message_type == 'ForceKeepAlive':
+            # Data is the server's idle timeout in seconds; keep well inside it
+            self.keepalive_interval = max(1, int(data) / 2) if isinstance(data, (int, float)) else KEEPALIVE_INTERVAL
+            connection.send(json.dumps({'MessageType': 'KeepAlive'}))
+            return
+        try:
+            if message_type == 'UserDataChanged':
+                changes = user_data_changes(data)
+            elif message_type == 'LibraryChanged':
+                changes = self.library_changes(data)
+            else:
+                log.debug("Ignoring %s message", message_type)
+                return
+        except Exception as e:
+            log.error("Error applying %s message: %s", message_type, e)
+            return
+        log.debug("%s: %d row(s) to refresh, %d item(s) changed, %d removed, %d BoxSet(s) changed",
+                  message_type, len(changes.refresh), len(changes.items), len(changes.removed), len(changes.boxsets))
+        if changes:
+            self.deliver(changes)
+
+    def deliver(self, changes):
+        # One change the app cannot apply must not end live updates for the rest of the run
+        try:
+            self.on_changes(changes)
+        except Exception as e:
+            log.error("Error applying library changes: %s", e)
+
+    def missed(self, changes, what, error):
+        """A fetch for a change failed: the app resyncs instead, as after a reconnect."""
+        log.warning("Could not fetch %s (%s); refreshing everything instead", what, describe(error))
+        episode_cache.invalidate_all()
+        changes.resync = True
+
+    def library_changes(self, data):
+        """Patch caches from a LibraryChanged message, fetching the items it names that are new or changed."""
+        changes = LibraryChanges()
+        for item_id in data.get('ItemsRemoved') or []:
+            image_cache.drop_item(item_id)
+            stream_selector.invalidate(item_id)
+            series_id = episode_cache.series_of(item_id)
+            if series_id:
+                episode_cache.invalidate_series(series_id)
+                changes.refresh.add(series_id)
+            elif item_id in self.boxset_names:
+                changes.boxsets[item_id] = (self.boxset_names.pop(item_id), None)
+            else:
+                changes.removed.add(item_id)
+
+        # Removals are applied above whatever happens below, so what was done is still reported
+        changed_ids = list(dict.fromkeys((data.get('ItemsAdded') or []) + (data.get('ItemsUpdated') or [])))
+        try:
+            changed_items = get_library_items(changed_ids) if changed_ids else []
+        except Exception as e:
+            self.missed(changes, f"{len(changed_ids)} changed item(s)", e)
+            changed_items = []
+        for item in changed_items:
+            item_id = item['Id']
+            image_cache.drop_item(item_id, keep_tags=set((item.get('ImageTags') or {}).values()))
+            stream_selector.invalidate(item_id)
+            if item.get('Type') == 'Episode':
+                series_id = item.get('SeriesId')
+                if series_id:
+                    episode_cache.invalidate_series(series_id)
+                    changes.refresh.add(series_id)
+            elif item.get('Type') == 'BoxSet':
+                self.boxset_names[item_id] = item['Name']
+                member_ids = self.boxset_member_ids(changes, item_id)
+                if member_ids is not None:
+                    changes.boxsets[item_id] = (item['Name'], member_ids)
+            elif item.get('Type') in ('Series', 'Movie'):
+                changes.items[item_id] = item
+                changes.refresh.add(item_id)
+
+        # Items added to or taken out of a collection name it as the folder that changed
+        for folder_id in (data.get('FoldersAddedTo') or []) + (data.get('FoldersRemovedFrom') or []):
+            if folder_id in self.boxset_names and folder_id not in changes.boxsets:
+                member_ids = self.boxset_member_ids(changes, folder_id)
+                if member_ids is not None:
+                    changes.boxsets[folder_id] = (self.boxset_names[folder_id], member_ids)
+        return changes
+
+    def boxset_member_ids(self, changes, boxset_id):
+        """The ids of a BoxSet's members now, or None (and a resync) if they could not be fetched."""
+        try:
+            return [member['Id'] for member in fetch_boxset_members(boxset_id)]
+        except Exception as e:
+            self.missed(changes, f"the members of BoxSet {boxset_id}", e)
+            return None
+
+    def resync(self):
+        """After a reconnect: drop cached listings, since changes made meanwhile were not seen."""
+        episode_cache.invalidate_all()
+        changes = LibraryChanges()
+        changes.resync = True
+        self.deliver(changes)
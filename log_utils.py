@@ -0,0 +1,107 @@
+# log_utils.py
+import logging
+import os
+import re
+import sys
+import threading
+from collections import Counter
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+# Default level for every module, e.g. WHATSON_LOG_LEVEL=DEBUG
+LOG_LEVEL = os.environ.get("WHATSON_LOG_LEVEL", "INFO")
+# Per-module overrides, e.g. WHATSON_LOG=jellyfin=debug,schedule=warning
+LOG_MODULES = os.environ.get("WHATSON_LOG", "")
+SAMPLE_FIRST = 3  # Per-item lines a LogSummary still writes (at DEBUG) before it only counts
+
+SECRET_KEYS = ("AccessToken", "auth.token", "Token", "api_key", "ApiKey", "Pw", "password")
+SECRET_PATTERN = re.compile(r"((?:api_key|ApiKey|Token|AccessToken)[=:]\s*['\"]?)[^&'\"\s,}]+")
+
+class StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at the time, so redirect_stdout still silences the app."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+_configured = False
+_configure_lock = threading.Lock()
+
+def configure_logging(level=None, modules=None, stream=None):
+    """
+    Send the app's logs to stdout. Called once at startup; get_logger calls it
+    with the environment settings if nobody has yet.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+        root = logging.getLogger("whatson")
+        handler = logging.StreamHandler(stream) if stream else StdoutHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="%H:%M:%S"))
+        root.addHandler(handler)
+        root.setLevel((level or LOG_LEVEL).upper())
+        root.propagate = False
+        for setting in (modules if modules is not None else LOG_MODULES).split(","):
+            if "=" in setting:
+                name, module_level = setting.split("=", 1)
+                logging.getLogger(f"whatson.{name.strip()}").setLevel(module_level.strip().upper())
+
+def get_logger(name):
+    """The logger for one module, e.g. get_logger("jellyfin") -> whatson.jellyfin."""
+    configure_logging()
+    return logging.getLogger(f"whatson.{name}")
+
+def redact(value):
+    """
+    Copy of value (a dict, list or string) with tokens and passwords masked, for
+    logging server responses and URLs.
+    """
+    if isinstance(value, dict):
+        return {key: "***" if key in SECRET_KEYS and value[key] else redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return SECRET_PATTERN.sub(r"\1***", value)
+    return value
+
+class LogSummary:
+    """
+    Replaces one log line per item in a loop with a single summary line. The
+    first few items are still logged at DEBUG; after that items are only
+    counted, and nothing is formatted unless DEBUG is on.
+
+        summary = LogSummary(log, "Assigned channels")
+        for item in items:
+            summary.add(channel, "Assigned %s to %s", channel, item['Name'])
+        summary.log()  # "Assigned channels: 10000 items (Comedy=1200, Drama=900, ...)"
+    """
+
+    def __init__(self, logger, title, level=logging.INFO, sample=SAMPLE_FIRST):
+        self.logger = logger
+        self.title = title
+        self.level = level
+        self.sample = sample
+        self.counts = Counter()
+        self.total = 0
+        self.debug = logger.isEnabledFor(logging.DEBUG)
+
+    def add(self, key=None, message=None, *args):
+        self.total += 1
+        if key is not None:
+            self.counts[key] += 1
+        if self.debug and message is not None and self.total <= self.sample:
+            self.logger.debug(message, *args)
+
+    def log(self):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        if self.counts:
+            detail = ", ".join(f"{key}={count}" for key, count in self.counts.most_common())
+            self.logger.log(self.level, "%s: %d items (%s)", self.title, self.total, detail)
+        else:
+            self.logger.log(self.level, "%s: %d items", self.title, self.total)
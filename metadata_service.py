@@ -0,0 +1,190 @@
+# metadata_service.py
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from jellyfin_utils import get_description, get_episode_listing, get_item
+from episode_cache import episode_cache
+from render_trace import tracer
+from log_utils import get_logger
+
+log = get_logger("metadata")
+
+METADATA_WORKERS = 4
+EPISODE_FIELDS = 'Overview,ParentIndexNumber,IndexNumber,UserData'
+
+def fetch_episodes(show_id):
+    """All episodes of a show in play order, or None if there are none (or they could not be fetched)."""
+    try:
+        with tracer.phase("fetch_episodes"):
+            episodes = get_episode_listing(show_id, EPISODE_FIELDS)
+    except Exception as e:
+        log.error("Error fetching episodes for show ID %s: %s", show_id, e)
+        return None
+    return episodes or None
+
+def get_episode(episode_id):
+    """Episode details, from the episode cache when the episode has been listed before."""
+    episode = episode_cache.get(episode_id)
+    if episode is None:
+        with tracer.phase("get_episode"):
+            episode = get_item(episode_id)
+        episode_cache.add(episode)
+    return episode
+
+def episode_title(series_name, episode):
+    """'SERIES Episode 2.05: Name' for an episode."""
+    season_num = episode.get('ParentIndexNumber', 0)
+    try:
+        episode_num = int(episode.get('IndexNumber', 'Unknown'))
+    except (ValueError, TypeError):
+        episode_num = 0
+    if season_num is not None:
+        prefix = f"{series_name.upper()} Episode {season_num}.{episode_num:02d}:"
+    else:
+        prefix = f"{series_name.upper()} Episode:"
+    return f"{prefix} {episode.get('Name', 'Untitled Episode')}"
+
+def describe_episode(series_name, episode_id):
+    """The (episode title, description) for a picked episode. Makes a server call unless the episode is cached."""
+    episode = get_episode(episode_id)
+    return episode_title(series_name, episode), episode.get('Overview', 'No description available')
+
+def describe_show(show, selected_episode_id=None, cached_only=False):
+    """
+    The (episode title, description) a row shows: the picked episode if there is one,
+    otherwise the series overview or the first or next episode depending on watch state.
+    Uses the episode cache where it can and the server otherwise, so run it on a worker;
+    with cached_only it never calls the server and returns None if it would have to.
+    """
+    series_name = show.get('Name', 'Unknown Series')
+    series_overview = show.get('Overview', 'No description available')
+    if selected_episode_id:
+        if cached_only and episode_cache.get(selected_episode_id) is None:
+            return None
+        try:
+            return describe_episode(series_name, selected_episode_id)
+        except Exception as e:
+            log.error("Error fetching selected episode details for episode ID %s: %s", selected_episode_id, e)
+            return None, series_overview
+
+    if show.get('Type') == 'Movie':
+        return None, series_overview
+    episodes = episode_cache.get_series(show['Id'])
+    if episodes is None:
+        if cached_only:
+            return None
+        episodes = fetch_episodes(show['Id'])
+    if not episodes:
+        return None, series_overview
+    is_unwatched = True
+    all_watched = True
+    for episode in episodes:
+        ep_user_data = episode.get('UserData', {})
+        if ep_user_data.get('PlaybackPositionTicks', 0) > 0 or ep_user_data.get('Played', False):
+            is_unwatched = False
+        if not ep_user_data.get('Played', False):
+            all_watched = False
+    if all_watched:
+        # If all episodes are watched, always show the series overview
+        return None, series_overview
+    if is_unwatched:
+        # If the show is unwatched, 50% chance to show series overview or first episode
+        if random.choice([True, False]):
+            return None, series_overview
+        first_episode = episodes[0]
+        return episode_title(series_name, first_episode), first_episode.get('Overview', 'No description available')
+    # Default to get_description (shows next unwatched episode)
+    with tracer.phase("get_description"):
+        _, title, description = get_description(show, episodes)
+    return title, description
+
+class MetadataRequest:
+    def __init__(self, owner, callback, row_trace):
+        self.owner = owner
+        self.callback = callback
+        self.row_trace = row_trace  # The row the lookup is traced against, if tracing
+        self.cancelled = False
+        self.future = None
+
+class MetadataService:
+    """
+    Runs metadata lookups on a worker pool so Tk callbacks never wait on the
+    server. submit() returns a Future; an optional callback gets the result on
+    the Tk thread, through dispatch (the UI's after-driven queue). Requests made
+    for an owner (a row) are cancelled together when it goes away: ones not yet
+    started never run, and results of running ones are dropped.
+
+    submit, cancel_owner and callbacks all run on the Tk thread.
+    """
+
+    def __init__(self, dispatch, workers=METADATA_WORKERS):
+        self.dispatch = dispatch
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metadata")
+        self.by_owner = {}  # owner -> requests still outstanding
+
+    def submit(self, function, *args, callback=None, owner=None):
+        request = MetadataRequest(owner, callback, tracer.current_row())
+        tracer.begin_async(request.row_trace)
+
+        def run():
+            try:
+                if request.cancelled:
+                    return None
+                with tracer.attach(request.row_trace):
+                    return function(*args)
+            finally:
+                tracer.end_async(request.row_trace)
+
+        future = self.executor.submit(run)
+        request.future = future
+        if owner is not None:
+            self.by_owner.setdefault(owner, set()).add(request)
+        future.add_done_callback(lambda f: self.dispatch(self.deliver, request))
+        return future
+
+    def deliver(self, request):
+        future = request.future
+        if request.owner is not None:
+            outstanding = self.by_owner.get(request.owner)
+            if outstanding is not None:
+                outstanding.discard(request)
+                if not outstanding:
+                    del self.by_owner[request.owner]
+        if request.cancelled or future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            log.error("Metadata request failed: %s", error)
+        elif request.callback is not None:
+            request.callback(future.result())
+
+    def cancel_owner(self, owner):
+        """Drop every outstanding request made for owner."""
+        for request in self.by_owner.pop(owner, ()):
+            request.cancelled = True
+            if request.future.cancel():
+                tracer.end_async(request.row_trace)  # run() never started, so it cannot end it
+
+    def episodes(self, show_id, callback=None, owner=None):
+        return self.submit(fetch_episodes, show_id, callback=callback, owner=owner)
+
+    def episode(self, episode_id, callback=None, owner=None):
+        return self.submit(get_episode, episode_id, callback=callback, owner=owner)
+
+    def episode_description(self, series_name, episode_id, callback=None, owner=None):
+        return self.submit(describe_episode, series_name, episode_id, callback=callback, owner=owner)
+
+    def description(self, show, selected_episode_id=None, callback=None, owner=None):
+        """
+        Future of describe_show. When everything it needs is cached the future is
+        already done and callback is not called: the caller uses the result at once.
+        """
+        described = describe_show(show, selected_episode_id, cached_only=True)
+        if described is not None:
+            future = Future()
+            future.set_result(described)
+            return future
+        return self.submit(describe_show, show, selected_episode_id, callback=callback, owner=owner)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,245 @@
+# mpv_player.py
+import itertools
+import json
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+
+from audio_devices import get_non_default_audio_device
+from log_utils import get_logger
+
+log = get_logger("mpv")
+
+MPV_IPC_SOCKET = os.environ.get("WHATSON_MPV_SOCKET", os.path.join(tempfile.gettempdir(), "whatson-mpv.sock"))
+MPV_START_TIMEOUT = 10  # Seconds to wait for a new mpv to open its IPC socket
+MPV_COMMAND_TIMEOUT = 5  # Seconds to wait for a reply to one IPC command
+MPV_EXIT_TIMEOUT = 2  # Seconds to wait for an mpv that dropped its connection to exit
+MAX_RESTARTS_PER_MINUTE = 3
+IDLE_OBSERVER_ID = 1  # observe_property id for idle-active, reported as property-change events
+
+class MpvError(Exception):
+    """Raised when mpv cannot be started or rejects a command."""
+
+class MpvPlayer:
+    """
+    Keeps one idle mpv running with --input-ipc-server and plays media by sending it
+    loadfile/loadlist commands, so a click does not pay for player startup, video
+    output initialisation and the HDMI audio handshake every time.
+
+    If mpv exits unexpectedly it is started again in the background. An mpv left
+    idle on the socket by a previous run of the app is adopted instead of starting
+    a second one.
+    """
+
+    def __init__(self, socket_path=MPV_IPC_SOCKET, mpv_command=("mpv",)):
+        self.socket_path = socket_path
+        self.mpv_command = list(mpv_command)
+        self.lock = threading.RLock()  # Guards starting, connecting and disconnecting
+        self.send_lock = threading.Lock()
+        self.process = None
+        self.sock = None
+        self.request_ids = itertools.count(1)
+        self.pending = {}  # request id -> [threading.Event, reply]
+        self.listeners = []  # Called with every mpv event dict, on the IPC reader thread
+        self.restart_times = deque()
+        self.stopping = False
+
+    def mpv_args(self):
+        args = [
+            "--idle=yes",  # Stay running with no file loaded
+            "--force-window=no",  # No window until something plays
+            "--fs",
+            "--msg-level=all=info",
+            f"--input-ipc-server={self.socket_path}",
+        ]
+        audio_device = get_non_default_audio_device()
+        if audio_device:
+            args.append(f"--audio-device={audio_device}")
+        return args
+
+    def is_running(self):
+        return self.sock is not None
+
+    def start(self):
+        """Start mpv (or adopt an idle one already on the socket) and connect to it."""
+        with self.lock:
+            if self.is_running():
+                return
+            self.stopping = False
+            if self.connect():
+                log.debug("Connected to running mpv on %s", self.socket_path)
+            else:
+                self.launch()
+            # Listeners learn when playback is over from idle-active turning true
+            self.command("observe_property", IDLE_OBSERVER_ID, "idle-active")
+
+    def launch(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # Left behind by an mpv that is gone
+        command = self.mpv_command + self.mpv_args()
+        log.debug("Starting mpv: %s", command)
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL, start_new_session=True)
+        deadline = time.monotonic() + MPV_START_TIMEOUT
+        while not self.connect():
+            if self.process.poll() is not None:
+                raise MpvError(f"mpv exited during startup with code {self.process.returncode}")
+            if time.monotonic() > deadline:
+                self.process.kill()
+                raise MpvError("mpv did not open its IPC socket in time")
+            time.sleep(0.05)
+
+    def start_in_background(self):
+        """Warm up mpv without blocking the caller."""
+        def start():
+            try:
+                self.start()
+            except FileNotFoundError:
+                log.error("MPV not found. Please ensure MPV is installed on your system.")
+            except (MpvError, OSError) as e:
+                log.error("Error starting mpv: %s", e)
+
+        threading.Thread(target=start, name="mpv-start", daemon=True).start()
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            return False
+        self.sock = sock
+        threading.Thread(target=self.read_loop, args=(sock,), name="mpv-ipc", daemon=True).start()
+        return True
+
+    def read_loop(self, sock):
+        try:
+            with sock.makefile('rb') as stream:
+                for line in stream:
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.dispatch(message)
+        except OSError:
+            pass
+        self.on_disconnect(sock)
+
+    def dispatch(self, message):
+        if 'event' in message:
+            for listener in list(self.listeners):
+                try:
+                    listener(message)
+                except Exception as e:
+                    log.error("Error in mpv event listener: %s", e)
+            return
+        waiter = self.pending.pop(message.get('request_id'), None)
+        if waiter is not None:
+            waiter[1] = message
+            waiter[0].set()
+
+    def wake_waiters(self):
+        """Wake every command waiting for a reply; a None reply means the connection was lost."""
+        while self.pending:
+            _, waiter = self.pending.popitem()
+            waiter[0].set()
+
+    def on_disconnect(self, sock):
+        if self.sock is sock:
+            # A start() holding the lock may be waiting for a reply that will never come
+            self.wake_waiters()
+        with self.lock:
+            if self.sock is not sock:
+                return
+            self.sock = None
+            sock.close()
+            self.wake_waiters()
+            if self.stopping:
+                return
+            process = self.process
+        self.dispatch({'event': 'player-exited'})
+        if process is not None:
+            # A dying mpv can still accept connections, so a restart must not find it on the socket
+            try:
+                process.wait(timeout=MPV_EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                pass
+        if self.can_restart():
+            log.warning("mpv exited unexpectedly, restarting it.")
+            self.start_in_background()
+        else:
+            log.warning("mpv keeps exiting; not restarting it until the next play.")
+
+    def can_restart(self):
+        now = time.monotonic()
+        while self.restart_times and now - self.restart_times[0] > 60:
+            self.restart_times.popleft()
+        if len(self.restart_times) >= MAX_RESTARTS_PER_MINUTE:
+            return False
+        self.restart_times.append(now)
+        return True
+
+    def command(self, *args, timeout=MPV_COMMAND_TIMEOUT):
+        """Send one IPC command, starting mpv first if needed, and return its data."""
+        if not self.is_running():
+            self.start()
+        request_id = next(self.request_ids)
+        waiter = [threading.Event(), None]
+        self.pending[request_id] = waiter
+        payload = json.dumps({"command": list(args), "request_id": request_id}).encode() + b"\n"
+        try:
+            with self.send_lock:
+                self.sock.sendall(payload)
+        except (OSError, AttributeError) as e:
+            self.pending.pop(request_id, None)
+            raise MpvError(f"Could not send {args[0]} to mpv: {e}")
+        if not waiter[0].wait(timeout):
+            self.pending.pop(request_id, None)
+            raise MpvError(f"mpv did not answer {args[0]} in time")
+        reply = waiter[1]
+        if reply is None:
+            raise MpvError(f"mpv exited while handling {args[0]}")
+        if reply.get('error') != 'success':
+            raise MpvError(f"mpv rejected {args[0]}: {reply.get('error')}")
+        return reply.get('data')
+
+    def play(self, urls, audio_device=None):
+        """Replace whatever is playing with urls, played in order as a playlist."""
+        if not urls:
+            raise MpvError("Nothing to play")
+        if audio_device:
+            self.command("set_property", "audio-device", audio_device)
+        if len(urls) == 1:
+            self.command("loadfile", urls[0], "replace")
+        else:
+            # mpv reads the playlist while handling loadlist, so the file can go straight after
+            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+                playlist_path = temp_file.name
+                for url in urls:
+                    temp_file.write(f"{url}\n")
+            try:
+                self.command("loadlist", playlist_path, "replace")
+            finally:
+                if os.path.exists(playlist_path):
+                    os.remove(playlist_path)
+        self.command("set_property", "fullscreen", True)
+        self.command("set_property", "pause", False)
+
+    def stop_playback(self):
+        self.command("stop")
+
+    def quit(self):
+        """Shut mpv down for good."""
+        with self.lock:  # Let a start that is under way finish, so its mpv is not left behind
+            self.stopping = True
+        if not self.is_running():
+            return
+        try:
+            self.command("quit", timeout=1)
+        except MpvError:
+            pass
+
+player = MpvPlayer()
@@ -0,0 +1,178 @@
+# profiling.py
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+from log_utils import get_logger
+
+log = get_logger("profile")
+
+PROFILE_DIR = os.environ.get("WHATSON_PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL = float(os.environ.get("WHATSON_PROFILE_INTERVAL_MS", "2")) / 1000
+TRACEMALLOC_FRAMES = 1  # Only the allocating line is needed for per-phase peaks
+TOP_FUNCTIONS = 15  # Functions listed per phase in the text report
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of one thread every SAMPLE_INTERVAL seconds and counts each
+    distinct stack, giving the "collapsed" format flame graph tools read
+    (flamegraph.pl, speedscope, inferno): one "root;caller;leaf count" per line.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.done.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    """
+    Opt-in profiling of named phases (startup, reloads, searches, launches). Each
+    phase gets a cProfile dump, a collapsed-stack file and its tracemalloc peak,
+    written to one directory per session along with a running report. When
+    disabled phase() is a no-op.
+
+    cProfile and the tracemalloc peak are process wide, so only one phase is
+    profiled at a time. A phase that starts while another is running (nested
+    inside it, or on another thread) only records its duration.
+    """
+
+    def __init__(self, enabled=False, base_dir=PROFILE_DIR):
+        self.enabled = False
+        self.base_dir = base_dir
+        self.session_dir = None
+        self.lock = threading.Lock()
+        self.active = None  # Name of the phase being profiled
+        self.sequence = 0
+        self.phases = []  # One record per finished phase
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.session_dir = os.path.join(self.base_dir, time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}")
+        os.makedirs(self.session_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self.enabled = True
+        log.info("Profiling enabled, writing to %s", self.session_dir)
+
+    @contextmanager
+    def phase(self, name):
+        """Profile the block as one occurrence of the phase name."""
+        if not self.enabled:
+            yield
+            return
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+            outer = self.active
+            if outer is None:
+                self.active = name
+        if outer is not None:
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.record({"sequence": sequence, "phase": name, "during": outer,
+                             "seconds": round(time.perf_counter() - started, 4)})
+            return
+
+        prefix = os.path.join(self.session_dir, f"{sequence:03d}-{name}")
+        profile = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident())
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        sampler.start()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - started
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+            sampler.stop()
+            with self.lock:
+                self.active = None
+            try:
+                profile.dump_stats(prefix + ".prof")
+                sampler.write(prefix + ".collapsed")
+            except OSError as e:
+                log.error("Error writing profile for %s: %s", name, e)
+            self.record({
+                "sequence": sequence,
+                "phase": name,
+                "seconds": round(seconds, 4),
+                "peak_kb": round((memory_peak - memory_before) / 1024, 1),
+                "retained_kb": round((memory_after - memory_before) / 1024, 1),
+                "traced_peak_kb": round(memory_peak / 1024, 1),
+                "samples": sum(sampler.stacks.values()),
+            }, self.top_functions(profile))
+
+    def top_functions(self, profile):
+        """The phase's most expensive functions by cumulative time, as text."""
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        return out.getvalue()
+
+    def record(self, record, top=None):
+        """Add a finished phase to report.jsonl and rewrite the summary table."""
+        with self.lock:
+            self.phases.append(record)
+            phases = list(self.phases)
+        if "during" in record:
+            log.info("Timed %s #%d: %.0fms (during %s)", record["phase"], record["sequence"],
+                     record["seconds"] * 1000, record["during"])
+        else:
+            log.info("Profiled %s #%d: %.0fms, peak %.0f KB", record["phase"], record["sequence"],
+                     record["seconds"] * 1000, record["peak_kb"])
+        try:
+            self.write_report(record, top, phases)
+        except OSError as e:
+            log.error("Error writing profile report: %s", e)
+
+    def write_report(self, record, top, phases):
+        with open(os.path.join(self.session_dir, "report.jsonl"), 'a') as f:
+            f.write(json.dumps(record) + "\n")
+        if top:
+            with open(os.path.join(self.session_dir, f"{record['sequence']:03d}-{record['phase']}.txt"), 'w') as f:
+                f.write(top)
+        with open(os.path.join(self.session_dir, "report.txt"), 'w') as f:
+            f.write(f"{'#':>4} {'phase':<18} {'ms':>9} {'peak KB':>10} {'retained KB':>12}\n")
+            for phase in phases:
+                f.write(f"{phase['sequence']:>4} {phase['phase']:<18} {phase['seconds'] * 1000:>9.1f} "
+                        f"{phase.get('peak_kb', '-'):>10} {phase.get('retained_kb', '-'):>12}"
+                        + (f"  (during {phase['during']})" if "during" in phase else "") + "\n")
+
+profiler = Profiler(enabled=os.environ.get("WHATSON_PROFILE") == "1")
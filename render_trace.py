@@ -0,0 +1,196 @@
+# render_trace.py
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from log_utils import get_logger
+
+log = get_logger("render")
+
+TRACE_LOG = os.environ.get("WHATSON_TRACE_LOG", "whatson_trace.jsonl")
+TRACE_LOG_MAX_BYTES = 5 * 1024 * 1024
+TRACE_LOG_BACKUPS = 3
+
+class RowTrace:
+    """Timings for building one row: per-phase durations plus request counts and bytes."""
+
+    def __init__(self, index, show_id, name):
+        self.index = index
+        self.show_id = show_id
+        self.name = name
+        self.started = time.perf_counter()
+        self.build_seconds = None  # Time spent building widgets on the Tk thread
+        self.finished = None
+        self.phases = {}  # phase name -> seconds
+        self.build_thread = threading.get_ident()
+        self.build_phase_seconds = 0.0  # Traced phases that ran inside the build itself
+        self.requests = 0
+        self.bytes = 0
+        self.pending = 0  # Background loads (images) still running for this row
+        self.lock = threading.Lock()
+
+    def add_phase(self, phase, seconds):
+        with self.lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+            if threading.get_ident() == self.build_thread and self.build_seconds is None:
+                self.build_phase_seconds += seconds
+
+    def add_request(self, nbytes):
+        with self.lock:
+            self.requests += 1
+            self.bytes += nbytes
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "time": time.time(),
+                "index": self.index,
+                "show_id": self.show_id,
+                "name": self.name,
+                "build_ms": round(self.build_seconds * 1000, 2),
+                "total_ms": round((self.finished - self.started) * 1000, 2),
+                "phases_ms": {phase: round(seconds * 1000, 2) for phase, seconds in self.phases.items()},
+                "requests": self.requests,
+                "bytes": self.bytes,
+            }
+
+class RenderTracer:
+    """
+    Lightweight tracing for row rendering. Work done on behalf of a row is
+    attributed to it through a thread-local "current row", which worker
+    threads adopt with attach(). When disabled every hook is a no-op.
+    """
+
+    def __init__(self, enabled=False, log_path=TRACE_LOG):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.local = threading.local()
+        self.recent = deque(maxlen=50)  # Most recent finished row records
+        self.listeners = []  # Called with each finished row record
+        self.logger = None
+
+    def get_logger(self):
+        if self.logger is None:
+            logger = logging.getLogger("whatson.trace")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            handler = logging.handlers.RotatingFileHandler(
+                self.log_path, maxBytes=TRACE_LOG_MAX_BYTES, backupCount=TRACE_LOG_BACKUPS)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            self.logger = logger
+        return self.logger
+
+    def current_row(self):
+        return getattr(self.local, "row", None)
+
+    def start_row(self, index, show_id, name):
+        """Start tracing a row and make it the current row on this thread."""
+        if not self.enabled:
+            return None
+        row = RowTrace(index, show_id, name)
+        self.local.row = row
+        return row
+
+    def end_row_build(self, row):
+        """Mark the synchronous part of a row build as done. The row is written once its background loads finish too."""
+        if row is None:
+            return
+        self.local.row = None
+        build_seconds = time.perf_counter() - row.started
+        row.add_phase("widgets", max(0.0, build_seconds - row.build_phase_seconds))
+        row.build_seconds = build_seconds
+        self.maybe_finish(row)
+
+    def begin_async(self, row):
+        if row is not None:
+            with row.lock:
+                row.pending += 1
+
+    def end_async(self, row):
+        if row is not None:
+            with row.lock:
+                row.pending -= 1
+            self.maybe_finish(row)
+
+    def maybe_finish(self, row):
+        with row.lock:
+            if row.pending or row.build_seconds is None or row.finished is not None:
+                return
+            row.finished = time.perf_counter()
+        record = row.to_dict()
+        self.recent.append(record)
+        self.write_record("row", record)
+        for listener in self.listeners:
+            listener(record)
+
+    def write_record(self, event, record):
+        """Append one JSON line to the rolling trace log."""
+        try:
+            self.get_logger().info(json.dumps(dict(record, event=event)))
+        except OSError as e:
+            log.error("Error writing render trace: %s", e)
+
+    def record_handoff(self, kind, item_id, trigger, seconds):
+        """
+        Log how long a click took to hand the screen over to the player. Always written,
+        whether or not row tracing is on: it is one line per launch.
+        """
+        log.info("Handed off to %s after %.0fms (%s)", kind, seconds * 1000, trigger)
+        self.write_record("handoff", {
+            "time": time.time(),
+            "kind": kind,
+            "item_id": item_id,
+            "trigger": trigger,
+            "handoff_ms": round(seconds * 1000, 2),
+        })
+
+    @contextmanager
+    def attach(self, row):
+        """Attribute work on this (worker) thread to row for the duration of the block."""
+        previous = self.current_row()
+        self.local.row = row
+        try:
+            yield row
+        finally:
+            self.local.row = previous
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the block to the current row's phase."""
+        row = self.current_row()
+        if row is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            row.add_phase(name, time.perf_counter() - started)
+
+    def add_request(self, nbytes=0):
+        row = self.current_row()
+        if row is not None:
+            row.add_request(nbytes)
+
+    def add_json_request(self, response):
+        """Count an API request. Its size is the length of the decoded JSON, only measured while tracing."""
+        row = self.current_row()
+        if row is not None:
+            row.add_request(len(json.dumps(response)) if response else 0)
+
+    def summary_lines(self, count=8):
+        """One line per recently finished row, newest last, for the on-screen overlay."""
+        lines = []
+        for record in list(self.recent)[-count:]:
+            phases = " ".join(f"{phase}={ms:.0f}" for phase, ms in sorted(record["phases_ms"].items(), key=lambda p: -p[1]))
+            lines.append(f"#{record['index']} {record['name'][:18]:<18} {record['total_ms']:6.0f}ms "
+                         f"{record['requests']}req {record['bytes'] // 1024}KB  {phases}")
+        return lines
+
+tracer = RenderTracer(enabled=os.environ.get("WHATSON_TRACE") == "1")
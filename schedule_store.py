@@ -0,0 +1,140 @@
+# schedule_store.py
+import json
+import os
+import threading
+import time
+
+from PIL import Image
+
+from log_utils import get_logger
+
+log = get_logger("store")
+
+# Written by generate_content_list.py --precompute (or --daemon) and read by the app at startup
+STORE_DIR = os.environ.get("WHATSON_STORE_DIR", "whatson_store")
+STORE_MAX_AGE = float(os.environ.get("WHATSON_STORE_MAX_AGE_HOURS", "6")) * 3600  # Older schedules are not used
+SCHEDULE_FILE = "schedule.json"
+ARTWORK_DIR = "artwork"
+SCHEDULE_VERSION = 1
+ARTWORK_QUALITY = 90
+
+# The sizes rows show artwork at, which is what gets pre-rendered
+THUMB_SIZE = (327, 184)
+POSTER_SIZE = (129, 184)
+CAST_SIZE = (90, 148)
+CAST_PER_ROW = 5
+
+def write_atomically(path, write):
+    """Call write(file) on a temporary file and move it over path, so readers never see half a file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def save_schedule(schedule, store_dir=STORE_DIR):
+    """Write a precomputed schedule: a dict of shows, channel_assignments, order, boxsets, item_to_boxsets and episodes."""
+    schedule = dict(schedule, version=SCHEDULE_VERSION, generated_at=time.time())
+    write_atomically(os.path.join(store_dir, SCHEDULE_FILE), lambda f: f.write(json.dumps(schedule).encode()))
+
+def load_schedule(server_url, store_dir=STORE_DIR, max_age=STORE_MAX_AGE):
+    """
+    The precomputed schedule for server_url, with 'ordered_shows' resolved from its
+    order, or None if there is none that is recent enough.
+    """
+    path = os.path.join(store_dir, SCHEDULE_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            schedule = json.load(f)
+    except (OSError, ValueError) as e:
+        log.error("Error loading the precomputed schedule: %s", e)
+        return None
+    age = time.time() - schedule.get('generated_at', 0)
+    if schedule.get('version') != SCHEDULE_VERSION or schedule.get('server') != server_url:
+        log.info("Ignoring the precomputed schedule in %s: it was made for another version or server", store_dir)
+        return None
+    if age > max_age:
+        log.info("Ignoring the precomputed schedule in %s: it is %.1f hours old", store_dir, age / 3600)
+        return None
+    shows_by_id = {show['Id']: show for show in schedule['shows']}
+    schedule['ordered_shows'] = [shows_by_id[item_id] for item_id in schedule['order'] if item_id in shows_by_id]
+    log.info("Using the schedule precomputed %.0f minutes ago (%d shows)", age / 60, len(schedule['shows']))
+    return schedule
+
+class ArtworkStore:
+    """
+    Artwork decoded and scaled to the exact size a row shows it at, as JPEG files
+    named by item, image type, image tag and size. A changed image has a new tag and
+    so a new file; prune() removes the files nothing refers to any more.
+    """
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.directory = os.path.join(store_dir, ARTWORK_DIR)
+        self.lock = threading.Lock()
+        self.names = None  # File names in the directory, listed on first use and added to on a miss
+
+    def name(self, item_id, image_type, tag, width, height):
+        return f"{item_id}-{image_type}-{tag}-{width}x{height}.jpg"
+
+    def contains(self, name):
+        with self.lock:
+            if self.names is None:
+                try:
+                    self.names = set(os.listdir(self.directory))
+                except OSError:
+                    self.names = set()
+            if name in self.names:
+                return True
+        # The precompute job may have rendered it since the listing (a resident app runs for days)
+        if os.path.exists(os.path.join(self.directory, name)):
+            with self.lock:
+                if self.names is not None:
+                    self.names.add(name)
+            return True
+        return False
+
+    def load(self, item_id, image_type, tag, width, height):
+        """The stored image, or None if it was never rendered. Safe to call from worker threads."""
+        name = self.name(item_id, image_type, tag, width, height)
+        if not self.contains(name):
+            return None
+        try:
+            img = Image.open(os.path.join(self.directory, name))
+            img.load()  # Reads the pixels and closes the file
+            return img.convert('RGB') if img.mode != 'RGB' else img
+        except OSError as e:
+            log.warning("Error reading stored artwork %s: %s", name, e)
+            return None
+
+    def save(self, name, img):
+        write_atomically(os.path.join(self.directory, name),
+                         lambda f: img.save(f, format='JPEG', quality=ARTWORK_QUALITY))
+        with self.lock:
+            if self.names is not None:
+                self.names.add(name)
+
+    def prune(self, keep):
+        """Delete stored artwork whose name is not in keep. Returns how many files went."""
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            if name.endswith(".jpg") and name not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    removed += 1
+                except OSError as e:
+                    log.warning("Error removing stored artwork %s: %s", name, e)
+        with self.lock:
+            self.names = None
+        return removed
+
+artwork_store = ArtworkStore()
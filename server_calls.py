@@ -0,0 +1,248 @@
+# server_calls.py
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from jellyfin_apiclient_python.exceptions import HTTPException
+
+from log_utils import get_logger
+
+log = get_logger("server")
+
+CONNECT_TIMEOUT = 2  # Seconds to open a connection; a server that is up answers far faster
+# endpoint -> (read timeout in seconds, attempts). Calls the Tk thread waits on get one short
+# attempt; background fetches can afford to retry.
+ENDPOINT_POLICIES = {
+    "library": (30, 3),  # Every show and movie, once at startup
+    "boxsets": (30, 3),
+    "episodes": (3, 1),  # Episode listings and single items for rows being built and menus
+    "item": (3, 1),
+    "playlist": (10, 3),  # Resolving what a launch plays, on a worker thread
+    "image": (5, 2),
+    "sync": (30, 3),  # The precompute job, which nobody waits on
+    "login": (10, 3),  # Logging in at startup, in the background
+}
+RETRY_BASE_DELAY = 0.2  # Seconds; the backoff doubles each attempt, with full jitter
+RETRY_MAX_DELAY = 2.0
+BREAKER_THRESHOLD = int(os.environ.get("WHATSON_BREAKER_THRESHOLD", "3"))  # Failures in a row that open the circuit
+BREAKER_COOLDOWN = float(os.environ.get("WHATSON_BREAKER_COOLDOWN", "15"))  # Seconds before a trial call is let through
+
+class ServerUnavailable(Exception):
+    """The server could not be reached, or the circuit breaker is open and no call was made."""
+
+class CircuitBreaker:
+    """
+    Stops calling a server that keeps failing. After BREAKER_THRESHOLD failures in
+    a row the circuit opens and calls fail at once; after the cooldown one trial
+    call is let through, and its success closes the circuit again.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def allow(self):
+        """Whether a call may go to the server now."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_running or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.trial_running = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                log.info("Server answered again, closing the circuit.")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or (self.opened_at is None and self.failures >= self.threshold):
+                if self.opened_at is None:
+                    log.warning("%d server calls failed in a row, using cached data for %ds.",
+                                self.failures, self.cooldown)
+                self.opened_at = time.monotonic()
+                self.trial_running = False
+
+    def is_open(self):
+        with self.lock:
+            return self.opened_at is not None
+
+def is_unauthorized(error):
+    if isinstance(error, HTTPException):
+        return error.status == "Unauthorized"
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 401
+    return False
+
+def is_retriable(error):
+    """Errors that say the server is down or overloaded, rather than that the request was wrong."""
+    if isinstance(error, HTTPException):
+        return error.status in ("ServerUnreachable", "ReadTimeout") or (
+            isinstance(error.status, int) and (error.status >= 500 or error.status == 429))
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+def describe(error):
+    """A short reason for a failed call, for log lines."""
+    if isinstance(error, HTTPException):
+        return str(error.status)
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return str(error.response.status_code)
+    return type(error).__name__ if not isinstance(error, ServerUnavailable) else str(error)
+
+def backoff_delay(attempt):
+    """Seconds to wait before retry number attempt (1-based): full jitter on a doubling ceiling."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+class ServerCaller:
+    """
+    The one way server requests are made. Each call gets its endpoint's timeout
+    and retry budget, passes through the circuit breaker, and re-authenticates
+    once on a 401. When the server cannot answer, the call's fallback (cached
+    data) is returned instead; without one, ServerUnavailable is raised.
+    """
+
+    def __init__(self, breaker=None):
+        self.breaker = breaker or CircuitBreaker()
+        self.on_unauthorized = None  # Called to log in again after a 401
+        self.lock = threading.Lock()
+        self.counters = Counter()
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def call(self, endpoint, function, *args, fallback=None, **kwargs):
+        """
+        Return function(*args, timeout=..., **kwargs), retried per the endpoint's policy.
+        fallback is a function returning cached data to use if the server cannot answer.
+        Errors that are not about the server being unavailable (a 404, a bad response)
+        are raised unchanged.
+        """
+        read_timeout, attempts = ENDPOINT_POLICIES[endpoint]
+        reauthenticated = False
+        attempt = 0
+        last_error = None
+        while attempt < attempts:
+            if not self.breaker.allow():
+                self.count("short_circuited")
+                last_error = ServerUnavailable(f"circuit open, skipped {endpoint} call")
+                break
+            attempt += 1
+            try:
+                result = function(*args, timeout=(CONNECT_TIMEOUT, read_timeout), **kwargs)
+            except Exception as e:
+                if is_unauthorized(e) and not reauthenticated and self.on_unauthorized is not None:
+                    self.breaker.record_success()  # The server answered
+                    log.warning("Authentication token invalid, attempting to re-authenticate...")
+                    reauthenticated = True
+                    attempt -= 1
+                    self.on_unauthorized()
+                    continue
+                if not is_retriable(e):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                self.count("failed_attempts")
+                last_error = e
+                if attempt < attempts:
+                    self.count("retries")
+                    delay = backoff_delay(attempt)
+                    log.debug("%s call failed (%s), retrying in %.2fs", endpoint, describe(e), delay)
+                    time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            self.count("calls")
+            return result
+
+        # While the circuit is open every call lands here; the breaker already said so once
+        level = logging.DEBUG if isinstance(last_error, ServerUnavailable) else logging.WARNING
+        if fallback is not None:
+            self.count("fallbacks")
+            log.log(level, "%s call failed (%s), falling back to cached data", endpoint, describe(last_error))
+            return fallback()
+        log.log(level, "%s call failed (%s)", endpoint, describe(last_error))
+        raise ServerUnavailable(f"{endpoint}: {describe(last_error)}") from last_error
+
+def request_key(kind, handler, params):
+    """
+    A key for an API request that ignores parameter order and the order of
+    comma separated values, so equivalent requests from different callers match.
+    """
+    normalised = []
+    for name, value in (params or {}).items():
+        if isinstance(value, str) and "," in value:
+            value = ",".join(sorted(value.split(",")))
+        normalised.append((name, str(value)))
+    return (kind, handler, tuple(sorted(normalised)))
+
+def url_key(kind, url):
+    """A key for a plain URL, with its query parameters in a fixed order."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return (kind, urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, "")))
+
+class SingleFlight:
+    """
+    Coalesces identical requests that are in flight at the same time: the first
+    caller for a key runs the fetch, and callers arriving before it finishes wait
+    for its result (or its exception) instead of sending the same request again.
+    Nothing is kept once the fetch finishes; caching is the callers' business.
+    Followers get the very object the leader got, so results must not be mutated.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}  # key -> Future of the fetch in progress
+        self.counters = Counter()  # (kind, "fetched" | "coalesced") -> count
+
+    def do(self, key, function):
+        """Return function(), or the result of an identical call already running. key[0] is the request kind."""
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Future()
+            self.counters[key[0], "fetched" if leader else "coalesced"] += 1
+        if not leader:
+            return flight.result()
+        try:
+            result = function()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.flights[key]
+
+    def summary(self):
+        """Requests sent and duplicates saved per kind, e.g. {"image": {"fetched": 40, "coalesced": 12}}."""
+        with self.lock:
+            counters = dict(self.counters)
+        summary = {}
+        for (kind, outcome), count in counters.items():
+            summary.setdefault(kind, {"fetched": 0, "coalesced": 0})[outcome] = count
+        return summary
+
+server = ServerCaller()
+single_flight = SingleFlight()
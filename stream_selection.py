@@ -0,0 +1,158 @@
+# stream_selection.py
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from urllib.parse import urlencode
+
+from log_utils import get_logger
+
+log = get_logger("stream")
+
+PLAYBACK_PROFILE_FILE = os.environ.get("WHATSON_PLAYBACK_PROFILE", "playback_profile.json")
+
+# What mpv on the living room box plays without help. Override any key in
+# playback_profile.json (or the file named by WHATSON_PLAYBACK_PROFILE).
+DEFAULT_PROFILE = {
+    "containers": ["mkv", "matroska", "webm", "mp4", "m4v", "mov", "avi", "mpegts", "ts", "m2ts"],
+    "video_codecs": ["h264", "hevc", "mpeg2video", "mpeg4", "vp8", "vp9", "av1"],
+    "audio_codecs": ["aac", "ac3", "eac3", "mp3", "mp2", "flac", "opus", "vorbis", "dts", "truehd", "pcm_s16le", "pcm_s24le"],
+    "max_height": 2160,
+    "max_bitrate": 120_000_000,  # bits per second
+    "transcode_video_codec": "h264",
+    "transcode_audio_codec": "aac",
+}
+
+DIRECT_PLAY = "direct_play"  # The file is streamed as-is and mpv demuxes and decodes it
+DIRECT_STREAM = "direct_stream"  # The server only remuxes into a container mpv can read
+TRANSCODE = "transcode"  # The server re-encodes video and/or audio
+PLAY_METHODS = (DIRECT_PLAY, DIRECT_STREAM, TRANSCODE)  # Best first
+
+def load_profile(path=PLAYBACK_PROFILE_FILE):
+    """Load the local playback capability profile, falling back to the defaults for anything the file leaves out."""
+    profile = dict(DEFAULT_PROFILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                profile.update(json.load(f))
+            log.info("Loaded playback profile from %s", path)
+        except (OSError, ValueError) as e:
+            log.error("Error loading playback profile %s: %s", path, e)
+    for key in ("containers", "video_codecs", "audio_codecs"):
+        profile[key] = {value.lower() for value in profile[key]}
+    return profile
+
+def source_streams(media_source):
+    """The video stream and the audio stream mpv would pick by default from a MediaSource."""
+    streams = media_source.get('MediaStreams') or []
+    video = next((s for s in streams if s.get('Type') == 'Video'), None)
+    audio_streams = [s for s in streams if s.get('Type') == 'Audio']
+    default_index = media_source.get('DefaultAudioStreamIndex')
+    audio = next((s for s in audio_streams if s.get('Index') == default_index), None)
+    if audio is None and audio_streams:
+        audio = audio_streams[0]
+    return video, audio
+
+def play_method(media_source, profile):
+    """
+    Classify how a MediaSource would reach mpv under profile. Containers are reported
+    as comma separated aliases ("mov,mp4,m4a"), any of which may match.
+    """
+    video, audio = source_streams(media_source)
+    codecs_ok = True
+    if video is not None:
+        if (video.get('Codec') or '').lower() not in profile["video_codecs"]:
+            codecs_ok = False
+        elif (video.get('Height') or 0) > profile["max_height"]:
+            codecs_ok = False
+    if audio is not None and (audio.get('Codec') or '').lower() not in profile["audio_codecs"]:
+        codecs_ok = False
+    if (media_source.get('Bitrate') or 0) > profile["max_bitrate"]:
+        codecs_ok = False
+    if not codecs_ok:
+        return TRANSCODE
+
+    # Direct play is checked first: a file mpv reads as-is needs no remux, whatever SupportsDirectStream says
+    containers = {c.strip().lower() for c in (media_source.get('Container') or '').split(',') if c.strip()}
+    if containers & profile["containers"] and media_source.get('SupportsDirectPlay') is not False:
+        return DIRECT_PLAY
+    if media_source.get('SupportsDirectStream') is False:
+        return TRANSCODE
+    return DIRECT_STREAM
+
+class StreamSelector:
+    """
+    Picks the MediaSource of an item that avoids a server transcode, and builds its
+    stream URL. Decisions are cached per item (they only depend on the file and
+    the profile), and counters record which path each decision took.
+    """
+
+    def __init__(self, profile=None):
+        self.profile = profile if profile is not None else load_profile()
+        self.lock = threading.Lock()
+        self.decisions = {}  # item id -> decision dict
+        self.counters = Counter()
+
+    def choose(self, item_id, media_sources):
+        """Pick the best MediaSource of item_id and remember the decision. Returns None if there are none."""
+        if not media_sources:
+            return None
+        ranked = [(PLAY_METHODS.index(play_method(source, self.profile)), position, source)
+                  for position, source in enumerate(media_sources)]
+        rank, _, source = min(ranked, key=lambda entry: entry[:2])
+        video, audio = source_streams(source)
+        decision = {
+            "media_source_id": source['Id'],
+            "method": PLAY_METHODS[rank],
+            "video_codec": (video or {}).get('Codec'),
+            "audio_codec": (audio or {}).get('Codec'),
+        }
+        with self.lock:
+            self.decisions[item_id] = decision
+            self.counters[decision["method"]] += 1
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Stream for %s: %s (%s/%s); so far %s", item_id, decision['method'],
+                      decision['video_codec'], decision['audio_codec'], self.summary())
+        return decision
+
+    def cached(self, item_id):
+        """The decision made earlier for item_id, or None."""
+        with self.lock:
+            return self.decisions.get(item_id)
+
+    def invalidate(self, item_id):
+        with self.lock:
+            self.decisions.pop(item_id, None)
+
+    def stream_url(self, server_url, item_id, decision, access_token):
+        """Build the stream URL for a decision. No request is made."""
+        method = decision["method"]
+        params = {"MediaSourceId": decision["media_source_id"]}
+        if method == DIRECT_PLAY:
+            # Static makes the server send the file untouched instead of running it through ffmpeg
+            path = f"/Videos/{item_id}/stream"
+            params["Static"] = "true"
+        elif method == DIRECT_STREAM:
+            # Asking for the source's own codecs lets the server copy the streams into mkv
+            path = f"/Videos/{item_id}/stream.mkv"
+            params["VideoCodec"] = decision["video_codec"] or "copy"
+            params["AudioCodec"] = decision["audio_codec"] or "copy"
+        else:
+            path = f"/Videos/{item_id}/stream.mkv"
+            params["VideoCodec"] = self.profile["transcode_video_codec"]
+            params["AudioCodec"] = self.profile["transcode_audio_codec"]
+            params["MaxHeight"] = self.profile["max_height"]
+        params["api_key"] = access_token
+        return f"{server_url}{path}?{urlencode(params)}"
+
+    def counts(self):
+        """Decisions per playback path so far, e.g. {"direct_play": 4, "direct_stream": 1, "transcode": 0}."""
+        with self.lock:
+            return {method: self.counters[method] for method in PLAY_METHODS}
+
+    def summary(self):
+        """Counts of each playback path so far, e.g. 'direct_play=4 direct_stream=1 transcode=0'."""
+        return " ".join(f"{method}={count}" for method, count in self.counts().items())
+
+stream_selector = StreamSelector()
@@ -0,0 +1,65 @@
+import pytest
+
+from fake_jellyfin import FakeJellyfinServer, SyntheticLibrary
+import generate_content_list
+import jellyfin_utils
+from server_calls import CircuitBreaker
+
+@pytest.fixture
+def fake_server(monkeypatch, tmp_path):
+    server = FakeJellyfinServer(SyntheticLibrary(series=12, episodes_per_series=2, movies=8), port=0).start()
+    monkeypatch.setattr(jellyfin_utils, "JELLYFIN_URL", server.url)
+    monkeypatch.setattr(jellyfin_utils, "USER_ID", None)
+    monkeypatch.setattr(jellyfin_utils, "server_id", None)
+    monkeypatch.setattr(jellyfin_utils.server, "breaker", CircuitBreaker())
+    monkeypatch.setattr(generate_content_list, "CACHE_FILE", str(tmp_path / "boxset_cache.json"))
+    yield server
+    server.stop()
+
+def library_items(server):
+    return server.library.series + server.library.movies
+
+def expected_mapping(server):
+    library = server.library
+    mapping = {item['Id']: [] for item in library_items(server)}
+    for boxset in library.boxsets:
+        for item_id in library.children[boxset['Id']]:
+            mapping[item_id].append(boxset['Name'])
+    return {item_id: collections + ["Random"] for item_id, collections in mapping.items()}
+
+def test_full_refresh_lists_each_boxset_once(fake_server):
+    boxsets = fake_server.library.boxsets
+    for refresh_cache in (False, True):
+        fake_server.stats.clear()
+        _, item_to_boxsets = generate_content_list.sync_boxsets(library_items(fake_server), refresh_cache)
+        # One listing of the BoxSets, then one of each BoxSet's members
+        assert fake_server.stats["items"] == 1 + len(boxsets)
+        assert item_to_boxsets == expected_mapping(fake_server)
+
+    fake_server.stats.clear()
+    _, item_to_boxsets = generate_content_list.sync_boxsets(library_items(fake_server))
+    assert fake_server.stats["items"] == 0
+    assert item_to_boxsets == expected_mapping(fake_server)
+
+def test_interrupted_refresh_resumes_with_the_rest(fake_server, monkeypatch):
+    boxsets = fake_server.library.boxsets
+    unreachable = {boxset['Id'] for boxset in boxsets[:3]}
+    fetch_boxset_members = generate_content_list.fetch_boxset_members
+
+    def fetch_some(boxset_id):
+        if boxset_id in unreachable:
+            raise ConnectionError("BoxSet unreachable")
+        return fetch_boxset_members(boxset_id)
+
+    monkeypatch.setattr(generate_content_list, "fetch_boxset_members", fetch_some)
+    generate_content_list.sync_boxsets(library_items(fake_server))
+    assert fake_server.stats["items"] == 1 + len(boxsets) - len(unreachable)
+    # Nothing is cached until a refresh completes
+    assert generate_content_list.load_cached_boxsets() == (None, None)
+
+    unreachable.clear()
+    fake_server.stats.clear()
+    _, item_to_boxsets = generate_content_list.sync_boxsets(library_items(fake_server))
+    assert fake_server.stats["items"] == 1 + 3
+    assert item_to_boxsets == expected_mapping(fake_server)
+    assert generate_content_list.load_cached_boxsets()[1] == expected_mapping(fake_server)
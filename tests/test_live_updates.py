@@ -0,0 +1,162 @@
+import queue
+import time
+
+import pytest
+
+from fake_jellyfin import FakeJellyfinServer, SyntheticLibrary, send_frame
+import jellyfin_utils
+import live_updates
+from episode_cache import episode_cache
+from metadata_service import EPISODE_FIELDS
+from server_calls import CircuitBreaker
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeJellyfinServer(SyntheticLibrary(series=3, episodes_per_series=4, movies=2), port=0).start()
+    # Log in to this server rather than whatever the environment points at
+    monkeypatch.setattr(jellyfin_utils, "JELLYFIN_URL", server.url)
+    monkeypatch.setattr(live_updates, "JELLYFIN_URL", server.url)
+    monkeypatch.setattr(jellyfin_utils, "USER_ID", None)
+    monkeypatch.setattr(jellyfin_utils, "server_id", None)
+    # Failures a test provokes must not leave the circuit open for the next one
+    monkeypatch.setattr(jellyfin_utils.server, "breaker", CircuitBreaker())
+    yield server
+    server.stop()
+
+@pytest.fixture
+def on_changes():
+    """What the listener calls with each LibraryChanges; tests may replace it."""
+    changes = queue.Queue()
+    return [changes.put], changes
+
+@pytest.fixture
+def listener(fake_server, on_changes):
+    callback, changes = on_changes
+    listener = live_updates.NotificationListener(lambda received: callback[0](received))
+    listener.start()
+    assert wait_until(lambda: fake_server.sockets), "the listener never opened its socket"
+    yield listener, changes
+    listener.stop()
+    listener.join(5)
+    assert not listener.is_alive()
+
+def next_changes(changes, predicate, timeout=5):
+    """The first LibraryChanges matching predicate, skipping others."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AssertionError("no matching changes arrived")
+        received = changes.get(timeout=remaining)
+        if predicate(received):
+            return received
+
+def test_user_data_changed_patches_cached_episodes(fake_server, listener):
+    _, changes = listener
+    series = fake_server.library.series[0]
+    episodes = jellyfin_utils.get_episode_listing(series['Id'], EPISODE_FIELDS)
+    episode = episodes[0]
+    played = not episode['UserData'].get('Played')
+
+    assert fake_server.mark_played(episode['Id'], played=played) == 1
+    received = next_changes(changes, lambda c: series['Id'] in c.refresh)
+    assert episode_cache.get(episode['Id'])['UserData']['Played'] is played
+    listing = episode_cache.get_series(series['Id'])
+    assert listing[0]['UserData']['Played'] is played
+    assert not received.resync
+
+def test_user_data_changed_for_uncached_items(fake_server, listener):
+    _, changes = listener
+    movie = fake_server.library.movies[0]
+    fake_server.mark_played(movie['Id'], played=not movie['UserData']['Played'])
+    received = next_changes(changes, lambda c: movie['Id'] in c.user_data)
+    assert received.user_data[movie['Id']]['Played'] is movie['UserData']['Played']
+    assert movie['Id'] in received.refresh
+
+def test_library_changed_reports_removed_items(fake_server, listener):
+    _, changes = listener
+    movie = fake_server.library.movies[1]
+    fake_server.notify("LibraryChanged", {"ItemsRemoved": [movie['Id']]})
+    received = next_changes(changes, lambda c: c.removed)
+    assert received.removed == {movie['Id']}
+
+def test_repeated_messages_are_dropped(fake_server, listener):
+    listener, _ = listener
+    listener.handle(None, {"MessageType": "LibraryChanged", "MessageId": "same", "Data": {}})
+    listener.handle(None, {"MessageType": "LibraryChanged", "MessageId": "same", "Data": {}})
+    assert listener.counters["LibraryChanged"] == 1
+
+def test_reconnect_reports_resync(fake_server, listener):
+    _, changes = listener
+    series = fake_server.library.series[1]
+    jellyfin_utils.get_episode_listing(series['Id'], EPISODE_FIELDS)
+    assert episode_cache.get_series(series['Id']) is not None
+
+    fake_server.close_sockets()
+    received = next_changes(changes, lambda c: c.resync)
+    assert received.resync
+    assert wait_until(lambda: fake_server.sockets)
+    # Anything cached may have missed changes, so listings are only kept as a fallback
+    assert episode_cache.get_series(series['Id']) is None
+    assert episode_cache.get_series(series['Id'], allow_stale=True) is not None
+
+    # Messages still arrive on the new socket
+    movie = fake_server.library.movies[0]
+    fake_server.mark_played(movie['Id'], played=not movie['UserData']['Played'])
+    next_changes(changes, lambda c: movie['Id'] in c.user_data)
+
+def test_failed_fetch_still_reports_removals_and_resyncs(fake_server, listener):
+    _, changes = listener
+    removed, updated = fake_server.library.movies[0], fake_server.library.series[2]
+    jellyfin_utils.get_episode_listing(updated['Id'], EPISODE_FIELDS)
+
+    fake_server.failing.add("items")
+    fake_server.notify("LibraryChanged", {"ItemsRemoved": [removed['Id']], "ItemsUpdated": [updated['Id']]})
+    received = next_changes(changes, lambda c: c.removed, timeout=10)
+    assert received.removed == {removed['Id']}
+    assert received.resync
+    assert updated['Id'] not in received.items
+    assert episode_cache.get_series(updated['Id']) is None
+
+def send_raw(fake_server, payload):
+    with fake_server.sockets_lock:
+        sockets = list(fake_server.sockets.items())
+    for connection, lock in sockets:
+        with lock:
+            send_frame(connection, 0x1, payload)
+
+def test_bad_frames_do_not_stop_the_listener(fake_server, listener):
+    listener, changes = listener
+    send_raw(fake_server, b"not json")
+    send_raw(fake_server, b"[1, 2]")
+    movie = fake_server.library.movies[1]
+    fake_server.mark_played(movie['Id'], played=not movie['UserData']['Played'])
+    next_changes(changes, lambda c: movie['Id'] in c.user_data)
+    assert listener.is_alive()
+
+def test_failing_callback_does_not_stop_the_listener(fake_server, listener, on_changes):
+    listener, changes = listener
+    callback, _ = on_changes
+    calls = []
+
+    def fail_once(received):
+        calls.append(received)
+        if len(calls) == 1:
+            raise RuntimeError("broken handler")
+        changes.put(received)
+
+    callback[0] = fail_once
+    movie = fake_server.library.movies[0]
+    fake_server.mark_played(movie['Id'], played=not movie['UserData']['Played'])
+    fake_server.mark_played(movie['Id'], played=movie['UserData']['Played'])
+    next_changes(changes, lambda c: movie['Id'] in c.user_data)
+    assert len(calls) == 2
+    assert listener.is_alive()
@@ -0,0 +1,124 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from fake_mpv import FakeMpvServer
+import mpv_player
+from mpv_player import MpvPlayer
+
+FAKE_MPV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fake_mpv.py")
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+class EventLog:
+    """Collects the events an MpvPlayer reports to its listeners."""
+
+    def __init__(self, player):
+        self.events = []
+        self.changed = threading.Condition()
+        player.listeners.append(self.add)
+
+    def add(self, message):
+        with self.changed:
+            self.events.append(message)
+            self.changed.notify_all()
+
+    def names(self):
+        return [event['event'] for event in self.events]
+
+    def starts(self):
+        """How many times mpv was (re)started: each start observes idle-active, which mpv reports at once."""
+        return sum(1 for event in self.events if event['event'] == 'property-change' and event.get('name') == 'idle-active'
+                   and event.get('data') is True)
+
+    def wait_for(self, name, timeout=5):
+        with self.changed:
+            return self.changed.wait_for(lambda: name in self.names(), timeout)
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "mpv.sock")
+
+@pytest.fixture
+def fake_mpv(socket_path):
+    server = FakeMpvServer(socket_path, playback_delay=0.01).start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def player(socket_path):
+    # Restarts launch fake_mpv.py as a process, the way a real mpv would be launched
+    player = MpvPlayer(socket_path=socket_path, mpv_command=(sys.executable, FAKE_MPV))
+    yield player
+    player.quit()
+    if player.process is not None and player.process.poll() is None:
+        player.process.kill()
+
+def test_play_one_url_sends_loadfile(fake_mpv, player):
+    player.play(["http://example/video"])
+    assert ["loadfile", "http://example/video", "replace"] in fake_mpv.commands
+    assert fake_mpv.properties["fullscreen"] is True
+    assert fake_mpv.properties["pause"] is False
+    assert player.process is None  # The mpv already on the socket was adopted
+
+def test_play_several_urls_sends_loadlist(fake_mpv, player):
+    urls = ["http://example/1", "http://example/2", "http://example/3"]
+    player.play(urls)
+    loadlist = [command for command in fake_mpv.commands if command[0] == "loadlist"]
+    assert len(loadlist) == 1
+    assert fake_mpv.playlist == urls
+    assert not os.path.exists(loadlist[0][1])  # The playlist file is removed once mpv has read it
+
+def test_rejected_command_raises(fake_mpv, player):
+    with pytest.raises(mpv_player.MpvError):
+        player.command("no-such-command")
+
+def test_playback_events(fake_mpv, player):
+    events = EventLog(player)
+    player.play(["http://example/video"])
+    assert events.wait_for("playback-restart")
+    assert fake_mpv.properties["idle-active"] is False
+
+    fake_mpv.end_playback()
+    assert events.wait_for("idle")
+    assert "end-file" in events.names()
+    idle_changes = [event['data'] for event in events.events
+                    if event['event'] == 'property-change' and event.get('name') == 'idle-active']
+    assert idle_changes[-1] is True
+
+def test_restarts_are_limited(fake_mpv, player, monkeypatch):
+    monkeypatch.setattr(mpv_player, "MAX_RESTARTS_PER_MINUTE", 2)
+    events = EventLog(player)
+    player.start()
+    assert wait_until(lambda: events.starts() == 1)
+
+    # The adopted mpv goes away: a new one is launched in the background
+    fake_mpv.stop()
+    assert wait_until(lambda: events.starts() == 2)
+    assert player.is_running() and player.process is not None
+    first_process = player.process
+
+    # It exits too: restarted once more, which uses up the budget
+    first_process.kill()
+    assert wait_until(lambda: events.starts() == 3)
+    assert player.process is not first_process
+
+    # Another exit within the minute is not restarted
+    player.process.kill()
+    assert wait_until(lambda: events.names().count("player-exited") == 3)
+    time.sleep(0.3)
+    assert not player.is_running()
+    assert events.starts() == 3
+
+    # The next play starts mpv again
+    player.play(["http://example/video"])
+    assert player.is_running()
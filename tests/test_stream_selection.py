@@ -0,0 +1,67 @@
+from stream_selection import (DEFAULT_PROFILE, DIRECT_PLAY, DIRECT_STREAM, TRANSCODE, StreamSelector, load_profile,
+                              play_method)
+
+PROFILE = load_profile(path="/nonexistent/playback_profile.json")
+
+def media_source(source_id="source", container="mkv", video="h264", audio="aac", height=1080, **fields):
+    return dict({
+        "Id": source_id,
+        "Container": container,
+        "MediaStreams": [
+            {"Type": "Video", "Index": 0, "Codec": video, "Height": height},
+            {"Type": "Audio", "Index": 1, "Codec": audio},
+        ],
+    }, **fields)
+
+def test_playable_file_is_direct_play():
+    assert play_method(media_source(), PROFILE) == DIRECT_PLAY
+
+def test_container_aliases_match():
+    assert play_method(media_source(container="mov,mp4,m4a"), PROFILE) == DIRECT_PLAY
+
+def test_unknown_container_is_direct_stream():
+    assert play_method(media_source(container="wtv"), PROFILE) == DIRECT_STREAM
+
+def test_direct_play_wins_over_supports_direct_stream_false():
+    assert play_method(media_source(SupportsDirectStream=False), PROFILE) == DIRECT_PLAY
+
+def test_remux_the_server_refuses_is_transcode():
+    assert play_method(media_source(container="wtv", SupportsDirectStream=False), PROFILE) == TRANSCODE
+
+def test_supports_direct_play_false_is_direct_stream():
+    assert play_method(media_source(SupportsDirectPlay=False), PROFILE) == DIRECT_STREAM
+
+def test_unsupported_codecs_or_limits_are_transcode():
+    assert play_method(media_source(video="wmv3"), PROFILE) == TRANSCODE
+    assert play_method(media_source(audio="wmapro"), PROFILE) == TRANSCODE
+    assert play_method(media_source(height=4320), PROFILE) == TRANSCODE
+    assert play_method(media_source(Bitrate=DEFAULT_PROFILE["max_bitrate"] + 1), PROFILE) == TRANSCODE
+
+def test_default_audio_stream_is_checked():
+    source = media_source(audio="aac", DefaultAudioStreamIndex=2)
+    source["MediaStreams"].append({"Type": "Audio", "Index": 2, "Codec": "wmapro"})
+    assert play_method(source, PROFILE) == TRANSCODE
+
+def test_choose_prefers_the_best_method_then_the_first_source():
+    selector = StreamSelector(profile=PROFILE)
+    sources = [media_source("transcoded", video="wmv3"), media_source("remuxed", container="wtv"),
+               media_source("direct"), media_source("direct-too")]
+    decision = selector.choose("item", sources)
+    assert decision["media_source_id"] == "direct"
+    assert decision["method"] == DIRECT_PLAY
+    assert (decision["video_codec"], decision["audio_codec"]) == ("h264", "aac")
+    assert selector.cached("item") is decision
+
+def test_choose_counts_each_path():
+    selector = StreamSelector(profile=PROFILE)
+    selector.choose("a", [media_source()])
+    selector.choose("b", [media_source(container="wtv")])
+    selector.choose("c", [media_source(video="wmv3")])
+    assert selector.choose("d", []) is None
+    assert selector.counts() == {DIRECT_PLAY: 1, DIRECT_STREAM: 1, TRANSCODE: 1}
+
+def test_invalidate_forgets_the_decision():
+    selector = StreamSelector(profile=PROFILE)
+    selector.choose("item", [media_source()])
+    selector.invalidate("item")
+    assert selector.cached("item") is None
@@ -44,4 +44,76 @@ def get_font_size(description, series_title, episode_title=None):
 
     reduce_title = desc_length > 420
 
-    return series_font_size, desc_font_size, reduce_title
\ No newline at end of file
+    return series_font_size, desc_font_size, reduce_title
+
+def layout_description(series_name, episode_title, description):
+    """
+    Work out how a row's description is laid out in its Text widget.
+    Returns a dict with the font sizes and the (text, tag) segments to insert, in order.
+    """
+    description = truncate_description(description)
+    series_font_size, desc_font_size, reduce_title = get_font_size(description, series_name, episode_title)
+
+    desc_length = len(description)
+    if episode_title:
+        desc_length += len(episode_title) + 2
+
+    segments = []
+    if episode_title:
+        parts = episode_title.split(" Episode ", 1)
+        if len(parts) == 2:
+            series_part = parts[0]
+            episode_part = parts[1]
+            episode_subparts = episode_part.split(": ", 1)
+            if len(episode_subparts) == 2:
+                episode_prefix = f"Episode {episode_subparts[0]}"
+                episode_name = episode_subparts[1]
+            else:
+                episode_prefix = f"Episode {episode_part}"
+                episode_name = ""
+
+            segments.append((series_part, "series_name"))
+            segments.append(("     ", "spacer"))
+            segments.append((episode_prefix, "episode_prefix"))
+            if episode_name:
+                segments.append((": ", "episode_prefix"))
+                segments.append((episode_name, "episode_name"))
+            segments.append((".", "period"))
+            if desc_length <= 350:
+                segments.append(("\n", "description"))
+                if len(description) < 300:
+                    segments.append(("\n", "description"))
+            else:
+                segments.append((" ", "description"))
+            segments.append((description, "description"))
+        else:
+            segments.append((series_name.upper(), "series_name"))
+            segments.append(("     ", "spacer"))
+            segments.append((episode_title, "episode_prefix"))
+            segments.append((".", "period"))
+            if desc_length <= 350:
+                segments.append(("\n", "description"))
+                if len(description) < 200:
+                    segments.append(("\n", "description"))
+            else:
+                segments.append((" ", "description"))
+            segments.append((description, "description"))
+    else:
+        segments.append((series_name.upper(), "series_name"))
+        segments.append((" ", "spacer"))
+        desc_part = description
+        if description.startswith(series_name.upper() + " "):
+            desc_part = description[len(series_name.upper()) + 1:]
+        if desc_length <= 350:
+            segments.append(("\n", "description"))
+            if len(description) < 330:
+                segments.append(("\n", "description"))
+        else:
+            segments.append((" ", "description"))
+        segments.append((desc_part, "description"))
+
+    return {
+        "series_font_size": series_font_size,
+        "desc_font_size": desc_font_size,
+        "segments": tuple(segments),
+    }
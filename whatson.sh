@@ -6,8 +6,15 @@ VENV_PATH="/opt/scripts/Whatson/.venv"
 # Activate the virtual environment
 source "$VENV_PATH/bin/activate"
 
-# Run the Python script
-python /opt/scripts/Whatson/Whatson.py
+# Run the Python script. Pass --resident (or set WHATSON_RESIDENT=1) to keep the
+# guide running in the background during playback instead of exiting.
+# WHATSON_LOG_LEVEL=DEBUG (or WHATSON_LOG=jellyfin=debug,schedule=debug for single
+# modules) turns on the per-item log lines. --profile (or WHATSON_PROFILE=1) writes
+# cProfile, flame graph and memory data for startup, searches and launches to profiles/.
+# Changes made on the server are picked up live; WHATSON_LIVE_UPDATES=0 turns that off.
+# Startup reads the schedule and artwork from whatson_store/ when generate_content_list.py
+# --precompute (see systemd/) has written one in the last WHATSON_STORE_MAX_AGE_HOURS.
+python /opt/scripts/Whatson/Whatson.py "$@"
 
 # Deactivate the virtual environment (optional, since the script will exit)
 deactivate
\ No newline at end of file
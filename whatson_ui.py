@@ -4,19 +4,52 @@ from tkinter import ttk
 from PIL import Image, ImageTk
 import ttkbootstrap as tb
 import os
-import subprocess
-import random
 import time
 import threading
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import webbrowser  # Added for opening the browser
-from jellyfin_apiclient_python import JellyfinClient
-
-from jellyfin_utils import get_image, launch_show, get_description, get_cast_image
-from ui_utils import truncate_description, get_font_size
+import jellyfin_utils
+
+from jellyfin_utils import (launch_show, resolve_playback_target, load_image, load_cast_image,
+                            get_image_preview, get_cast_image_preview, JELLYFIN_URL)
+from ui_utils import layout_description
+from episode_cache import episode_cache
+from render_trace import tracer
+from audio_devices import get_non_default_audio_device
+from mpv_player import player, MpvError
+from log_utils import get_logger
+from profiling import profiler
+from server_calls import single_flight
+from stream_selection import stream_selector
+from metadata_service import MetadataService
+from schedule_store import THUMB_SIZE, POSTER_SIZE, CAST_SIZE, CAST_PER_ROW
+
+log = get_logger("ui")
+
+TK_QUEUE_POLL_MS = 30  # How often results from worker threads are handed to Tk
+IMAGE_WORKERS = 8
+ROW_HEIGHT = 184
+ROW_PITCH = ROW_HEIGHT + 5  # Row height plus the gap below it
+OVERSCAN_ROWS = 2  # Rows kept built above and below the viewport
+SCROLL_STEP_PX = 20
+WHEEL_SCROLL_STEPS = 3
+SCROLL_SETTLE_MS = 200  # Page requests closer together than this are a burst: only the last page is built
+HANDOFF_TIMEOUT_MS = 15000  # Hide the UI anyway if mpv never reports that playback started
+BROWSER_HANDOFF_MS = 4000  # The browser reports nothing, so the UI hides after a fixed delay
+PREFETCH_DELAY_MS = 500  # How long the list must stay still before playback targets are resolved
+PREFETCH_WORKERS = 2
+PLAYBACK_TARGET_TTL = 600  # Seconds a resolved playback target is trusted
+LAYOUT_CACHE_SIZE = 500  # Description layouts kept, least recently used dropped first
+EPISODES_PER_SUBMENU = 25  # Longer episode lists are split into lazily built submenus
+MENU_STYLE = dict(tearoff=0, bg='#0A1A2F', fg='#ffffff', activebackground='#555555', activeforeground='#ffffff', font=('Helvetica', 24))
 
 class WhatsonUI:
-    def __init__(self, root, color_scheme, scroll_up_callback, scroll_down_callback, filter_callback, set_search_mode_callback):
+    def __init__(self, root, color_scheme, scroll_up_callback, scroll_down_callback, filter_callback, set_search_mode_callback,
+                 resident=False):
         self.root = root
+        self.resident = resident  # Hide during playback and come back when it ends, instead of exiting
         self.color_scheme = color_scheme
         self.scroll_up_callback = scroll_up_callback
         self.scroll_down_callback = scroll_down_callback
@@ -48,7 +81,8 @@ class WhatsonUI:
         except:
             ttk.Label(self.top_frame, text="[Logo]", font=('Helvetica', 14), foreground='#ffffff').pack(side=tk.LEFT, padx=10)
 
-        ttk.Label(self.top_frame, text="Whatson", font=('Helvetica', 16, 'bold'), foreground='#ffffff').pack(side=tk.LEFT, padx=10)
+        self.title_label = ttk.Label(self.top_frame, text="Whatson", font=('Helvetica', 16, 'bold'), foreground='#ffffff')
+        self.title_label.pack(side=tk.LEFT, padx=10)
 
         self.search_frame = ttk.Frame(self.top_frame)
         self.search_frame.pack(side=tk.LEFT, padx=20)
@@ -106,47 +140,36 @@ class WhatsonUI:
         self.root.bind('<KeyPress>', self.focus_search_bar)
         self.root.bind('<Up>', self.scroll_up)
         self.root.bind('<Down>', self.scroll_down)
+        self.root.bind('<F12>', self.toggle_trace_overlay)
 
         main_frame = ttk.Frame(self.root, padding=0)
         main_frame.pack(fill='both', expand=True, pady=0)
 
-        self.show_frames = []
+        # The show list is a canvas as tall as every row put together. Only the rows in
+        # view (plus a few either side) exist as widgets; they are built and destroyed as
+        # the canvas scrolls, so the list costs the same however large the library is.
+        self.canvas = tk.Canvas(main_frame, bg='#121212', highlightthickness=0, borderwidth=0,
+                                yscrollincrement=SCROLL_STEP_PX)
+        self.canvas.pack(fill='both', expand=True)
+        self.canvas.bind('<Configure>', self.on_canvas_configure)
+        self.root.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.root.bind('<Button-4>', self.on_mouse_wheel)
+        self.root.bind('<Button-5>', self.on_mouse_wheel)
+
+        self.shows = []  # Every show in the list, in display order
+        self.channel_assignments = {}
+        self.row_frames = {}  # list index -> row frame, for rows that are built
+        self.row_windows = {}  # list index -> canvas window item holding the row frame
         self.desc_widgets = {}
         self.selected_episodes = {}
         self.show_ids = {}
-        for i in range(5):
-            frame = ttk.Frame(main_frame, height=184, padding=0, style="DarkBlue.TFrame")
-            frame.pack(fill='x', pady=(0, 5))
-            frame.pack_propagate(False)
-            self.show_frames.append(frame)
-            self.desc_widgets[i] = None
-
-        self.client = JellyfinClient()
-        self.client.config.app('Whatson', '1.0', 'MomDevice', 'MomDeviceId')
-        self.client.config.data['auth.ssl'] = False
-        JELLYFIN_URL = 'http://localhost:8096'
-        server_info = self.client.auth.connect_to_server({'address': JELLYFIN_URL})
-
-        server_id = None
-        if 'Id' in server_info:
-            server_id = server_info['Id']
-        else:
-            creds = self.client.auth.credentials.get()
-            if 'Servers' in creds and creds['Servers']:
-                server_id = creds['Servers'][0].get('Id')
-            if not server_id:
-                raise Exception("Failed to connect to server. Server ID not found in server info or credentials.")
-        self.server_id = server_id  # Store server_id for use in web player URL
-
-        credentials = self.client.auth.login(JELLYFIN_URL, 'Vicki', 'mom')
-        if not credentials or 'User' not in credentials or 'AccessToken' not in credentials:
-            raise Exception("Failed to authenticate. Check server URL, username, and password.")
-        self.user_id = credentials['User']['Id']
-
-        self.client.config.data['auth.server'] = JELLYFIN_URL
-        self.client.config.data['auth.user-id'] = self.user_id
-        self.client.config.data['auth.server-id'] = server_id
-        self.client.config.data['auth.token'] = credentials['AccessToken']
+        self.show_items = {}  # show id -> show dict for the rows currently built
+        self.layout_cache = OrderedDict()  # (show_id, selected episode id, description hash) -> description layout
+        self.scroll_target = None  # Top index a burst of page requests is heading for, while it lasts
+        self.scroll_settle_timer = None
+        self.scroll_preview = None  # Text-only list of the target page, shown during a burst
+        self.channel_images = {}  # channel name -> logo PhotoImage
+        self.blank_cast_image = None
 
         self.current_menu = None
         self.menu_x = 0
@@ -156,6 +179,33 @@ class WhatsonUI:
         self.loading_label = None  # Initialize the loading label as None
         self.flashing = False  # Flag to control the flashing loop
 
+        # Full-size images are downloaded in worker threads while a blurhash preview
+        # is shown. Worker threads never touch widgets: they queue callbacks that
+        # process_tk_queue runs on the Tk thread.
+        self.image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS)
+        self.tk_queue = queue.Queue()
+        self.render_generation = 0
+        self.root.after(TK_QUEUE_POLL_MS, self.process_tk_queue)
+        # Episode listings and details are looked up the same way, so no server call
+        # ever runs on the Tk thread
+        self.metadata = MetadataService(self.call_on_tk_thread)
+
+        # What a click on each visible row would play is resolved in the background
+        # once the list stops moving, so the click can go straight to the player.
+        self.playback_targets = {}  # (show id, selected episode id) -> (time resolved, urls)
+        self.pending_targets = set()
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+        self.prefetch_timer = None
+
+        # The UI hides when mpv reports that playback started (see begin_handoff)
+        self.handoff = None
+        self.playing_item = None  # Show being played while a resident UI is hidden
+        player.listeners.append(self.on_player_event)
+
+        # Render timing overlay, toggled with F12 (WHATSON_TRACE=1 also logs every row)
+        self.trace_overlay = None
+        tracer.listeners.append(lambda record: self.call_on_tk_thread(self.update_trace_overlay))
+
     def focus_search_bar(self, event):
         if event.char and event.char.isprintable():
             if self.root.focus_get() != self.filter_entry:
@@ -169,7 +219,8 @@ class WhatsonUI:
         self.filter_shows()
 
     def filter_shows(self, *args):
-        self.filter_callback(*args)
+        with profiler.phase("filter_shows"):
+            self.filter_callback(*args)
 
     def scroll_up(self, event=None):
         self.scroll_up_callback(event)
@@ -178,12 +229,252 @@ class WhatsonUI:
         self.scroll_down_callback(event)
 
     def clear_frames(self):
-        for frame in self.show_frames:
-            for widget in frame.winfo_children():
-                widget.destroy()
+        for index in list(self.row_frames):
+            self.destroy_row(index)
         self.show_ids.clear()
-        for i in range(5):
-            self.desc_widgets[i] = None
+        self.show_items.clear()
+        self.desc_widgets.clear()
+        self.render_generation += 1  # Images still loading for the old list are dropped
+
+    def rows_per_page(self):
+        """Number of whole rows that fit in the window."""
+        return max(1, self.canvas.winfo_height() // ROW_PITCH)
+
+    def first_visible_index(self):
+        return int(round(self.canvas.canvasy(0) / ROW_PITCH))
+
+    def pending_top_index(self):
+        """The top row the list is at, or is heading for during a burst of page requests."""
+        if self.scroll_target is not None:
+            return self.scroll_target
+        return self.first_visible_index()
+
+    def request_scroll(self, index):
+        """
+        Page to index. A single request renders straight away; requests that follow
+        within SCROLL_SETTLE_MS (a held arrow key) only move the target and update a
+        text-only preview, and the page the burst ends on is built once it settles.
+        """
+        if self.scroll_settle_timer is None:
+            self.scroll_to_index(index)
+        else:
+            self.root.after_cancel(self.scroll_settle_timer)
+            self.scroll_target = index
+            self.show_scroll_preview(index)
+        self.scroll_settle_timer = self.root.after(SCROLL_SETTLE_MS, self.settle_scroll)
+
+    def settle_scroll(self):
+        self.scroll_settle_timer = None
+        target = self.scroll_target
+        if target is None:
+            return
+        self.scroll_target = None
+        self.hide_scroll_preview()
+        self.scroll_to_index(target)
+
+    def cancel_scroll(self):
+        """Drop a burst in progress, e.g. because the list itself changed."""
+        if self.scroll_settle_timer is not None:
+            self.root.after_cancel(self.scroll_settle_timer)
+            self.scroll_settle_timer = None
+        self.scroll_target = None
+        self.hide_scroll_preview()
+
+    def show_scroll_preview(self, index):
+        """Cover the list with the names and channels of the target page. Costs one label update, no fetches."""
+        if self.scroll_preview is None:
+            self.scroll_preview = tk.Label(self.canvas, anchor='nw', justify='left', font=('Helvetica', 28),
+                                           foreground='#ffffff', background='#0A1A2F', padx=40, pady=20)
+        lines = []
+        for show in self.shows[index:index + self.rows_per_page()]:
+            channel = self.channel_assignments.get(show['Id'], '')
+            lines.append(f"{channel:<14}  {show.get('Name', 'Unknown')}")
+        lines.append(f"\n{index + 1}–{min(len(self.shows), index + self.rows_per_page())} of {len(self.shows)}")
+        self.scroll_preview.configure(text="\n".join(lines))
+        self.scroll_preview.place(x=0, y=0, relwidth=1, relheight=1)
+        self.scroll_preview.lift()
+
+    def hide_scroll_preview(self):
+        if self.scroll_preview is not None:
+            self.scroll_preview.place_forget()
+
+    def scroll_to_index(self, index):
+        """Scroll so that the show at index is the top row."""
+        total_height = len(self.shows) * ROW_PITCH
+        self.canvas.yview_moveto(index * ROW_PITCH / total_height if total_height else 0)
+        self.update_visible_rows()
+
+    def update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), len(self.shows) * ROW_PITCH))
+
+    def on_canvas_configure(self, event):
+        for window in self.row_windows.values():
+            self.canvas.itemconfigure(window, width=event.width)
+        self.update_scrollregion()
+        self.update_visible_rows()
+
+    def on_mouse_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            steps = -WHEEL_SCROLL_STEPS
+        else:
+            steps = WHEEL_SCROLL_STEPS
+        self.canvas.yview_scroll(steps, 'units')
+        self.update_visible_rows()
+
+    def update_visible_rows(self):
+        """Build the rows that are in (or near) view and destroy the ones that scrolled away."""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        visible_first = int(top // ROW_PITCH)
+        visible_last = int(bottom // ROW_PITCH) + 1
+        first = max(0, visible_first - OVERSCAN_ROWS)
+        last = min(len(self.shows), visible_last + OVERSCAN_ROWS)
+
+        for index in list(self.row_frames):
+            if not first <= index < last:
+                self.destroy_row(index)
+
+        # Build the rows on screen before the overscan rows
+        wanted = [index for index in range(first, last) if index not in self.row_frames]
+        wanted.sort(key=lambda index: not visible_first <= index < visible_last)
+        try:
+            for index in wanted:
+                self.build_row(index, self.shows[index])
+        except Exception as e:
+            log.error("Error in load_ordered_shows: %s", e)
+            raise
+        self.schedule_target_prefetch()
+
+    def schedule_target_prefetch(self):
+        """Resolve playback targets for the visible rows once the list has stopped moving."""
+        if self.prefetch_timer is not None:
+            self.root.after_cancel(self.prefetch_timer)
+        self.prefetch_timer = self.root.after(PREFETCH_DELAY_MS, self.prefetch_playback_targets)
+
+    def playback_target_key(self, show_id):
+        return (show_id, self.selected_episodes.get(show_id))
+
+    def get_playback_target(self, key):
+        entry = self.playback_targets.get(key)
+        if entry is None or time.monotonic() - entry[0] > PLAYBACK_TARGET_TTL:
+            return None
+        return entry[1]
+
+    def invalidate_playback_target(self, show_id):
+        for key in [key for key in self.playback_targets if key[0] == show_id]:
+            del self.playback_targets[key]
+
+    def prefetch_playback_targets(self):
+        self.prefetch_timer = None
+        top_index = self.first_visible_index()
+        for index in range(top_index, top_index + self.rows_per_page()):
+            show_id = self.show_ids.get(index)
+            if show_id is None:
+                continue
+            key = self.playback_target_key(show_id)
+            if key in self.pending_targets or self.get_playback_target(key) is not None:
+                continue
+            self.pending_targets.add(key)
+            if key[1]:
+                item_id, item_type = key[1], 'Episode'
+            else:
+                item_id, item_type = show_id, self.show_items.get(show_id, {}).get('Type')
+            self.prefetch_executor.submit(self.resolve_target_in_background, key, item_id, item_type)
+
+    def resolve_target_in_background(self, key, item_id, item_type):
+        try:
+            urls = resolve_playback_target(item_id, item_type)
+        except Exception as e:
+            log.error("Error resolving playback target for %s: %s", item_id, e)
+            urls = None
+        self.call_on_tk_thread(self.store_playback_target, key, urls)
+
+    def store_playback_target(self, key, urls):
+        self.pending_targets.discard(key)
+        # Drop it if a different episode was picked while it was being resolved
+        if urls and self.playback_target_key(key[0]) == key:
+            self.playback_targets[key] = (time.monotonic(), urls)
+
+    def destroy_row(self, index):
+        frame = self.row_frames.pop(index)
+        self.metadata.cancel_owner(frame)
+        self.canvas.delete(self.row_windows.pop(index))
+        frame.destroy()
+        show_id = self.show_ids.pop(index, None)
+        self.show_items.pop(show_id, None)
+        self.desc_widgets.pop(index, None)
+
+    def show_image(self, label, preview, loader, *args):
+        """Paint a preview into an image label now and swap in the full image once loader(*args) returns it."""
+        photo = ImageTk.PhotoImage(preview)
+        label.configure(image=photo)
+        label.image = photo
+
+        generation = self.render_generation
+        row_trace = tracer.current_row()
+        tracer.begin_async(row_trace)
+        def load():
+            try:
+                if generation != self.render_generation:
+                    return  # The page changed before this image was reached
+                with tracer.attach(row_trace):
+                    img = loader(*args)
+            except Exception as e:
+                log.error("Error loading image: %s", e)
+                return
+            finally:
+                tracer.end_async(row_trace)
+            if img is not None:
+                self.call_on_tk_thread(self.apply_image, generation, label, img)
+
+        self.image_executor.submit(load)
+
+    def apply_image(self, generation, label, img):
+        if generation != self.render_generation or not label.winfo_exists():
+            return
+        photo = ImageTk.PhotoImage(img)
+        label.configure(image=photo)
+        label.image = photo
+
+    def call_on_tk_thread(self, callback, *args):
+        """Queue callback(*args) to run on the Tk thread. Safe to call from any thread."""
+        self.tk_queue.put((callback, args))
+
+    def process_tk_queue(self):
+        """Run callbacks queued by worker threads. Runs on the Tk thread."""
+        while True:
+            try:
+                callback, args = self.tk_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                log.error("Error in queued UI callback: %s", e)
+        try:
+            self.root.after(TK_QUEUE_POLL_MS, self.process_tk_queue)
+        except tk.TclError:
+            pass  # The window has been destroyed
+
+    def toggle_trace_overlay(self, event=None):
+        """Show or hide the per-row render timing overlay. Showing it turns tracing on."""
+        if self.trace_overlay is not None:
+            self.trace_overlay.destroy()
+            self.trace_overlay = None
+            return
+        tracer.enabled = True
+        self.trace_overlay = tk.Label(self.root, justify='left', anchor='nw', font=('Monospace', 9),
+                                      bg='#000000', fg='#ADFF2F', text="Render trace: scroll to record rows")
+        self.trace_overlay.place(relx=1.0, rely=1.0, anchor='se')
+        self.update_trace_overlay()
+
+    def update_trace_overlay(self):
+        if self.trace_overlay is None or not self.trace_overlay.winfo_exists():
+            return
+        lines = tracer.summary_lines()
+        if lines:
+            self.trace_overlay.configure(text="\n".join(lines))
+        self.trace_overlay.lift()
 
     def show_loading_indicator(self):
         """Hide the search bar and show a flashing 'LOADING' label in the center of the top frame."""
@@ -222,92 +513,139 @@ class WhatsonUI:
         if self.loading_label and self.loading_label.winfo_exists():
             self.loading_label.pack_forget()
 
+    def begin_handoff(self, kind, item_id, timeout_ms=HANDOFF_TIMEOUT_MS):
+        """
+        Show the loading indicator and wait for the player to take over the screen.
+        The UI closes when mpv reports playback started, or after timeout_ms.
+        """
+        self.show_loading_indicator()
+        if self.handoff is not None:
+            self.root.after_cancel(self.handoff["timer"])
+        self.handoff = {
+            "kind": kind,
+            "item_id": item_id,
+            "started": time.perf_counter(),
+            "timer": self.root.after(timeout_ms, self.complete_handoff, "timeout"),
+        }
+
+    def on_player_event(self, event):
+        """Called on the mpv IPC thread for every player event."""
+        if event.get('event') == 'playback-restart':
+            self.call_on_tk_thread(self.complete_handoff, "playback")
+        elif self.resident and self.is_playback_over(event):
+            self.call_on_tk_thread(self.restore_after_playback)
+
+    def is_playback_over(self, event):
+        """mpv went back to idle (the playlist finished or was stopped), or exited."""
+        if event.get('event') == 'player-exited':
+            return True
+        return event.get('event') == 'property-change' and event.get('name') == 'idle-active' and event.get('data')
+
+    def complete_handoff(self, trigger):
+        handoff = self.handoff
+        if handoff is None:
+            return
+        self.handoff = None
+        self.root.after_cancel(handoff["timer"])
+        tracer.record_handoff(handoff["kind"], handoff["item_id"], trigger, time.perf_counter() - handoff["started"])
+        if not self.resident:
+            self.close_ui()
+        elif handoff["kind"] == "mpv":
+            self.hide_for_playback(handoff["item_id"])
+        else:
+            # The browser reports nothing back, so just leave the guide ready behind it
+            self.hide_loading_indicator()
+            self.search_frame.pack(side=tk.LEFT, padx=20, after=self.title_label)
+
+    def hide_for_playback(self, item_id):
+        """Resident mode: withdraw the window while mpv plays, keeping every cache and the schedule."""
+        self.hide_loading_indicator()
+        self.search_frame.pack(side=tk.LEFT, padx=20, after=self.title_label)
+        self.playing_item = item_id
+        log.info("Hiding UI while %s plays.", item_id)
+        self.root.withdraw()
+
+    def restore_after_playback(self):
+        """Resident mode: playback ended, so bring the guide back with the played show's watch state refreshed."""
+        item_id = self.playing_item
+        if item_id is None:
+            return
+        self.playing_item = None
+        log.info("Playback of %s ended, restoring UI.", item_id)
+        self.root.deiconify()
+        self.root.attributes('-zoomed', True)
+        self.refresh_watch_state(item_id)
+
+    def refresh_watch_state(self, show_id):
+        """Forget what is known about one show's progress and rebuild its row, leaving the other rows alone."""
+        episode_cache.invalidate_series(show_id)
+        self.selected_episodes.pop(show_id, None)  # The next episode to play has moved on
+        self.refresh_rows({show_id})
+
+    def refresh_rows(self, show_ids):
+        """Rebuild the rows of shows whose details changed, dropping playback targets and layouts worked out from the old ones."""
+        for show_id in show_ids:
+            self.invalidate_playback_target(show_id)
+        for key in [key for key in self.layout_cache if key[0] in show_ids]:
+            del self.layout_cache[key]
+        for index, sid in list(self.show_ids.items()):
+            if sid in show_ids and index in self.row_frames:
+                self.destroy_row(index)
+                self.build_row(index, self.shows[index])
+        self.schedule_target_prefetch()
+
+    def abort_handoff(self):
+        """The launch failed: stop waiting, restore the search bar and rebuild the rows."""
+        handoff = self.handoff
+        if handoff is None:
+            return
+        self.handoff = None
+        self.root.after_cancel(handoff["timer"])
+        self.hide_loading_indicator()
+        self.search_frame.pack(side=tk.LEFT, padx=20, after=self.title_label)
+        self.load_ordered_shows(self.shows, self.channel_assignments, self.first_visible_index())
+
     def launch_kuro7_stream(self):
-        """Launch the KIRO 7 video stream, clear all rows, show loading indicator, and close the UI after a delay."""
+        """Launch the KIRO 7 video stream, clear all rows, show loading indicator, and close the UI once it plays."""
         # Show the loading indicator
-        self.show_loading_indicator()
+        self.begin_handoff("mpv", "KIRO 7")
 
         # Clear content of all frames immediately
         def update_ui():
-            for frame in self.show_frames:
+            for frame in self.row_frames.values():
                 if frame.winfo_exists():
                     self.clear_frame_content(frame)
 
-        self.root.after(0, update_ui)  # Update UI immediately (delay = 0)
+        if not self.resident:
+            self.root.after(0, update_ui)  # Update UI immediately (delay = 0)
 
         # Launch the stream in a separate thread
         def start_mpv():
             stream_url = "https://amg00327-coxmediagroup-kironow-ono-zkqw3.amagi.tv/playlist/amg00327-coxmediagroup-kironow-ono/390ed178-1753-11f0-b595-06caa58e52b6/89/640x360_1057680/index.m3u8"
             try:
-                audio_device = self.get_non_default_audio_device()
-                mpv_command = ["mpv", "--fs", "--msg-level=all=info"]
-                if audio_device:
-                    mpv_command.append(f"--audio-device={audio_device}")
-                mpv_command.append(stream_url)
-                subprocess.run(mpv_command, check=True)
-            except subprocess.CalledProcessError as e:
-                print(f"Error launching MPV for KIRO 7 stream: {e}")
+                with profiler.phase("launch"):
+                    player.play([stream_url], get_non_default_audio_device())
+                return
+            except MpvError as e:
+                log.error("Error launching MPV for KIRO 7 stream: %s", e)
             except FileNotFoundError:
-                print("MPV not found. Please ensure MPV is installed on your system.")
+                log.error("MPV not found. Please ensure MPV is installed on your system.")
             except Exception as e:
-                print(f"Error launching KIRO 7 stream: {e}")
+                log.error("Error launching KIRO 7 stream: %s", e)
+            self.call_on_tk_thread(self.abort_handoff)
 
         # Start MPV in a separate thread
         threading.Thread(target=start_mpv, daemon=True).start()
 
-        # After 4 seconds, close the main UI (changed from 5s to 4s)
-        self.root.after(4000, self.close_ui)
-
-    def get_non_default_audio_device(self):
-        try:
-            result = subprocess.run(["mpv", "--audio-device=help"], capture_output=True, text=True, check=True)
-            lines = result.stdout.splitlines()
-            audio_devices = []
-            for line in lines:
-                line = line.strip()
-                if line and (line.startswith("alsa/") or line.startswith("pulse/") or line.startswith("auto")):
-                    audio_devices.append(line)
-            for device in audio_devices:
-                if 'hdmi' in device.lower() and 'SAMSUNG' in device:
-                    return device
-            for device in audio_devices:
-                if 'hdmi' in device.lower() and device != 'auto':
-                    return device
-            return "alsa/hdmi:CARD=HDMI,DEV=1"
-        except subprocess.CalledProcessError as e:
-            print(f"Error listing audio devices: {e}")
-            return "alsa/hdmi:CARD=HDMI,DEV=1"
-        except FileNotFoundError:
-            print("MPV not found. Please ensure MPV is installed.")
-            return None
-
-    def fetch_episodes(self, show_id):
-        """Fetch all episodes for the given show, grouped by season."""
-        try:
-            response = self.client.jellyfin.user_items(params={
-                'ParentId': show_id,
-                'Recursive': True,
-                'IncludeItemTypes': 'Episode',
-                'SortBy': 'ParentIndexNumber,IndexNumber',
-                'SortOrder': 'Ascending',
-                'Fields': 'Overview,ParentIndexNumber,IndexNumber,UserData'
-            })
-            episodes = response.get('Items', [])
-            if not episodes:
-                return None, None
-
-            # Group episodes by season
-            seasons = {}
-            for episode in episodes:
-                season_num = episode.get('ParentIndexNumber', 0)
-                if season_num not in seasons:
-                    seasons[season_num] = []
-                seasons[season_num].append(episode)
-
-            return seasons, episodes
-        except Exception as e:
-            print(f"Error fetching episodes for show ID {show_id}: {e}")
-            return None, None
+    def group_by_season(self, episodes):
+        """Group episodes by season number, keeping their order."""
+        seasons = {}
+        for episode in episodes:
+            season_num = episode.get('ParentIndexNumber', 0)
+            if season_num not in seasons:
+                seasons[season_num] = []
+            seasons[season_num].append(episode)
+        return seasons
 
     def dismiss_menu(self, event):
         """Dismiss the current context menu if a click occurs outside it."""
@@ -327,20 +665,17 @@ class WhatsonUI:
             self.menu_height = 0
 
     def open_episode_selector(self, show_id, frame_index, event):
-        """Open a context menu to select a season and episode for the given show."""
-        # Fetch the show details to check its type
-        try:
-            show = self.client.jellyfin.get_item(show_id)
-            item_type = show.get('Type', '')
-            if item_type == "Movie":
-                return  # Skip opening the menu for movies
-        except Exception as e:
-            print(f"Error fetching show details for show ID {show_id}: {e}")
-            return
-
-        seasons, episodes = self.fetch_episodes(show_id)
-        if not seasons or not episodes:
-            return
+        """
+        Open a context menu to select a season and episode for the given show.
+
+        The menu opens straight away: from the episode cache when the show has been
+        listed before, otherwise with a placeholder that is filled in once the
+        listing arrives from the metadata service. Season submenus are only built
+        when they are first opened.
+        """
+        show = self.show_items.get(show_id, {})
+        if show.get('Type', '') == "Movie":
+            return  # Skip opening the menu for movies
 
         # If a menu is already open, dismiss it
         if self.current_menu:
@@ -348,7 +683,7 @@ class WhatsonUI:
             self.current_menu = None
 
         # Create the main context menu with a larger font
-        menu = tk.Menu(self.root, tearoff=0, bg='#0A1A2F', fg='#ffffff', activebackground='#555555', activeforeground='#ffffff', font=('Helvetica', 24))
+        menu = tk.Menu(self.root, **MENU_STYLE)
         self.current_menu = menu
 
         # Store the menu position and size (approximate for now, Tkinter doesn't provide direct access to menu geometry)
@@ -357,37 +692,12 @@ class WhatsonUI:
         self.menu_width = 300  # Approximate width (can adjust based on font size and content)
         self.menu_height = 400  # Approximate height
 
-        # If there's only one season, skip the season level and show episodes directly
-        if len(seasons) == 1:
-            season_num = list(seasons.keys())[0]
-            for episode in seasons[season_num]:
-                episode_num = episode.get('IndexNumber', 'Unknown')
-                try:
-                    episode_num = int(episode_num)
-                except (ValueError, TypeError):
-                    episode_num = 0
-                episode_name = episode.get('Name', 'Untitled Episode')
-                episode_id = episode['Id']
-                episode_label = f"E{episode_num}: {episode_name}"
-                menu.add_command(label=episode_label, command=lambda eid=episode_id: self.select_episode(eid, show_id))
+        episodes = episode_cache.get_series(show_id)
+        if episodes:
+            self.populate_episode_menu(menu, show_id, episodes)
         else:
-            # Add seasons to the menu
-            for season_num in sorted(seasons.keys()):
-                season_label = f"Season {season_num}" if season_num != 0 else "Specials"
-                submenu = tk.Menu(menu, tearoff=0, bg='#0A1A2F', fg='#ffffff', activebackground='#555555', activeforeground='#ffffff', font=('Helvetica', 24))
-                menu.add_cascade(label=season_label, menu=submenu)
-
-                # Add episodes to the submenu
-                for episode in seasons[season_num]:
-                    episode_num = episode.get('IndexNumber', 'Unknown')
-                    try:
-                        episode_num = int(episode_num)
-                    except (ValueError, TypeError):
-                        episode_num = 0
-                    episode_name = episode.get('Name', 'Untitled Episode')
-                    episode_id = episode['Id']
-                    episode_label = f"E{episode_num}: {episode_name}"
-                    submenu.add_command(label=episode_label, command=lambda eid=episode_id: self.select_episode(eid, show_id))
+            menu.add_command(label="Loading episodes...", state='disabled')
+            self.metadata.episodes(show_id, callback=lambda episodes: self.on_episodes_loaded(menu, show_id, episodes))
 
         # Display the menu at the click position
         try:
@@ -397,9 +707,62 @@ class WhatsonUI:
         finally:
             menu.grab_release()
 
+    def on_episodes_loaded(self, menu, show_id, episodes):
+        """Replace the loading placeholder once a show's episodes arrive, if its menu is still open."""
+        if menu is not self.current_menu or not menu.winfo_exists():
+            return
+        menu.delete(0, tk.END)
+        if episodes:
+            self.populate_episode_menu(menu, show_id, episodes)
+        else:
+            menu.add_command(label="No episodes found", state='disabled')
+
+    def populate_episode_menu(self, menu, show_id, episodes):
+        seasons = self.group_by_season(episodes)
+        # If there's only one season, skip the season level and show episodes directly
+        if len(seasons) == 1:
+            self.add_episode_entries(menu, show_id, next(iter(seasons.values())))
+            return
+        for season_num in sorted(seasons.keys()):
+            season_label = f"Season {season_num}" if season_num != 0 else "Specials"
+            self.add_lazy_submenu(menu, season_label, show_id, seasons[season_num])
+
+    def add_lazy_submenu(self, menu, label, show_id, episodes):
+        """Add a cascade whose episode entries are only created the first time it is opened."""
+        submenu = tk.Menu(menu, **MENU_STYLE)
+
+        def build():
+            if submenu.index(tk.END) is None:
+                self.add_episode_entries(submenu, show_id, episodes)
+
+        submenu.configure(postcommand=build)
+        menu.add_cascade(label=label, menu=submenu)
+
+    def add_episode_entries(self, menu, show_id, episodes):
+        """Add one entry per episode, or lazily built ranges when there are too many for one menu."""
+        if len(episodes) > EPISODES_PER_SUBMENU:
+            for start in range(0, len(episodes), EPISODES_PER_SUBMENU):
+                chunk = episodes[start:start + EPISODES_PER_SUBMENU]
+                label = f"Episodes {self.episode_number(chunk[0])}-{self.episode_number(chunk[-1])}"
+                self.add_lazy_submenu(menu, label, show_id, chunk)
+            return
+        for episode in episodes:
+            episode_name = episode.get('Name', 'Untitled Episode')
+            episode_id = episode['Id']
+            episode_label = f"E{self.episode_number(episode)}: {episode_name}"
+            menu.add_command(label=episode_label, command=lambda eid=episode_id: self.select_episode(eid, show_id))
+
+    def episode_number(self, episode):
+        try:
+            return int(episode.get('IndexNumber', 'Unknown'))
+        except (ValueError, TypeError):
+            return 0
+
     def select_episode(self, episode_id, show_id):
         """Handle episode selection from the context menu and update the description."""
         self.selected_episodes[show_id] = episode_id
+        self.invalidate_playback_target(show_id)
+        self.schedule_target_prefetch()
 
         # Find the frame index for this show
         frame_index = None
@@ -409,83 +772,15 @@ class WhatsonUI:
                 break
 
         if frame_index is None:
-            print(f"Could not find frame index for show ID {show_id}")
+            log.warning("Could not find frame index for show ID %s", show_id)
             return
 
-        # Fetch the episode details and update the description
-        try:
-            episode = self.client.jellyfin.get_item(episode_id)
-            season_num = episode.get('ParentIndexNumber', 0)
-            episode_num = episode.get('IndexNumber', 'Unknown')
-            try:
-                episode_num = int(episode_num)
-            except (ValueError, TypeError):
-                episode_num = 0
-            episode_name = episode.get('Name', 'Untitled Episode')
-            episode_overview = episode.get('Overview', 'No description available')
-            series_name = episode.get('SeriesName', 'Unknown Series')
-
-            desc_text = self.desc_widgets[frame_index]
-            if desc_text:
-                desc_text.configure(state='normal')
-                desc_text.delete("1.0", tk.END)
-                title_parts = []
-                if season_num is not None and episode_num is not None:
-                    title_parts.append(f"{series_name.upper()} Episode {season_num}.{episode_num:02d}:")
-                else:
-                    title_parts.append(f"{series_name.upper()} Episode:")
-                title_parts.append(episode_name)
-                episode_title = " ".join(title_parts)
-                description = episode_overview
-
-                # Recalculate font size and spacing based on the new description
-                description = truncate_description(description)
-                series_font_size, desc_font_size, reduce_title = get_font_size(description, series_name, episode_title)
-
-                # Update the tags with the new font sizes and spacing
-                desc_text.tag_configure("series_name",
-                                        font=('Helvetica', series_font_size, "underline"),
-                                        foreground=self.color_scheme["series"],
-                                        spacing1=5,
-                                        spacing3=0)
-                desc_text.tag_configure("spacer",
-                                        font=('Helvetica', desc_font_size),
-                                        foreground=self.color_scheme["series"],
-                                        spacing1=0,
-                                        spacing3=0)
-                desc_text.tag_configure("episode_prefix",
-                                        font=('Arial', desc_font_size),
-                                        foreground=self.color_scheme["episode"],
-                                        spacing1=0,
-                                        spacing3=0)
-                desc_text.tag_configure("episode_name",
-                                        font=('Arial', desc_font_size, "italic"),
-                                        foreground=self.color_scheme["episode"],
-                                        spacing1=0,
-                                        spacing3=0)
-                desc_text.tag_configure("description",
-                                        font=('Helvetica', desc_font_size),
-                                        foreground=self.color_scheme["desc"],
-                                        spacing1=0,
-                                        spacing3=2)
-                desc_text.tag_configure("period",
-                                        font=('Arial', desc_font_size),
-                                        foreground="#ADFF2F",
-                                        spacing1=0,
-                                        spacing3=0)
-
-                desc_text.insert(tk.END, series_name.upper(), "series_name")
-                desc_text.insert(tk.END, "     ", "spacer")
-                desc_text.insert(tk.END, f"Episode {season_num}.{episode_num:02d}: {episode_name}", "episode_prefix")
-                desc_text.insert(tk.END, ".", "period")
-                desc_text.insert(tk.END, "\n", "description")
-                desc_text.insert(tk.END, description, "description")
-                desc_text.tag_configure("center", justify='left')
-                desc_text.tag_add("center", "1.0", "end")
-                desc_text.configure(state='disabled')
-                desc_text.update_idletasks()
-        except Exception as e:
-            print(f"Error fetching episode details for episode ID {episode_id}: {e}")
+        # Look up the episode details and update the description when they arrive
+        frame = self.row_frames.get(frame_index)
+        series_name = self.show_items.get(show_id, {}).get('Name', 'Unknown Series')
+        self.metadata.episode_description(
+            series_name, episode_id, owner=frame,
+            callback=lambda result: self.on_description_loaded(frame, frame_index, show_id, episode_id, result))
 
         self.current_menu = None
         self.menu_x = 0
@@ -493,316 +788,215 @@ class WhatsonUI:
         self.menu_width = 0
         self.menu_height = 0
 
-    def load_ordered_shows(self, current_shows, channel_assignments):
-        try:
+    def on_description_loaded(self, frame, frame_index, show_id, episode_id, result):
+        """Render a description looked up by the metadata service, if its row is still on screen."""
+        if self.row_frames.get(frame_index) is not frame or self.show_ids.get(frame_index) != show_id:
+            return
+        if self.selected_episodes.get(show_id) != episode_id:
+            return  # Another episode was picked while this one was being looked up
+        desc_text = self.desc_widgets.get(frame_index)
+        if not desc_text:
+            return
+        episode_title, description = result
+        series_name = self.show_items.get(show_id, {}).get('Name', 'Unknown Series')
+        layout = self.get_description_layout(show_id, episode_id, series_name, episode_title, description)
+        self.render_description(desc_text, layout)
+
+    def get_description_layout(self, show_id, episode_id, series_name, episode_title, description):
+        """Get the description layout for a row, computing and caching it on first use."""
+        key = (show_id, episode_id, hash((series_name, episode_title, description)))
+        layout = self.layout_cache.get(key)
+        if layout is None:
+            layout = layout_description(series_name, episode_title, description)
+            layout["tags"] = self.description_tags(layout["series_font_size"], layout["desc_font_size"])
+            self.layout_cache[key] = layout
+            # A resident UI runs for days, and every new episode pick or random description adds a key
+            if len(self.layout_cache) > LAYOUT_CACHE_SIZE:
+                self.layout_cache.popitem(last=False)
+        else:
+            self.layout_cache.move_to_end(key)
+        return layout
+
+    def description_tags(self, series_font_size, desc_font_size):
+        """Text tag options for a description rendered at the given font sizes."""
+        scheme = self.color_scheme
+        episode_font_family = "Arial"
+        desc_font_family = "Helvetica"
+        return {
+            "series_name": dict(font=(desc_font_family, series_font_size, "underline"),
+                                foreground=scheme["series"], spacing1=5, spacing3=0),
+            "spacer": dict(font=(desc_font_family, desc_font_size),
+                           foreground=scheme["series"], spacing1=0, spacing3=0),
+            "episode_prefix": dict(font=(episode_font_family, desc_font_size),
+                                   foreground=scheme["episode"], spacing1=0, spacing3=0),
+            "episode_name": dict(font=(episode_font_family, desc_font_size, "italic"),
+                                 foreground=scheme["episode"], spacing1=0, spacing3=0),
+            "description": dict(font=(desc_font_family, desc_font_size),
+                                foreground=scheme["desc"], spacing1=0, spacing3=2),
+            "period": dict(font=(episode_font_family, desc_font_size),
+                           foreground="#ADFF2F", spacing1=0, spacing3=0),
+            "center": dict(justify='left'),
+        }
+
+    def render_description(self, desc_text, layout):
+        """Replace the contents of a description Text widget with a precomputed layout."""
+        desc_text.configure(state='normal')
+        desc_text.delete("1.0", tk.END)
+        for tag, options in layout["tags"].items():
+            desc_text.tag_configure(tag, **options)
+        # Text.insert takes alternating text/tag arguments, so the whole layout goes in with one call
+        desc_text.insert(tk.END, *[part for segment in layout["segments"] for part in segment])
+        desc_text.tag_add("center", "1.0", "end")
+        desc_text.configure(state='disabled')
+
+    def load_ordered_shows(self, shows, channel_assignments, first_index=0):
+        """Show a new list of shows, scrolled so that shows[first_index] is the top row."""
+        with profiler.phase("load_ordered_shows"):
+            self.cancel_scroll()
             self.clear_frames()
-
-            scheme = self.color_scheme
-
-            for frame_index, (frame, show) in enumerate(zip(self.show_frames, current_shows + [None] * (5 - len(current_shows)))):
-                if show is None:
-                    continue
-
-                show_id = show['Id']
-                self.show_ids[frame_index] = show_id
-
-                channel = channel_assignments[show_id]
-                channel_img = self.get_channel_image(channel)
-                channel_logo = ttk.Label(frame, image=channel_img)
-                channel_logo.image = channel_img
-                channel_logo.pack(side=tk.LEFT, padx=2)
-                # Add click event to filter by channel
-                channel_logo.bind("<Button-1>", lambda e, ch=channel: self.set_search_mode_callback("channel", ch))
-
-                img = get_image(show, width=327, height=184, image_type='Thumb')
-                img_label = ttk.Label(frame, image=img)
-                img_label.image = img
-                img_label.pack(side=tk.LEFT, padx=2)
-                img_label.bind("<Button-1>", lambda e, id=show_id: self.on_thumb_click(id))
-
-                description_frame = ttk.Frame(frame, width=700, style="DarkBlue.TFrame")
-                description_frame.pack(side=tk.LEFT, fill='both', expand=True, padx=2)
-                description_frame.pack_propagate(False)
-
-                series_name = show.get('Name', 'Unknown Series')
-                series_overview = show.get('Overview', 'No description available')
-
-                # Check if an episode has been manually selected
-                selected_episode_id = self.selected_episodes.get(show_id)
-                if selected_episode_id:
-                    # Always show the selected episode's description
-                    try:
-                        episode = self.client.jellyfin.get_item(selected_episode_id)
-                        season_num = episode.get('ParentIndexNumber', 0)
-                        episode_num = episode.get('IndexNumber', 'Unknown')
-                        try:
-                            episode_num = int(episode_num)
-                        except (ValueError, TypeError):
-                            episode_num = 0
-                        episode_name = episode.get('Name', 'Untitled Episode')
-                        episode_overview = episode.get('Overview', 'No description available')
-
-                        title_parts = []
-                        if season_num is not None and episode_num is not None:
-                            title_parts.append(f"{series_name.upper()} Episode {season_num}.{episode_num:02d}:")
-                        else:
-                            title_parts.append(f"{series_name.upper()} Episode:")
-                        title_parts.append(episode_name)
-                        episode_title = " ".join(title_parts)
-                        description = episode_overview
-                    except Exception as e:
-                        print(f"Error fetching selected episode details for episode ID {selected_episode_id}: {e}")
-                        episode_title = None
-                        description = series_overview
-                else:
-                    # Fetch episodes to determine watched status and first episode
-                    seasons, episodes = self.fetch_episodes(show_id)
-                    if not episodes:
-                        episode_title = None
-                        description = series_overview
-                    else:
-                        # Check if the show is unwatched or fully watched
-                        is_unwatched = True
-                        all_watched = True
-                        for episode in episodes:
-                            ep_user_data = episode.get('UserData', {})
-                            if ep_user_data.get('PlaybackPositionTicks', 0) > 0 or ep_user_data.get('Played', False):
-                                is_unwatched = False
-                            if not ep_user_data.get('Played', False):
-                                all_watched = False
-
-                        if all_watched:
-                            # If all episodes are watched, always show the series overview
-                            episode_title = None
-                            description = series_overview
-                        elif is_unwatched:
-                            # If the show is unwatched, 50% chance to show series overview or first episode
-                            use_series_overview = random.choice([True, False])
-                            if use_series_overview:
-                                episode_title = None
-                                description = series_overview
-                            else:
-                                first_episode = episodes[0]
-                                season_num = first_episode.get('ParentIndexNumber', 0)
-                                episode_num = first_episode.get('IndexNumber', 'Unknown')
-                                try:
-                                    episode_num = int(episode_num)
-                                except (ValueError, TypeError):
-                                    episode_num = 0
-                                ep_name = first_episode.get('Name', 'Untitled Episode')
-                                ep_overview = first_episode.get('Overview', 'No description available')
-
-                                title_parts = []
-                                if season_num is not None and episode_num is not None:
-                                    title_parts.append(f"{series_name.upper()} Episode {season_num}.{episode_num:02d}:")
-                                else:
-                                    title_parts.append(f"{series_name.upper()} Episode:")
-                                title_parts.append(ep_name)
-                                episode_title = " ".join(title_parts)
-                                description = ep_overview
-                        else:
-                            # Default to get_description (shows next unwatched episode)
-                            _, episode_title, description = get_description(show)
-
-                description = truncate_description(description)
-
-                series_font_size, desc_font_size, reduce_title = get_font_size(description, series_name, episode_title)
-
-                episode_font_family = "Arial"
-                episode_font_color = scheme["episode"]
-                desc_font_family = "Helvetica"
-                desc_font_color = scheme["desc"]
-
-                desc_text = tk.Text(
-                    description_frame,
-                    wrap='word',
-                    foreground='#ffffff',
-                    background=scheme["bg"],
-                    borderwidth=0,
-                    highlightthickness=0,
-                    height=10
-                )
-                desc_text.pack(expand=True, fill='both')
-                self.desc_widgets[frame_index] = desc_text
-
-                desc_text.tag_configure("series_name",
-                                        font=(desc_font_family, series_font_size, "underline"),
-                                        foreground=scheme["series"],
-                                        spacing1=5,
-                                        spacing3=0)
-                desc_text.tag_configure("spacer",
-                                        font=(desc_font_family, desc_font_size),
-                                        foreground=scheme["series"],
-                                        spacing1=0,
-                                        spacing3=0)
-                desc_text.tag_configure("episode_prefix",
-                                        font=(episode_font_family, desc_font_size),
-                                        foreground=episode_font_color,
-                                        spacing1=0,
-                                        spacing3=0)
-                desc_text.tag_configure("episode_name",
-                                        font=(episode_font_family, desc_font_size, "italic"),
-                                        foreground=episode_font_color,
-                                        spacing1=0,
-                                        spacing3=0)
-                desc_text.tag_configure("description",
-                                        font=(desc_font_family, desc_font_size),
-                                        foreground=desc_font_color,
-                                        spacing1=0,
-                                        spacing3=2)
-                desc_text.tag_configure("period",
-                                        font=(episode_font_family, desc_font_size),
-                                        foreground="#ADFF2F",
-                                        spacing1=0,
-                                        spacing3=0)
-
-                desc_text.tag_bind("series_name", "<Button-1>",
-                                   lambda e, sid=show_id, fi=frame_index: self.open_episode_selector(sid, fi, e))
-
-                desc_length = len(description)
-                if episode_title:
-                    desc_length += len(episode_title) + 2
-
-                if episode_title:
-                    parts = episode_title.split(" Episode ", 1)
-                    if len(parts) == 2:
-                        series_part = parts[0]
-                        episode_part = parts[1]
-                        episode_subparts = episode_part.split(": ", 1)
-                        if len(episode_subparts) == 2:
-                            episode_prefix = f"Episode {episode_subparts[0]}"
-                            episode_name = episode_subparts[1]
-                        else:
-                            episode_prefix = f"Episode {episode_part}"
-                            episode_name = ""
-
-                        desc_text.insert(tk.END, series_part, "series_name")
-                        desc_text.insert(tk.END, "     ", "spacer")
-
-                        if desc_length <= 350:
-                            desc_text.insert(tk.END, episode_prefix, "episode_prefix")
-                            if episode_name:
-                                desc_text.insert(tk.END, ": ", "episode_prefix")
-                                desc_text.insert(tk.END, episode_name, "episode_name")
-                            desc_text.insert(tk.END, ".", "period")
-                            desc_text.insert(tk.END, "\n", "description")
-                            if len(description) < 300:
-                                desc_text.insert(tk.END, "\n", "description")
-                            desc_text.insert(tk.END, description, "description")
-                        else:
-                            desc_text.insert(tk.END, episode_prefix, "episode_prefix")
-                            if episode_name:
-                                desc_text.insert(tk.END, ": ", "episode_prefix")
-                                desc_text.insert(tk.END, episode_name, "episode_name")
-                            desc_text.insert(tk.END, ".", "period")
-                            desc_text.insert(tk.END, " ", "description")
-                            desc_text.insert(tk.END, description, "description")
-                    else:
-                        desc_text.insert(tk.END, series_name.upper(), "series_name")
-                        desc_text.insert(tk.END, "     ", "spacer")
-                        if desc_length <= 350:
-                            desc_text.insert(tk.END, episode_title, "episode_prefix")
-                            desc_text.insert(tk.END, ".", "period")
-                            desc_text.insert(tk.END, "\n", "description")
-                            if len(description) < 200:
-                                desc_text.insert(tk.END, "\n", "description")
-                            desc_text.insert(tk.END, description, "description")
-                        else:
-                            desc_text.insert(tk.END, episode_title, "episode_prefix")
-                            desc_text.insert(tk.END, ".", "period")
-                            desc_text.insert(tk.END, " ", "description")
-                            desc_text.insert(tk.END, description, "description")
-                else:
-                    desc_text.insert(tk.END, series_name.upper(), "series_name")
-                    desc_text.insert(tk.END, " ", "spacer")
-                    desc_part = description
-                    if description.startswith(series_name.upper() + " "):
-                        desc_part = description[len(series_name.upper()) + 1:]
-                    if desc_length <= 350:
-                        desc_text.insert(tk.END, "\n", "description")
-                        if len(description) < 330:
-                            desc_text.insert(tk.END, "\n", "description")
-                    else:
-                        desc_text.insert(tk.END, " ", "description")
-                    desc_text.insert(tk.END, desc_part, "description")
-
-                desc_text.tag_configure("center", justify='left')
-                desc_text.tag_add("center", "1.0", "end")
-                desc_text.configure(state='disabled')
-
-                cast_frame = ttk.Frame(frame, width=500, style="DarkBlue.TFrame", padding=0)
-                cast_frame.pack(side=tk.LEFT, fill='y', padx=0)
-                cast_frame.pack_propagate(False)
-                cast_container = ttk.Frame(cast_frame, padding=0)
-                cast_container.pack(side=tk.TOP, pady=0)
-
-                people = show.get('People', [])
-                for i, person in enumerate(people[:5]):
-                    cast_photo = get_cast_image(person, width=90, height=148)
-                    cast_member_frame = ttk.Frame(cast_container, width=135, padding=0)
-                    cast_member_frame.pack(side=tk.LEFT, padx=2)
-                    cast_label = ttk.Label(cast_member_frame, image=cast_photo, style="Cast.TLabel")
-                    cast_label.image = cast_photo
-                    cast_label.pack(side=tk.TOP, pady=(0, 0))
-                    # Add click event to filter by actor
-                    cast_label.bind("<Button-1>", lambda e, name=person.get('Name', 'Unknown'): self.set_search_mode_callback("actor", name))
-                    name = person.get('Name', 'Unknown')
-                    parts = name.split()
-                    if len(parts) > 1:
-                        first_line = parts[0]
-                        second_line = " ".join(parts[1:])
-                    else:
-                        first_line = name
-                        second_line = ""
-                    if len(first_line) > 10:
-                        first_line = first_line[:9] + "."
-                    if len(second_line) > 10:
-                        second_line = second_line[:9] + "."
-                    formatted_name = f"{first_line}\n{second_line}"
-                    name_label = ttk.Label(
-                        cast_member_frame,
-                        text=formatted_name,
-                        font=('Monospace', 9),
-                        foreground=scheme["desc"],
-                        justify='center',
-                        anchor='center',
-                        compound='text',
-                        style="Cast.TLabel"
-                    )
-                    name_label.pack(side=tk.TOP, pady=(0, 0))
-                for i in range(len(people), 5):
-                    cast_photo = ImageTk.PhotoImage(Image.new('RGB', (90, 148), color='#000000'))
-                    cast_member_frame = ttk.Frame(cast_container, width=135, padding=0)
-                    cast_member_frame.pack(side=tk.LEFT, padx=2)
-                    cast_label = ttk.Label(cast_member_frame, image=cast_photo, style="Cast.TLabel")
-                    cast_label.image = cast_photo
-                    cast_label.pack(side=tk.TOP, pady=(0, 0))
-                    name_label = ttk.Label(
-                        cast_member_frame,
-                        text="\n",
-                        font=('Monospace', 9),
-                        foreground=scheme["desc"],
-                        justify='center',
-                        anchor='center',
-                        compound='text',
-                        style="Cast.TLabel"
-                    )
-                    name_label.pack(side=tk.TOP, pady=(0, 0))
-
-                poster_frame = ttk.Frame(frame, width=129, style="DarkBlue.TFrame")
-                poster_frame.pack(side=tk.RIGHT, fill='y', padx=2)
-                poster_frame.pack_propagate(False)
-                poster_container = ttk.Frame(poster_frame)
-                poster_container.pack(expand=True)
-                poster_img = get_image(show, width=129, height=184, image_type='Primary')
-                poster_label = ttk.Label(poster_container, image=poster_img)
-                poster_label.image = poster_img
-                poster_label.pack()
-                # Bind the poster image to open in Jellyfin web player
-                poster_label.bind("<Button-1>", lambda e, id=show_id: self.on_poster_click(id))
-        except Exception as e:
-            print(f"Error in load_ordered_shows: {e}")
-            raise
+            self.shows = shows
+            self.channel_assignments = channel_assignments
+            self.update_scrollregion()
+            self.scroll_to_index(first_index)
+
+    def build_row(self, frame_index, show):
+        """Build the widgets for the row at frame_index (its position in the show list)."""
+        scheme = self.color_scheme
+
+        frame = ttk.Frame(self.canvas, height=ROW_HEIGHT, padding=0, style="DarkBlue.TFrame")
+        frame.pack_propagate(False)
+        self.row_frames[frame_index] = frame
+        self.row_windows[frame_index] = self.canvas.create_window(
+            0, frame_index * ROW_PITCH, anchor='nw', window=frame,
+            width=self.canvas.winfo_width(), height=ROW_HEIGHT)
+
+        show_id = show['Id']
+        row_trace = tracer.start_row(frame_index, show_id, show.get('Name', 'Unknown'))
+        self.show_ids[frame_index] = show_id
+        self.show_items[show_id] = show
+
+        channel = self.channel_assignments[show_id]
+        channel_img = self.get_channel_image(channel)
+        channel_logo = ttk.Label(frame, image=channel_img)
+        channel_logo.image = channel_img
+        channel_logo.pack(side=tk.LEFT, padx=2)
+        # Add click event to filter by channel
+        channel_logo.bind("<Button-1>", lambda e, ch=channel: self.set_search_mode_callback("channel", ch))
+
+        img_label = ttk.Label(frame)
+        self.show_image(img_label, get_image_preview(show, *THUMB_SIZE, image_type='Thumb'),
+                        load_image, show, *THUMB_SIZE, 'Thumb')
+        img_label.pack(side=tk.LEFT, padx=2)
+        img_label.bind("<Button-1>", lambda e, id=show_id: self.on_thumb_click(id))
+
+        description_frame = ttk.Frame(frame, width=700, style="DarkBlue.TFrame")
+        description_frame.pack(side=tk.LEFT, fill='both', expand=True, padx=2)
+        description_frame.pack_propagate(False)
+
+        series_name = show.get('Name', 'Unknown Series')
+        series_overview = show.get('Overview', 'No description available')
+
+        # The description comes straight from the episode cache when it can. Otherwise the
+        # row shows the series overview and the lookup finishes on a metadata worker.
+        selected_episode_id = self.selected_episodes.get(show_id)
+        described = self.metadata.description(
+            show, selected_episode_id, owner=frame,
+            callback=lambda result: self.on_description_loaded(frame, frame_index, show_id, selected_episode_id, result))
+        if described.done():
+            episode_title, description = described.result()
+        else:
+            episode_title, description = None, series_overview
+
+        with tracer.phase("layout"):
+            layout = self.get_description_layout(show_id, selected_episode_id, series_name, episode_title, description)
+
+        desc_text = tk.Text(
+            description_frame,
+            wrap='word',
+            foreground='#ffffff',
+            background=scheme["bg"],
+            borderwidth=0,
+            highlightthickness=0,
+            height=10
+        )
+        desc_text.pack(expand=True, fill='both')
+        self.desc_widgets[frame_index] = desc_text
+        self.render_description(desc_text, layout)
+
+        desc_text.tag_bind("series_name", "<Button-1>",
+                           lambda e, sid=show_id, fi=frame_index: self.open_episode_selector(sid, fi, e))
+
+        cast_frame = ttk.Frame(frame, width=500, style="DarkBlue.TFrame", padding=0)
+        cast_frame.pack(side=tk.LEFT, fill='y', padx=0)
+        cast_frame.pack_propagate(False)
+        cast_container = ttk.Frame(cast_frame, padding=0)
+        cast_container.pack(side=tk.TOP, pady=0)
+
+        people = show.get('People', [])
+        for i, person in enumerate(people[:CAST_PER_ROW]):
+            cast_member_frame = ttk.Frame(cast_container, width=135, padding=0)
+            cast_member_frame.pack(side=tk.LEFT, padx=2)
+            cast_label = ttk.Label(cast_member_frame, style="Cast.TLabel")
+            self.show_image(cast_label, get_cast_image_preview(person, *CAST_SIZE),
+                            load_cast_image, person, *CAST_SIZE)
+            cast_label.pack(side=tk.TOP, pady=(0, 0))
+            # Add click event to filter by actor
+            cast_label.bind("<Button-1>", lambda e, name=person.get('Name', 'Unknown'): self.set_search_mode_callback("actor", name))
+            name = person.get('Name', 'Unknown')
+            parts = name.split()
+            if len(parts) > 1:
+                first_line = parts[0]
+                second_line = " ".join(parts[1:])
+            else:
+                first_line = name
+                second_line = ""
+            if len(first_line) > 10:
+                first_line = first_line[:9] + "."
+            if len(second_line) > 10:
+                second_line = second_line[:9] + "."
+            formatted_name = f"{first_line}\n{second_line}"
+            name_label = ttk.Label(
+                cast_member_frame,
+                text=formatted_name,
+                font=('Monospace', 9),
+                foreground=scheme["desc"],
+                justify='center',
+                anchor='center',
+                compound='text',
+                style="Cast.TLabel"
+            )
+            name_label.pack(side=tk.TOP, pady=(0, 0))
+        for i in range(len(people), CAST_PER_ROW):
+            cast_photo = self.get_blank_cast_image()
+            cast_member_frame = ttk.Frame(cast_container, width=135, padding=0)
+            cast_member_frame.pack(side=tk.LEFT, padx=2)
+            cast_label = ttk.Label(cast_member_frame, image=cast_photo, style="Cast.TLabel")
+            cast_label.image = cast_photo
+            cast_label.pack(side=tk.TOP, pady=(0, 0))
+            name_label = ttk.Label(
+                cast_member_frame,
+                text="\n",
+                font=('Monospace', 9),
+                foreground=scheme["desc"],
+                justify='center',
+                anchor='center',
+                compound='text',
+                style="Cast.TLabel"
+            )
+            name_label.pack(side=tk.TOP, pady=(0, 0))
+
+        poster_frame = ttk.Frame(frame, width=129, style="DarkBlue.TFrame")
+        poster_frame.pack(side=tk.RIGHT, fill='y', padx=2)
+        poster_frame.pack_propagate(False)
+        poster_container = ttk.Frame(poster_frame)
+        poster_container.pack(expand=True)
+        poster_label = ttk.Label(poster_container)
+        self.show_image(poster_label, get_image_preview(show, *POSTER_SIZE, image_type='Primary'),
+                        load_image, show, *POSTER_SIZE, 'Primary')
+        poster_label.pack()
+        # Bind the poster image to open in Jellyfin web player
+        poster_label.bind("<Button-1>", lambda e, id=show_id: self.on_poster_click(id))
+        tracer.end_row_build(row_trace)
 
     def clear_frame_content(self, frame):
         """Clear all content inside the frame without hiding the frame itself."""
@@ -820,38 +1014,44 @@ class WhatsonUI:
                 break
 
         if selected_frame_index is None:
-            print(f"Could not find frame for show ID {item_id}")
+            log.warning("Could not find frame for show ID %s", item_id)
             return
 
-        # Show the loading indicator
-        self.show_loading_indicator()
+        # Show the loading indicator until mpv reports playback
+        self.begin_handoff("mpv", item_id)
 
         # Clear content of all other frames immediately (delay set to 0)
         def update_ui():
             # Clear content of unselected rows
-            for idx, frame in enumerate(self.show_frames):
+            for idx, frame in self.row_frames.items():
                 if idx != selected_frame_index and frame.winfo_exists():
                     self.clear_frame_content(frame)
 
-        self.root.after(0, update_ui)  # Update UI immediately (delay = 0)
+        # A resident UI keeps its rows, so only the played show's row is rebuilt when it comes back
+        if not self.resident:
+            self.root.after(0, update_ui)  # Update UI immediately (delay = 0)
+
+        # Use the playback target resolved in the background, if it is ready
+        selected_episode_id = self.selected_episodes.get(item_id)
+        target = self.get_playback_target(self.playback_target_key(item_id))
 
         # Launch the show in a separate thread
         def start_mpv():
             try:
-                selected_episode_id = self.selected_episodes.get(item_id)
-                if selected_episode_id:
-                    launch_show(selected_episode_id)
-                else:
-                    launch_show(item_id)
+                with profiler.phase("launch"):
+                    if selected_episode_id:
+                        launched = launch_show(selected_episode_id, target)
+                    else:
+                        launched = launch_show(item_id, target)
             except Exception as e:
-                print(f"Error launching show with ID {item_id}: {e}")
+                log.error("Error launching show with ID %s: %s", item_id, e)
+                launched = False
+            if not launched:
+                self.call_on_tk_thread(self.abort_handoff)
 
         # Start MPV in a separate thread
         threading.Thread(target=start_mpv, daemon=True).start()
 
-        # After 4 seconds, close the main UI (changed from 5s to 4s)
-        self.root.after(4000, self.close_ui)
-
     def on_poster_click(self, item_id):
         # Find the frame (row) corresponding to the selected show
         selected_frame_index = None
@@ -861,48 +1061,62 @@ class WhatsonUI:
                 break
 
         if selected_frame_index is None:
-            print(f"Could not find frame for show ID {item_id}")
+            log.warning("Could not find frame for show ID %s", item_id)
             return
 
-        # Show the loading indicator
-        self.show_loading_indicator()
+        # The browser cannot report when it is showing the item, so hide after a fixed delay
+        self.begin_handoff("browser", item_id, timeout_ms=BROWSER_HANDOFF_MS)
 
         # Clear content of all other frames immediately (delay set to 0)
         def update_ui():
             # Clear content of unselected rows
-            for idx, frame in enumerate(self.show_frames):
+            for idx, frame in self.row_frames.items():
                 if idx != selected_frame_index and frame.winfo_exists():
                     self.clear_frame_content(frame)
 
-        self.root.after(0, update_ui)  # Update UI immediately (delay = 0)
+        if not self.resident:
+            self.root.after(0, update_ui)  # Update UI immediately (delay = 0)
 
         # Launch the show in Jellyfin web player in a separate thread
         def open_in_browser():
             try:
                 # Construct the Jellyfin web player URL
-                jellyfin_url = f"http://localhost:8096/web/index.html#!/details?id={item_id}&serverId={self.server_id}"
-                print(f"Opening Jellyfin web player for item {item_id}: {jellyfin_url}")
+                jellyfin_url = f"{JELLYFIN_URL}/web/index.html#!/details?id={item_id}&serverId={jellyfin_utils.server_id}"
+                log.info("Opening Jellyfin web player for item %s: %s", item_id, jellyfin_url)
                 webbrowser.open(jellyfin_url)  # Opens in default browser with default audio device
             except Exception as e:
-                print(f"Error opening Jellyfin web player for item {item_id}: {e}")
+                log.error("Error opening Jellyfin web player for item %s: %s", item_id, e)
 
         # Start browser in a separate thread
         threading.Thread(target=open_in_browser, daemon=True).start()
 
-        # After 4 seconds, close the main UI (changed from 5s to 4s)
-        self.root.after(4000, self.close_ui)
-
     def close_ui(self):
         """Close the main UI while keeping MPV running."""
         self.hide_loading_indicator()  # Stop flashing and hide the loading label
-        print("Closing main UI...")
+        log.info("Closing main UI...")
+        log.info("Requests sent and duplicates coalesced: %s", single_flight.summary())
+        log.info("Playback paths chosen: %s", stream_selector.summary())
+        self.image_executor.shutdown(wait=False, cancel_futures=True)
+        self.metadata.shutdown()
+        self.prefetch_executor.shutdown(wait=False, cancel_futures=True)
         self.root.quit()
         self.root.destroy()
-        print("Main UI closed.")
+        log.info("Main UI closed.")
+
+    def get_blank_cast_image(self):
+        if self.blank_cast_image is None:
+            self.blank_cast_image = ImageTk.PhotoImage(Image.new('RGB', CAST_SIZE, color='#000000'))
+        return self.blank_cast_image
 
     def get_channel_image(self, channel):
-        img_path = os.path.join("Channels", f"{channel}.png")
-        width, height = 141, 184
-        if os.path.exists(img_path):
-            return ImageTk.PhotoImage(Image.open(img_path).resize((width, height), Image.Resampling.LANCZOS))
-        return ImageTk.PhotoImage(Image.new('RGB', (width, height), color='#000000'))
\ No newline at end of file
+        """Get the logo for a channel. Logos are resized once and the PhotoImage shared by every row."""
+        photo = self.channel_images.get(channel)
+        if photo is None:
+            img_path = os.path.join("Channels", f"{channel}.png")
+            width, height = 141, 184
+            if os.path.exists(img_path):
+                photo = ImageTk.PhotoImage(Image.open(img_path).resize((width, height), Image.Resampling.LANCZOS))
+            else:
+                photo = ImageTk.PhotoImage(Image.new('RGB', (width, height), color='#000000'))
+            self.channel_images[channel] = photo
+        return photo
\ No newline at end of file